@@ -0,0 +1,9 @@
+import { renderMetrics } from '@/lib/countryCache'
+
+export const dynamic = 'force-dynamic'
+
+export async function GET() {
+  return new Response(renderMetrics(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4' }
+  })
+}
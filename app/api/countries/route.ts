@@ -1,47 +1,44 @@
-import { NextResponse } from 'next/server'
-
-const COUNTRIES_API = 'https://restcountries.com/v3.1/all?fields=name,capital,population,flags,region,subregion,languages,area,cca2,cca3'
-
-let cachedData: any = null
-let cacheTime: number = 0
-const CACHE_DURATION = 3600000 // 1 hour in milliseconds
-
-export async function GET() {
+import { NextRequest, NextResponse } from 'next/server'
+import { getCountryEntry } from '@/lib/countryCache'
+import {
+  FieldsError,
+  getPayload,
+  isNotModified,
+  negotiateEncoding,
+  normalizeFields
+} from '@/lib/countryPayloads'
+
+export async function GET(request: NextRequest) {
   try {
-    // Return cached data if still valid
-    const now = Date.now()
-    if (cachedData && (now - cacheTime) < CACHE_DURATION) {
-      return NextResponse.json(cachedData)
+    const fields = normalizeFields(request.nextUrl.searchParams.get('fields'))
+    const payload = getPayload(await getCountryEntry(), fields)
+    const encoding = negotiateEncoding(request.headers.get('accept-encoding'), payload)
+
+    const headers: Record<string, string> = {
+      'ETag': payload.etags[encoding]!,
+      'Cache-Control': 'no-cache',
+      'Vary': 'Accept-Encoding'
     }
 
-    const response = await fetch(COUNTRIES_API, {
-      headers: {
-        'Accept': 'application/json',
-        'User-Agent': 'CountryQuizGame/1.0'
-      }
-    })
-
-    if (!response.ok) {
-      console.error(`REST Countries API returned ${response.status}`)
-      throw new Error(`API returned ${response.status}`)
+    if (isNotModified(request.headers.get('if-none-match'), payload)) {
+      return new Response(null, { status: 304, headers })
     }
 
-    const data = await response.json()
-
-    // Cache the successful response
-    cachedData = data
-    cacheTime = now
-
-    return NextResponse.json(data)
+    headers['Content-Type'] = 'application/json'
+    if (encoding !== 'identity') {
+      headers['Content-Encoding'] = encoding
+    }
+    return new Response(payload.bodies[encoding]!, { headers })
   } catch (error: any) {
-    console.error('Error fetching countries:', error?.message || error)
-
-    // If we have cached data, return it even if expired
-    if (cachedData) {
-      console.log('Returning stale cache due to error')
-      return NextResponse.json(cachedData)
+    if (error instanceof FieldsError) {
+      return NextResponse.json(
+        { error: 'Invalid fields', message: error.message },
+        { status: 400 }
+      )
     }
 
+    console.error('Error fetching countries:', error?.message || error)
+
     return NextResponse.json(
       { error: 'Failed to fetch countries', message: error?.message || 'Unknown error' },
       { status: 500 }
@@ -0,0 +1,81 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { LeaderboardMode, LeaderboardWindow } from '@/types/leaderboard'
+import {
+  LEADERBOARD_MODES,
+  LEADERBOARD_WINDOWS,
+  ResultError,
+  SUBMIT_INTERVAL_MS,
+  TOP_K,
+  allowSubmission,
+  getLeaderboard,
+  parseResult,
+  submitResult
+} from '@/lib/leaderboard'
+
+export async function GET(request: NextRequest) {
+  try {
+    const params = request.nextUrl.searchParams
+
+    const mode = params.get('mode') as LeaderboardMode
+    if (!LEADERBOARD_MODES.includes(mode)) {
+      throw new ResultError(`mode must be one of ${LEADERBOARD_MODES.join(', ')}`)
+    }
+    const window = (params.get('window') ?? 'all') as LeaderboardWindow
+    if (!LEADERBOARD_WINDOWS.includes(window)) {
+      throw new ResultError(`window must be one of ${LEADERBOARD_WINDOWS.join(', ')}`)
+    }
+    const limit = Number(params.get('limit') ?? 10)
+    if (!Number.isInteger(limit) || limit < 1 || limit > TOP_K) {
+      throw new ResultError(`limit must be an integer between 1 and ${TOP_K}`)
+    }
+
+    return new Response(getLeaderboard(mode, window, limit), {
+      headers: {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache'
+      }
+    })
+  } catch (error: any) {
+    return errorResponse(error, 'Error reading leaderboard:')
+  }
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    // The first proxy hop when behind one, else the peer address
+    const client = request.headers.get('x-forwarded-for')?.split(',')[0].trim() || request.ip || 'unknown'
+    if (!allowSubmission(client)) {
+      return NextResponse.json(
+        { error: 'Too many submissions', message: 'Try again later' },
+        { status: 429, headers: { 'Retry-After': String(SUBMIT_INTERVAL_MS / 1000) } }
+      )
+    }
+
+    let input: unknown
+    try {
+      input = await request.json()
+    } catch {
+      throw new ResultError('Body must be JSON')
+    }
+    const placed = submitResult(parseResult(input))
+    return NextResponse.json({ accepted: true, placed }, { status: 201 })
+  } catch (error: any) {
+    return errorResponse(error, 'Error submitting result:')
+  }
+}
+
+function errorResponse(error: any, context: string) {
+  if (error instanceof ResultError) {
+    return NextResponse.json(
+      { error: 'Invalid leaderboard request', message: error.message },
+      { status: 400 }
+    )
+  }
+
+  console.error(context, error?.message || error)
+
+  return NextResponse.json(
+    { error: 'Leaderboard unavailable', message: error?.message || 'Unknown error' },
+    { status: 500 }
+  )
+}
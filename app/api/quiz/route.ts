@@ -0,0 +1,48 @@
+import { randomInt } from 'crypto'
+import { NextRequest, NextResponse } from 'next/server'
+import { QuizMode } from '@/lib/questionBank'
+import { MAX_QUESTIONS, QUIZ_MODES, QuizRequestError, getQuiz, parseSeed } from '@/lib/quizService'
+
+export async function GET(request: NextRequest) {
+  try {
+    const params = request.nextUrl.searchParams
+
+    const mode = params.get('mode') as QuizMode
+    if (!QUIZ_MODES.includes(mode)) {
+      throw new QuizRequestError(`Unknown mode ${mode}; expected one of ${QUIZ_MODES.join(', ')}`)
+    }
+
+    const n = Number(params.get('n') ?? 10)
+    if (!Number.isInteger(n) || n < 1 || n > MAX_QUESTIONS) {
+      throw new QuizRequestError(`n must be an integer between 1 and ${MAX_QUESTIONS}`)
+    }
+
+    // Without a seed every request gets a fresh quiz; the seed is returned
+    // so it can be replayed
+    const seeded = parseSeed(params.get('seed'))
+    const seed = seeded ? seeded.seed : randomInt(0x100000000)
+
+    // Random-seed quizzes would only push reusable ones out of the cache
+    const body = await getQuiz(mode, n, seed, seeded !== null)
+    return new Response(body, {
+      headers: {
+        'Content-Type': 'application/json',
+        'Cache-Control': seeded ? 'public, max-age=300' : 'no-store'
+      }
+    })
+  } catch (error: any) {
+    if (error instanceof QuizRequestError) {
+      return NextResponse.json(
+        { error: 'Invalid quiz request', message: error.message },
+        { status: 400 }
+      )
+    }
+
+    console.error('Error generating quiz:', error?.message || error)
+
+    return NextResponse.json(
+      { error: 'Failed to generate quiz', message: error?.message || 'Unknown error' },
+      { status: 500 }
+    )
+  }
+}
@@ -104,7 +104,7 @@ export default function CapitalsQuiz() {
                 transition={{ delay: idx * 0.1 }}
                 whileHover={{ scale: 1.05, y: -5 }}
                 whileTap={{ scale: 0.95 }}
-                onClick={() => onAnswer(country.cca3 === question.correct.cca3)}
+                onClick={() => onAnswer(country.cca3 === question.correct.cca3, country.cca3)}
                 className="glass p-6 rounded-2xl text-white font-semibold text-lg hover:bg-white/10 transition-all"
               >
                 {country.capital?.[0] || 'No capital'}
@@ -2,9 +2,9 @@
 
 import { useState, useEffect } from 'react'
 import { motion } from 'framer-motion'
-import Image from 'next/image'
 import Link from 'next/link'
 import QuizContainer from '@/components/QuizContainer'
+import FlagImage from '@/components/FlagImage'
 import { QuizQuestion } from '@/types/country'
 import { generateFlagQuestions } from '@/lib/countries'
 
@@ -92,13 +92,7 @@ export default function FlagsQuiz() {
               animate={{ scale: 1, opacity: 1 }}
               className="relative w-full max-w-md mx-auto h-48 mb-8 rounded-xl overflow-hidden shadow-2xl"
             >
-              <Image
-                src={question.correct.flags.png}
-                alt="Country flag"
-                fill
-                className="object-cover"
-                priority
-              />
+              <FlagImage country={question.correct} alt="Country flag" heightRem={12} />
             </motion.div>
           </div>
 
@@ -111,7 +105,7 @@ export default function FlagsQuiz() {
                 transition={{ delay: idx * 0.1 }}
                 whileHover={{ scale: 1.05, y: -5 }}
                 whileTap={{ scale: 0.95 }}
-                onClick={() => onAnswer(country.cca3 === question.correct.cca3)}
+                onClick={() => onAnswer(country.cca3 === question.correct.cca3, country.cca3)}
                 className="glass p-6 rounded-2xl text-white font-semibold text-lg hover:bg-white/10 transition-all"
               >
                 {country.name.common}
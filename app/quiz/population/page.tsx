@@ -96,7 +96,7 @@ export default function PopulationQuiz() {
                 transition={{ delay: idx * 0.2 }}
                 whileHover={{ scale: 1.05, y: -10 }}
                 whileTap={{ scale: 0.95 }}
-                onClick={() => onAnswer(country.cca3 === question.correct.cca3)}
+                onClick={() => onAnswer(country.cca3 === question.correct.cca3, country.cca3)}
                 className="glass p-8 rounded-3xl hover:bg-white/10 transition-all"
               >
                 <div className="text-5xl mb-4">
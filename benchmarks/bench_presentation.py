@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for presentation generation, with a baseline regression gate.
+
+Measures, for the default deck:
+  - interpreter startup and `import create_presentation` time
+  - wall time and tracemalloc peak memory of a full build
+  - time spent rendering each section
+  - time to render a table section at growing row counts
+  - size of the saved .docx
+
+Usage:
+  python benchmarks/bench_presentation.py --save baseline.json
+  python benchmarks/bench_presentation.py --compare baseline.json --threshold 0.15
+
+With --compare the script exits non-zero when any metric is worse than the
+baseline by more than the threshold (a fraction, 0.15 = 15%). Individual
+metrics can be given their own threshold with --metric-threshold NAME=FRACTION.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TABLE_ROWS = (100, 1000, 10000)
+
+
+def _timed(fn, repeat):
+    """Run `fn` `repeat` times and return the median wall time in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _subprocess_seconds(code, repeat):
+    return _timed(lambda: subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True),
+                  repeat)
+
+
+def bench_startup(repeat):
+    """Interpreter startup and module import times, measured in fresh processes."""
+    startup = _subprocess_seconds('pass', repeat)
+    with_import = _subprocess_seconds('import create_presentation', repeat)
+    return {
+        'startup_seconds': startup,
+        'import_seconds': max(with_import - startup, 0.0),
+    }
+
+
+def bench_full_deck(repeat):
+    """Wall time, peak memory and output size of building the default deck."""
+    from create_presentation import create_presentation
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'deck.docx')
+        create_presentation(output)  # Warm the IR cache and imports
+
+        seconds = _timed(lambda: create_presentation(output), repeat)
+
+        tracemalloc.start()
+        create_presentation(output)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'full_deck_seconds': seconds,
+            'full_deck_peak_bytes': peak,
+            'output_bytes': os.path.getsize(output),
+        }
+
+
+def bench_sections(repeat):
+    """Median render time of each section of the default spec."""
+    from docx import Document
+    from create_presentation import render_ops
+    from presentation.spec import compile_spec
+
+    ir = compile_spec()
+    content = ir['meta']
+    samples = {name: [] for name, _ in ir['sections']}
+    for _ in range(repeat):
+        doc = Document()
+        for name, ops in ir['sections']:
+            start = time.perf_counter()
+            render_ops(doc, ops, content)
+            samples[name].append(time.perf_counter() - start)
+        doc.save(io.BytesIO())
+    return {f'section_seconds[{name}]': statistics.median(times)
+            for name, times in samples.items()}
+
+
+def bench_tables(repeat, row_counts=TABLE_ROWS):
+    """Render and save time of an 8-column table at growing row counts."""
+    from docx import Document
+    from create_presentation import add_table
+
+    header = [f'Column {i}' for i in range(8)]
+    metrics = {}
+    for count in row_counts:
+        rows = [[f'r{r}c{c}' for c in range(8)] for r in range(count)]
+
+        def build():
+            doc = Document()
+            add_table(doc, header, rows)
+            doc.save(io.BytesIO())
+
+        metrics[f'table_seconds[{count} rows]'] = _timed(build, repeat)
+    return metrics
+
+
+def run(repeat):
+    metrics = {}
+    metrics.update(bench_startup(repeat))
+    metrics.update(bench_full_deck(repeat))
+    metrics.update(bench_sections(repeat))
+    metrics.update(bench_tables(repeat))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'metrics': metrics,
+    }
+
+
+def compare(current, baseline, threshold, overrides):
+    """Return (rows, regressions) comparing two result sets metric by metric.
+
+    A baseline metric missing from the current run (a benchmark that crashed
+    or was renamed) counts as a regression.
+    """
+    rows = []
+    regressions = []
+    for name, base in baseline['metrics'].items():
+        if name not in current['metrics']:
+            rows.append((name, base, None, None, 'MISSING'))
+            regressions.append(name)
+    for name, value in current['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base is None:
+            rows.append((name, None, value, None, 'new'))
+            continue
+        limit = overrides.get(name, threshold)
+        change = (value - base) / base if base else 0.0
+        status = 'REGRESSED' if change > limit else 'ok'
+        if status == 'REGRESSED':
+            regressions.append(name)
+        rows.append((name, base, value, change, status))
+    return rows, regressions
+
+
+def _format(name, value):
+    if value is None:
+        return '-'
+    if name.endswith('bytes'):
+        return f'{value / 1024:.1f} KiB'
+    return f'{value * 1000:.2f} ms'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark presentation generation.')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per timing (median is kept)')
+    parser.add_argument('--save', metavar='JSON', help='write results to this file')
+    parser.add_argument('--compare', metavar='JSON', help='baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed relative regression (default: %(default)s)')
+    parser.add_argument('--metric-threshold', action='append', default=[], metavar='NAME=FRACTION',
+                        help='per-metric threshold override, may be repeated')
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.metric_threshold:
+        name, _, value = item.rpartition('=')
+        if not name:
+            parser.error(f'--metric-threshold expects NAME=FRACTION, got {item!r}')
+        try:
+            overrides[name] = float(value)
+        except ValueError:
+            parser.error(f'--metric-threshold expects NAME=FRACTION, got {item!r}')
+
+    results = run(args.repeat)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.compare:
+        for name, value in results['metrics'].items():
+            print(f'{name:<55} {_format(name, value):>14}')
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows, regressions = compare(results, baseline, args.threshold, overrides)
+    for name, base, value, change, status in rows:
+        delta = f'{change:+.1%}' if change is not None else ''
+        print(f'{name:<55} {_format(name, base):>14} {_format(name, value):>14} {delta:>8}  {status}')
+    if regressions:
+        print(f'\n{len(regressions)} metric(s) regressed beyond the threshold or went missing')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
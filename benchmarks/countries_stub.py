@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the REST Countries API, for load tests without the network.
+
+Replays a recorded response (the JSON list /v3.1/all returns) on every GET,
+with injectable latency and failures, so the cache paths of
+lib/countryCache.ts (cold miss, expiry with a background refresh, stale
+copy served while the upstream fails) can be exercised on demand. Point the
+app at it with COUNTRIES_API_URL:
+
+  python benchmarks/countries_stub.py countries.json --port 8090 --latency-ms 150
+  COUNTRIES_API_URL=http://127.0.0.1:8090/v3.1/all COUNTRIES_CACHE_TTL_MS=5000 npm start
+
+Faults can be changed while it runs, e.g. by benchmarks/load_test.py --fault:
+
+  POST /_control  {"latency_ms": 2000, "error_rate": 1.0}
+  GET  /_stats    -> {"requests": ..., "errors": ..., "config": {...}}
+
+Only the standard library is used.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import time
+from http import HTTPStatus
+
+# Settings accepted by the command line and POST /_control
+DEFAULTS = {
+    'latency_ms': 0.0,     # added before every upstream response
+    'jitter_ms': 0.0,      # uniform extra latency in [0, jitter_ms]
+    'error_rate': 0.0,     # fraction of requests answered with error_status
+    'error_status': 503,
+    'hang_rate': 0.0,      # fraction of requests that never answer
+    'truncate_rate': 0.0,  # fraction answered with a cut-off body
+}
+
+
+class CountriesStub:
+    """State of the stand-in: the fixture, fault settings and counters."""
+
+    def __init__(self, fixture, seed=None, **settings):
+        self.body = json.dumps(fixture, separators=(',', ':')).encode()
+        self.gzipped = gzip.compress(self.body, 6)
+        self.config = dict(DEFAULTS)
+        self.update(settings)
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'hangs': 0, 'truncated': 0}
+        self.started = time.time()
+
+    def update(self, settings):
+        unknown = set(settings) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f'Unknown settings: {", ".join(sorted(unknown))}')
+        for name, value in settings.items():
+            self.config[name] = type(DEFAULTS[name])(value)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                if not await self.respond(writer, method, target, headers, body):
+                    break
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, method, target, headers, body):
+        """Write one response; False means the connection should be dropped."""
+        path = target.split('?', 1)[0]
+        if path == '/_stats':
+            payload = {**self.stats, 'uptime_seconds': time.time() - self.started,
+                       'config': self.config}
+            _write(writer, 200, json.dumps(payload).encode())
+            return True
+        if path == '/_control':
+            if method != 'POST':
+                _write(writer, 405, b'{"error":"POST settings as JSON"}')
+                return True
+            try:
+                self.update(json.loads(body or b'{}'))
+            except (ValueError, TypeError) as error:
+                _write(writer, 400, json.dumps({'error': str(error)}).encode())
+                return True
+            _write(writer, 200, json.dumps(self.config).encode())
+            return True
+        if method not in ('GET', 'HEAD'):
+            _write(writer, 405, b'{"error":"GET only"}')
+            return True
+
+        self.stats['requests'] += 1
+        config = self.config
+        delay = config['latency_ms'] + self.random.uniform(0, config['jitter_ms'])
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self.random.random()
+        if roll < config['hang_rate']:
+            self.stats['hangs'] += 1
+            await asyncio.sleep(3600)
+            return False
+        roll -= config['hang_rate']
+        if roll < config['error_rate']:
+            self.stats['errors'] += 1
+            status = config['error_status']
+            _write(writer, status, json.dumps({'status': status}).encode())
+            return True
+        roll -= config['error_rate']
+
+        gzipped = 'gzip' in headers.get('accept-encoding', '')
+        body = self.gzipped if gzipped else self.body
+        extra = {'Content-Encoding': 'gzip'} if gzipped else {}
+        if roll < config['truncate_rate']:
+            # Promise the full length but close halfway through
+            self.stats['truncated'] += 1
+            _write(writer, 200, body[:len(body) // 2], length=len(body), headers=extra)
+            return False
+        self.stats['ok'] += 1
+        _write(writer, 200, b'' if method == 'HEAD' else body, length=len(body), headers=extra)
+        return True
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _version = line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def _write(writer, status, body, length=None, headers=None):
+    reason = HTTPStatus(status).phrase if status in HTTPStatus._value2member_map_ else 'Error'
+    lines = [f'HTTP/1.1 {status} {reason}',
+             'Content-Type: application/json',
+             f'Content-Length: {len(body) if length is None else length}',
+             'Cache-Control: no-store']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+
+
+async def serve(stub, host='127.0.0.1', port=8090):
+    """Start serving `stub`; returns the asyncio server."""
+    return await asyncio.start_server(stub.handle, host, port)
+
+
+def load_fixture(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f'{path} does not contain a list of countries')
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a recorded REST Countries response.')
+    parser.add_argument('fixture', help='recorded /v3.1/all JSON response')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--seed', type=int, help='seed for latency jitter and fault rolls')
+    for name, default in DEFAULTS.items():
+        parser.add_argument('--' + name.replace('_', '-'), type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    stub = CountriesStub(load_fixture(args.fixture), seed=args.seed,
+                         **{name: getattr(args, name) for name in DEFAULTS})
+
+    async def run():
+        server = await serve(stub, args.host, args.port)
+        print(f'Serving {len(stub.body):,} bytes on http://{args.host}:{args.port}/v3.1/all')
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Asyncio load generator for /api/countries, /api/quiz and the quiz pages.
+
+Each session plays one scenario: it loads a quiz page, then makes the API
+requests that page makes in the browser. Scenarios are drawn from a weighted
+mix. Arrivals are open-loop at --rate sessions per second (Poisson or evenly
+spaced), so a slow server does not slow the offered load; --concurrency caps
+the sessions in flight, and the time an arrival waits for a slot is
+reported as schedule lag. Without --rate, --concurrency sessions run
+back to back (closed loop).
+
+Run the app against benchmarks/countries_stub.py to test the upstream paths
+without the network; --fault changes the stand-in's settings mid-run, e.g.
+to fail every refresh once the cache has expired:
+
+  python benchmarks/countries_stub.py countries.json --port 8090 &
+  COUNTRIES_API_URL=http://127.0.0.1:8090/v3.1/all COUNTRIES_CACHE_TTL_MS=10000 npm start &
+  python benchmarks/load_test.py http://localhost:3000 --rate 100 --duration 60 \\
+      --mix flags=2,capitals=1,population=1 --stub http://127.0.0.1:8090 \\
+      --fault 20:error_rate=1 --fault 40:error_rate=0 -o run.json
+  python benchmarks/load_test.py ... --compare run.json --threshold 0.2
+
+The JSON report holds p50/p95/p99 latency, throughput and error rates
+overall and per endpoint. With --compare the script exits non-zero when a
+run is worse than the baseline by more than the threshold. Only the
+standard library is used.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+# Pages and the requests each makes once loaded (see lib/countries.ts)
+SCENARIOS = {
+    'flags': ('/quiz/flags', '/api/quiz?mode=flag&n=10'),
+    'capitals': ('/quiz/capitals', '/api/quiz?mode=capital&n=10'),
+    'population': ('/quiz/population', '/api/quiz?mode=population&n=10'),
+    # What the flags page loads when /api/quiz fails: the countries to build
+    # questions from and the distractor index (tools/distractors.py)
+    'flags-fallback': ('/quiz/flags',
+                       '/api/countries?fields=cca2,cca3,flags.png,name.common,population,region',
+                       '/distractors.json'),
+    'countries': ('/api/countries',),
+}
+DEFAULT_MIX = 'flags=1,capitals=1,population=1'
+
+# Report fields compared by --compare, and whether larger is worse
+COMPARED = {
+    'p50_ms': True,
+    'p95_ms': True,
+    'p99_ms': True,
+    'error_rate': True,
+    'throughput_rps': False,
+}
+# Error rates this close to zero are not compared relatively
+ERROR_RATE_FLOOR = 0.001
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, host, path):
+        self.writer.write((f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+                           'Accept-Encoding: br, gzip\r\nUser-Agent: country-quiz-load-test\r\n'
+                           '\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise HttpError('connection closed')
+        try:
+            status = int(line.split(b' ', 2)[1])
+        except (IndexError, ValueError):
+            raise HttpError(f'bad status line {line[:40]!r}') from None
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        size = 0
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                chunk = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+                if chunk == 0:
+                    break
+        elif 'content-length' in headers:
+            size = int(headers['content-length'])
+            await self.reader.readexactly(size)
+        else:
+            size = len(await self.reader.read())
+            headers['connection'] = 'close'
+        reusable = headers.get('connection', '').lower() != 'close'
+        return status, size, reusable
+
+    def close(self):
+        self.writer.close()
+
+
+class Client:
+    """Keep-alive HTTP/1.1 client with a pool of idle connections to one origin."""
+
+    def __init__(self, base_url, timeout):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise ValueError(f'Only http:// targets are supported, got {base_url}')
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.idle = []
+
+    async def get(self, path):
+        """Return (status, body bytes) for GET `path`."""
+        conn = self.idle.pop() if self.idle else None
+        if conn is None:
+            conn = Connection(*await asyncio.open_connection(self.host, self.port))
+        try:
+            status, size, reusable = await asyncio.wait_for(
+                conn.request(self.netloc, self.prefix + path), self.timeout)
+        except BaseException:
+            conn.close()
+            raise
+        if reusable:
+            self.idle.append(conn)
+        else:
+            conn.close()
+        return status, size
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle.clear()
+
+
+class Recorder:
+    """Latency samples and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self.bytes = Counter()
+        self.lag = []
+        self.sessions = Counter()
+
+    def record(self, endpoint, seconds, outcome, size=0):
+        self.latencies[endpoint].append(seconds * 1000)
+        self.outcomes[endpoint][outcome] += 1
+        self.bytes[endpoint] += size
+
+
+def endpoint_name(path):
+    """Group requests by path, keeping the quiz mode of /api/quiz."""
+    base, _, query = path.partition('?')
+    if base == '/api/quiz':
+        mode = dict(p.partition('=')[::2] for p in query.split('&')).get('mode', '')
+        return f'{base}?mode={mode}'
+    if base == '/api/countries' and query:
+        return f'{base}?fields=…'
+    return base
+
+
+async def run_session(client, recorder, scenario):
+    for path in SCENARIOS[scenario]:
+        endpoint = endpoint_name(path)
+        start = time.perf_counter()
+        try:
+            status, size = await client.get(path)
+        except asyncio.TimeoutError:
+            recorder.record(endpoint, time.perf_counter() - start, 'timeout')
+            return
+        except (OSError, HttpError, asyncio.IncompleteReadError):
+            recorder.record(endpoint, time.perf_counter() - start, 'connect_error')
+            return
+        recorder.record(endpoint, time.perf_counter() - start, str(status), size)
+        if status >= 400:
+            return  # The page would show its error state
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario {name!r} (expected one of {", ".join(SCENARIOS)})')
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError('Scenario mix has no positive weight')
+    return mix
+
+
+def parse_fault(text):
+    at, _, settings = text.partition(':')
+    values = {}
+    for item in settings.split(','):
+        name, _, value = item.partition('=')
+        if not name or not value:
+            raise ValueError(f'--fault expects SECONDS:name=value[,...], got {text!r}')
+        values[name.strip()] = float(value)
+    return float(at), values
+
+
+async def stub_request(base_url, method, path, payload=None, timeout=5.0):
+    """One-off request to the stand-in's /_control or /_stats; returns the decoded reply."""
+    url = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write((f'{method} {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n'
+                  f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n')
+                 .encode('latin-1') + body)
+    try:
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, reply = raw.partition(b'\r\n\r\n')
+    status_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+    if ' 200 ' not in status_line:
+        raise HttpError(f'{method} {path} failed: {status_line}')
+    return json.loads(reply)
+
+
+async def inject_faults(stub_url, faults, started, log):
+    for at, settings in sorted(faults, key=lambda f: f[0]):
+        await asyncio.sleep(max(0.0, started + at - time.perf_counter()))
+        try:
+            await stub_request(stub_url, 'POST', '/_control', settings)
+            log.append({'at_seconds': round(time.perf_counter() - started, 3), **settings})
+        except (OSError, HttpError, ValueError) as error:
+            print(f'Could not apply fault {settings}: {error}', file=sys.stderr)
+
+
+async def load(args):
+    mix = parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    rng = random.Random(args.seed)
+    client = Client(args.target, args.timeout)
+    recorder = Recorder()
+    faults_applied = []
+    upstream_before = await stub_request(args.stub, 'GET', '/_stats') if args.stub else None
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    fault_task = (asyncio.create_task(inject_faults(args.stub, args.faults, started, faults_applied))
+                  if args.stub and args.faults else None)
+
+    async def session(intended):
+        scenario = rng.choices(names, weights)[0]
+        recorder.sessions[scenario] += 1
+        async with slots:
+            recorder.lag.append((time.perf_counter() - intended) * 1000)
+            await run_session(client, recorder, scenario)
+
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+    if args.rate:
+        # Open loop: arrival times are fixed up front, whatever the latency
+        next_at = started
+        while next_at < deadline:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            task = asyncio.create_task(session(next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            gap = rng.expovariate(args.rate) if args.arrival == 'poisson' else 1 / args.rate
+            next_at += gap
+    else:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await session(time.perf_counter())
+        tasks.update(asyncio.create_task(worker()) for _ in range(args.concurrency))
+
+    if tasks:
+        # Let sessions in flight finish; each has a bounded number of requests
+        remaining = max(0.0, deadline - time.perf_counter())
+        await asyncio.wait(tasks, timeout=remaining + args.timeout * 2)
+    elapsed = time.perf_counter() - started
+    if fault_task:
+        fault_task.cancel()
+    for task in list(tasks):
+        task.cancel()
+    client.close()
+
+    upstream = None
+    if args.stub:
+        after = await stub_request(args.stub, 'GET', '/_stats')
+        upstream = {key: after[key] - upstream_before.get(key, 0)
+                    for key in ('requests', 'ok', 'errors', 'hangs', 'truncated')}
+    return report(args, recorder, elapsed, faults_applied, upstream)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list, or None when empty."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, outcomes, elapsed, size=0):
+    values = sorted(latencies)
+    total = sum(outcomes.values())
+    failed = sum(count for outcome, count in outcomes.items()
+                 if not outcome.isdigit() or int(outcome) >= 400)
+    return {
+        'requests': total,
+        'errors': failed,
+        'error_rate': round(failed / total, 5) if total else None,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(values) / len(values), 3) if values else None,
+        'p50_ms': _round(percentile(values, 50)),
+        'p95_ms': _round(percentile(values, 95)),
+        'p99_ms': _round(percentile(values, 99)),
+        'max_ms': _round(values[-1] if values else None),
+        'bytes': size,
+        'outcomes': dict(sorted(outcomes.items())),
+    }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def report(args, recorder, elapsed, faults, upstream):
+    everything = [ms for values in recorder.latencies.values() for ms in values]
+    outcomes = sum(recorder.outcomes.values(), Counter())
+    lag = sorted(recorder.lag)
+    return {
+        'target': args.target,
+        'python': platform.python_version(),
+        'config': {
+            'mode': 'open' if args.rate else 'closed',
+            'rate': args.rate,
+            'arrival': args.arrival if args.rate else None,
+            'concurrency': args.concurrency,
+            'duration_seconds': args.duration,
+            'timeout_seconds': args.timeout,
+            'mix': parse_mix(args.mix),
+            'seed': args.seed,
+        },
+        'elapsed_seconds': round(elapsed, 3),
+        'sessions': dict(recorder.sessions),
+        'totals': summarize(everything, outcomes, elapsed, sum(recorder.bytes.values())),
+        'endpoints': {name: summarize(recorder.latencies[name], recorder.outcomes[name],
+                                      elapsed, recorder.bytes[name])
+                      for name in sorted(recorder.latencies)},
+        'schedule_lag_ms': {'p50': _round(percentile(lag, 50)),
+                            'p99': _round(percentile(lag, 99)),
+                            'max': _round(lag[-1] if lag else None)},
+        'faults': faults,
+        'upstream': upstream,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return (rows, regressions) for the totals and every shared endpoint."""
+    rows = []
+    regressions = []
+    scopes = [('total', current['totals'], baseline['totals'])]
+    scopes += [(name, stats, baseline['endpoints'][name])
+               for name, stats in current['endpoints'].items() if name in baseline['endpoints']]
+    for scope, now, base in scopes:
+        for field, higher_is_worse in COMPARED.items():
+            value, old = now.get(field), base.get(field)
+            if value is None or old is None:
+                continue
+            if field == 'error_rate':
+                change = value - old
+                worse = change > max(threshold * old, ERROR_RATE_FLOOR)
+            else:
+                change = (value - old) / old if old else 0.0
+                worse = change > threshold if higher_is_worse else change < -threshold
+            rows.append((scope, field, old, value, change, 'REGRESSED' if worse else 'ok'))
+            if worse:
+                regressions.append(f'{scope} {field}')
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the quiz API and pages.')
+    parser.add_argument('target', help='base URL of the running app, e.g. http://localhost:3000')
+    parser.add_argument('--rate', type=float,
+                        help='open loop: session arrivals per second (default: closed loop)')
+    parser.add_argument('--arrival', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='sessions in flight at most (closed loop: sessions running)')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of arrivals')
+    parser.add_argument('--timeout', type=float, default=10.0, help='per-request timeout in seconds')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f'scenario weights, from {", ".join(SCENARIOS)} (default: %(default)s)')
+    parser.add_argument('--seed', type=int, help='seed for arrivals and scenario picks')
+    parser.add_argument('--stub', metavar='URL',
+                        help='countries_stub.py base URL, for upstream counts and --fault')
+    parser.add_argument('--fault', action='append', default=[], metavar='SECONDS:NAME=VALUE,...',
+                        help='change stand-in settings at this offset into the run, may be repeated')
+    parser.add_argument('-o', '--output', help='write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', metavar='JSON', help='baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed relative regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+        args.faults = [parse_fault(text) for text in args.fault]
+    except ValueError as error:
+        parser.error(str(error))
+    if args.faults and not args.stub:
+        parser.error('--fault needs --stub')
+    if args.concurrency < 1 or args.duration <= 0 or (args.rate is not None and args.rate <= 0):
+        parser.error('--concurrency, --duration and --rate must be positive')
+
+    results = asyncio.run(load(args))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    totals = results['totals']
+    print(f'{totals["requests"]:,} requests in {results["elapsed_seconds"]:.1f}s '
+          f'({totals["throughput_rps"]} req/s), p50 {totals["p50_ms"]} ms, '
+          f'p99 {totals["p99_ms"]} ms, errors {totals["error_rate"]}', file=sys.stderr)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows, regressions = compare(results, baseline, args.threshold)
+    for scope, field, old, value, change, status in rows:
+        delta = f'{change:+.4f}' if field == 'error_rate' else f'{change:+.1%}'
+        print(f'{scope:<32} {field:<15} {old:>12} {value:>12} {delta:>9}  {status}',
+              file=sys.stderr)
+    if regressions:
+        print(f'\n{len(regressions)} metric(s) regressed beyond the threshold', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
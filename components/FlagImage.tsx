@@ -0,0 +1,57 @@
+'use client'
+
+import { useEffect, useState } from 'react'
+import Image from 'next/image'
+import { Country } from '@/types/country'
+import { FlagAtlas, fetchFlagAtlas, getLoadedFlagAtlas } from '@/lib/flagAtlas'
+
+interface FlagImageProps {
+  country: Pick<Country, 'flags'> & Partial<Pick<Country, 'cca2'>>
+  alt: string
+  // Height of the box the flag is fitted into
+  heightRem: number
+}
+
+// A flag from the sprite atlas when one is built, otherwise its own image.
+// Until the atlas index is known a placeholder is shown, so a flag the atlas
+// covers never also loads as a separate PNG.
+export default function FlagImage({ country, alt, heightRem }: FlagImageProps) {
+  // undefined while the index is loading, null when there is no atlas
+  const [atlas, setAtlas] = useState<FlagAtlas | null | undefined>(getLoadedFlagAtlas)
+
+  useEffect(() => {
+    if (atlas === undefined) {
+      fetchFlagAtlas().then(setAtlas)
+    }
+  }, [atlas])
+
+  if (atlas === undefined) {
+    return <div role="img" aria-label={alt} className="absolute inset-0 animate-pulse bg-white/10 rounded" />
+  }
+
+  const pixels = heightRem * 16 * 1.5 * (typeof window !== 'undefined' ? window.devicePixelRatio : 1)
+  const style = atlas && country.cca2 ? atlas.style(country.cca2, pixels) : null
+
+  if (!style) {
+    return (
+      <Image
+        src={country.flags.png}
+        alt={alt}
+        fill
+        className="object-cover"
+        priority
+      />
+    )
+  }
+
+  const [w, h] = String(style.aspectRatio).split(' / ').map(Number)
+  return (
+    <div className="absolute inset-0 flex items-center justify-center">
+      <div
+        role="img"
+        aria-label={alt}
+        style={{ ...style, width: `min(100%, ${(w / h) * heightRem}rem)` }}
+      />
+    </div>
+  )
+}
@@ -0,0 +1,104 @@
+'use client'
+
+import { useState, useEffect } from 'react'
+import { Leaderboard as Board, LeaderboardMode, LeaderboardWindow } from '@/types/leaderboard'
+import { fetchLeaderboard, getPlayerName, setPlayerName } from '@/lib/leaderboardClient'
+
+const MODES: { id: LeaderboardMode, label: string }[] = [
+  { id: 'flags', label: '🚩 Flags' },
+  { id: 'capitals', label: '🏛️ Capitals' },
+  { id: 'population', label: '👥 Population' }
+]
+
+const WINDOWS: { id: LeaderboardWindow, label: string }[] = [
+  { id: 'daily', label: 'Today' },
+  { id: 'weekly', label: 'This Week' },
+  { id: 'all', label: 'All Time' }
+]
+
+export default function Leaderboard() {
+  const [mode, setMode] = useState<LeaderboardMode>('flags')
+  const [period, setPeriod] = useState<LeaderboardWindow>('daily')
+  const [board, setBoard] = useState<Board | null>(null)
+  const [loading, setLoading] = useState(true)
+  const [player, setPlayer] = useState('')
+
+  useEffect(() => {
+    setPlayer(getPlayerName())
+  }, [])
+
+  useEffect(() => {
+    let cancelled = false
+    setLoading(true)
+    fetchLeaderboard(mode, period).then(result => {
+      if (cancelled) return
+      setBoard(result)
+      setLoading(false)
+    })
+    return () => {
+      cancelled = true
+    }
+  }, [mode, period])
+
+  const tab = (active: boolean) =>
+    `px-3 py-1 rounded-full text-sm ${active ? 'bg-white/30 text-white' : 'text-white/60 hover:text-white'}`
+
+  return (
+    <div className="mb-8">
+      <h3 className="text-xl font-bold text-white mb-4">Leaderboard</h3>
+
+      <div className="flex flex-wrap gap-2 mb-2">
+        {MODES.map(m => (
+          <button key={m.id} onClick={() => setMode(m.id)} className={tab(mode === m.id)}>
+            {m.label}
+          </button>
+        ))}
+      </div>
+      <div className="flex flex-wrap gap-2 mb-4">
+        {WINDOWS.map(w => (
+          <button key={w.id} onClick={() => setPeriod(w.id)} className={tab(period === w.id)}>
+            {w.label}
+          </button>
+        ))}
+      </div>
+
+      <div className="glass rounded-2xl p-4 mb-4">
+        {loading ? (
+          <div className="text-white/60 text-sm">Loading...</div>
+        ) : !board || board.entries.length === 0 ? (
+          <div className="text-white/60 text-sm">No scores yet. Be the first!</div>
+        ) : (
+          <ol className="space-y-1">
+            {board.entries.map(entry => (
+              <li
+                key={entry.player}
+                className={`flex justify-between text-sm ${
+                  entry.player === player ? 'text-yellow-300 font-bold' : 'text-white'
+                }`}
+              >
+                <span>{entry.rank}. {entry.player}</span>
+                <span>
+                  {entry.score}/{entry.total}
+                  <span className="text-white/50 ml-2">{(entry.ms / 1000).toFixed(1)}s</span>
+                </span>
+              </li>
+            ))}
+          </ol>
+        )}
+      </div>
+
+      <label className="block text-white/70 text-sm mb-1" htmlFor="player-name">
+        Your leaderboard name
+      </label>
+      <input
+        id="player-name"
+        value={player}
+        maxLength={24}
+        placeholder="Enter a name to submit your scores"
+        onChange={(e) => setPlayer(e.target.value)}
+        onBlur={() => setPlayerName(player)}
+        className="w-full px-3 py-2 rounded-xl bg-white/10 text-white placeholder-white/40 outline-none focus:bg-white/20"
+      />
+    </div>
+  )
+}
@@ -1,10 +1,13 @@
 'use client'
 
 import { motion, AnimatePresence } from 'framer-motion'
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import Link from 'next/link'
 import { QuizQuestion } from '@/types/country'
-import { updateGameStats, ACHIEVEMENTS } from '@/lib/storage'
+import { recordAnswer, updateGameStats, ACHIEVEMENTS } from '@/lib/storage'
+import { prefetchFlags, upcomingFlags } from '@/lib/flagPrefetch'
+import { fetchFlagAtlas } from '@/lib/flagAtlas'
+import { submitScore } from '@/lib/leaderboardClient'
 
 interface QuizContainerProps {
   questions: QuizQuestion[]
@@ -12,7 +15,7 @@ interface QuizContainerProps {
   icon: string
   gradientColors: string
   quizMode: 'flags' | 'capitals' | 'population'
-  renderQuestion: (question: QuizQuestion, onAnswer: (isCorrect: boolean) => void) => React.ReactNode
+  renderQuestion: (question: QuizQuestion, onAnswer: (isCorrect: boolean, chosen?: string) => void) => React.ReactNode
 }
 
 export default function QuizContainer({
@@ -33,7 +36,22 @@ export default function QuizContainer({
   const [bestStreak, setBestStreak] = useState(0)
   const [newAchievements, setNewAchievements] = useState<string[]>([])
 
-  const handleAnswer = (isCorrect: boolean) => {
+  const questionShownAt = useRef(Date.now())
+  const gameStartedAt = useRef(Date.now())
+
+  useEffect(() => {
+    gameStartedAt.current = Date.now()
+  }, [questions])
+
+  useEffect(() => {
+    questionShownAt.current = Date.now()
+  }, [currentQuestion, questions])
+
+  const handleAnswer = (isCorrect: boolean, chosen?: string) => {
+    recordAnswer(quizMode, questions[currentQuestion].correct.cca3, isCorrect, {
+      chosen,
+      ms: Date.now() - questionShownAt.current
+    })
     setLastAnswerCorrect(isCorrect)
     setShowFeedback(true)
     setAnswers([...answers, isCorrect])
@@ -64,16 +82,30 @@ export default function QuizContainer({
     }, 1500)
   }
 
+  // Cache the next questions' flags while this one is on screen, unless
+  // the sprite atlas already covers them
+  useEffect(() => {
+    fetchFlagAtlas().then(atlas => prefetchFlags(upcomingFlags(questions, currentQuestion, 3, atlas)))
+  }, [questions, currentQuestion])
+
   // Save stats when quiz is complete
   useEffect(() => {
     if (isComplete && score > 0) {
       const stats = updateGameStats(quizMode, score, questions.length, bestStreak)
       const recentAchievements = stats.achievements.slice(-3)
       setNewAchievements(recentAchievements)
+      submitScore({
+        mode: quizMode,
+        score,
+        total: questions.length,
+        streak: bestStreak,
+        ms: Date.now() - gameStartedAt.current
+      })
     }
   }, [isComplete, score, questions.length, bestStreak, quizMode])
 
   const restartQuiz = () => {
+    gameStartedAt.current = Date.now()
     setCurrentQuestion(0)
     setScore(0)
     setAnswers([])
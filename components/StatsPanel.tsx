@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react'
 import { motion } from 'framer-motion'
 import { getGameStats, ACHIEVEMENTS } from '@/lib/storage'
+import Leaderboard from '@/components/Leaderboard'
 
 export default function StatsPanel() {
   const [stats, setStats] = useState(getGameStats())
@@ -107,6 +108,8 @@ export default function StatsPanel() {
               </div>
             </div>
 
+            <Leaderboard />
+
             {/* Achievements */}
             {stats.achievements.length > 0 && (
               <div>
@@ -3,583 +3,410 @@
 Script to create a Word presentation document for the Country Quiz Game project.
 """
 
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from string import Template
+
+from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-from docx.enum.table import WD_TABLE_ALIGNMENT
 
-def add_heading_with_style(doc, text, level=1):
+from presentation.analytics import analytics_section, load_summary
+from presentation.appendix import appendix_section, load_countries
+from presentation.charts import chart_specs, charts_section, render_charts
+from presentation.docx_writer import (DEFAULT_IMAGE_LEVEL, DEFAULT_LEVEL, BaseTemplate,
+                                      open_document, write_docx)
+from presentation.export import WRITERS
+from presentation.service import DEFAULT_QUEUE
+from presentation.build_cache import (DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_BYTES, ArtifactCache,
+                                      input_digest)
+from presentation.source_stats import collect_facts
+from presentation.spec import DEFAULT_SPEC, compile_spec
+from presentation.tables import add_bulk_table
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(HERE, 'Country_Quiz_Game_Presentation.docx')
+
+ALIGNMENTS = {
+    'left': WD_ALIGN_PARAGRAPH.LEFT,
+    'center': WD_ALIGN_PARAGRAPH.CENTER,
+    'right': WD_ALIGN_PARAGRAPH.RIGHT,
+    'justify': WD_ALIGN_PARAGRAPH.JUSTIFY,
+}
+
+def load_template(path=None):
+    """Read a .docx template (python-docx's default when None) into memory."""
+    if path is None:
+        from docx.api import _default_docx_path
+        path = _default_docx_path()
+    with open(path, 'rb') as f:
+        return f.read()
+
+def add_heading_with_style(doc, text, level=1, align=None):
     """Add a styled heading."""
     heading = doc.add_heading(text, level=level)
+    if align:
+        heading.alignment = ALIGNMENTS[align]
     return heading
 
-def add_styled_paragraph(doc, text, bold=False, italic=False, size=11):
-    """Add a styled paragraph."""
-    para = doc.add_paragraph()
+def add_styled_paragraph(doc, text, bold=False, italic=False, size=11,
+                         font=None, align=None, style=None, space_after=None):
+    """Add a styled paragraph.
+
+    Attributes passed as None are left to the paragraph style.
+    """
+    para = doc.add_paragraph(style=style)
     run = para.add_run(text)
-    run.bold = bold
-    run.italic = italic
-    run.font.size = Pt(size)
+    if bold is not None:
+        run.bold = bold
+    if italic is not None:
+        run.italic = italic
+    if size is not None:
+        run.font.size = Pt(size)
+    if font:
+        run.font.name = font
+    if align:
+        para.alignment = ALIGNMENTS[align]
+    if space_after is not None:
+        para.paragraph_format.space_after = Pt(space_after)
     return para
 
-def create_presentation():
-    """Create the Word presentation document."""
-    doc = Document()
-
-    # ============================================
-    # TITLE PAGE
-    # ============================================
-
-    # Add some space at the top
-    for _ in range(3):
-        doc.add_paragraph()
-
-    # Title
-    title = doc.add_heading('Country Quiz Game', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Subtitle
-    subtitle = doc.add_paragraph()
-    subtitle_run = subtitle.add_run('An Interactive Geography Learning Experience')
-    subtitle_run.font.size = Pt(18)
-    subtitle_run.italic = True
-    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Add spacing
-    doc.add_paragraph()
-    doc.add_paragraph()
-
-    # Project type
-    type_para = doc.add_paragraph()
-    type_run = type_para.add_run('Web Application Project')
-    type_run.font.size = Pt(14)
-    type_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Technology badge
-    tech_para = doc.add_paragraph()
-    tech_run = tech_para.add_run('Built with Next.js 14 | React 18 | TypeScript | Tailwind CSS')
-    tech_run.font.size = Pt(12)
-    tech_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Page break
-    doc.add_page_break()
-
-    # ============================================
-    # TABLE OF CONTENTS
-    # ============================================
-
-    add_heading_with_style(doc, 'Table of Contents', 1)
-
-    toc_items = [
-        '1. Project Overview',
-        '2. Key Features',
-        '3. Technology Stack',
-        '4. Game Modes',
-        '5. Gamification System',
-        '6. User Interface & Design',
-        '7. Technical Architecture',
-        '8. File Structure',
-        '9. Progressive Web App Features',
-        '10. Summary'
-    ]
-
-    for item in toc_items:
-        para = doc.add_paragraph(item)
-        para.paragraph_format.space_after = Pt(6)
-
-    doc.add_page_break()
-
-    # ============================================
-    # 1. PROJECT OVERVIEW
-    # ============================================
-
-    add_heading_with_style(doc, '1. Project Overview', 1)
-
-    add_heading_with_style(doc, 'What is Country Quiz Game?', 2)
-
-    doc.add_paragraph(
-        'The Country Quiz Game is a modern, interactive web application designed to test '
-        'and improve geography knowledge through engaging quiz experiences. It combines '
-        'educational content with gamification elements to make learning about countries, '
-        'capitals, flags, and populations fun and accessible.'
-    )
-
-    add_heading_with_style(doc, 'Project Goals', 2)
-
-    goals = [
-        'Make geography learning engaging and interactive',
-        'Provide multiple quiz modes to test different knowledge areas',
-        'Implement gamification to encourage continued learning',
-        'Ensure accessibility across all devices (desktop, tablet, mobile)',
-        'Enable offline play through Progressive Web App technology'
-    ]
-
-    for goal in goals:
-        doc.add_paragraph(goal, style='List Bullet')
-
-    add_heading_with_style(doc, 'Target Audience', 2)
-
-    doc.add_paragraph(
-        'Students, geography enthusiasts, trivia lovers, and anyone looking to expand '
-        'their knowledge of world geography in an entertaining way.'
-    )
-
-    doc.add_page_break()
-
-    # ============================================
-    # 2. KEY FEATURES
-    # ============================================
-
-    add_heading_with_style(doc, '2. Key Features', 1)
-
-    features = [
-        ('Three Quiz Modes', 'Flag identification, capital cities matching, and population comparison quizzes'),
-        ('Achievement System', '8 unlockable achievements to reward player progress'),
-        ('Statistics Dashboard', 'Track your performance with detailed statistics'),
-        ('Streak System', 'Build consecutive correct answer streaks for bonus excitement'),
-        ('Offline Support', 'Play without internet connection using PWA technology'),
-        ('Responsive Design', 'Beautiful experience on any device size'),
-        ('Animated UI', 'Smooth animations and micro-interactions throughout'),
-        ('Haptic Feedback', 'Physical feedback on mobile devices for correct/incorrect answers'),
-        ('195+ Countries', 'Comprehensive country database from REST Countries API'),
-        ('Smart Questions', 'Intelligent question generation with regional diversity')
-    ]
-
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-
-    # Header row
-    header_cells = table.rows[0].cells
-    header_cells[0].text = 'Feature'
-    header_cells[1].text = 'Description'
-
-    for cell in header_cells:
-        cell.paragraphs[0].runs[0].bold = True
-
-    # Data rows
-    for feature, description in features:
-        row_cells = table.add_row().cells
-        row_cells[0].text = feature
-        row_cells[1].text = description
-
-    doc.add_page_break()
-
-    # ============================================
-    # 3. TECHNOLOGY STACK
-    # ============================================
-
-    add_heading_with_style(doc, '3. Technology Stack', 1)
-
-    add_heading_with_style(doc, 'Frontend Framework', 2)
-
-    frontend_tech = [
-        ('Next.js 14', 'React framework with App Router for routing and server-side rendering'),
-        ('React 18.3', 'UI library for component-based development'),
-        ('TypeScript 5', 'Type-safe JavaScript for better code quality')
-    ]
-
-    for tech, desc in frontend_tech:
-        para = doc.add_paragraph()
-        run = para.add_run(f'{tech}: ')
-        run.bold = True
-        para.add_run(desc)
-
-    add_heading_with_style(doc, 'Styling & Animation', 2)
-
-    styling_tech = [
-        ('Tailwind CSS 3.4', 'Utility-first CSS framework for rapid styling'),
-        ('Framer Motion 11', 'Advanced animations and micro-interactions'),
-        ('PostCSS & Autoprefixer', 'CSS preprocessing and browser compatibility')
-    ]
-
-    for tech, desc in styling_tech:
-        para = doc.add_paragraph()
-        run = para.add_run(f'{tech}: ')
-        run.bold = True
-        para.add_run(desc)
-
-    add_heading_with_style(doc, 'Data & APIs', 2)
-
-    doc.add_paragraph(
-        'REST Countries API (v3.1): Provides real-time data for 195+ countries including '
-        'names, capitals, populations, flags, and regional information. The application '
-        'implements server-side caching with 1-hour expiration to optimize API usage.'
-    )
-
-    add_heading_with_style(doc, 'Development Tools', 2)
-
-    dev_tools = ['ESLint for code quality', 'TypeScript strict mode', 'Path aliasing for clean imports']
-    for tool in dev_tools:
-        doc.add_paragraph(tool, style='List Bullet')
-
-    doc.add_page_break()
-
-    # ============================================
-    # 4. GAME MODES
-    # ============================================
-
-    add_heading_with_style(doc, '4. Game Modes', 1)
-
-    add_heading_with_style(doc, 'Flag Master Mode', 2)
-    doc.add_paragraph(
-        'Players are shown a country flag and must identify the correct country name '
-        'from four multiple-choice options. The game uses smart selection to favor '
-        'well-known countries and generates wrong answers from similar regions to '
-        'increase challenge.'
-    )
-
-    add_heading_with_style(doc, 'Capital Cities Mode', 2)
-    doc.add_paragraph(
-        'A country name is displayed, and players must select the correct capital city '
-        'from four options. Only countries with complete capital data are included. '
-        'This mode tests knowledge of world capitals and their associated countries.'
-    )
-
-    add_heading_with_style(doc, 'Population Quiz Mode', 2)
-    doc.add_paragraph(
-        'Two countries are shown side-by-side, and players must determine which has '
-        'the larger population. This binary choice format provides a different style '
-        'of gameplay while teaching about relative country sizes.'
-    )
-
-    add_heading_with_style(doc, 'Game Flow', 2)
-
-    flow_steps = [
-        'Select quiz mode from home screen',
-        'Answer 10 questions per quiz',
-        'Receive immediate feedback (1.5 seconds) after each answer',
-        'Experience haptic vibration on mobile devices',
-        'View results screen with score and personalized message',
-        'Stats automatically saved and achievements checked'
-    ]
-
-    for i, step in enumerate(flow_steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-
-    doc.add_page_break()
-
-    # ============================================
-    # 5. GAMIFICATION SYSTEM
-    # ============================================
-
-    add_heading_with_style(doc, '5. Gamification System', 1)
-
-    add_heading_with_style(doc, 'Achievement System (8 Total)', 2)
-
-    achievements = [
-        ('First Steps', 'Complete your first quiz'),
-        ('Perfect Score', 'Get 10/10 in a quiz'),
-        ('Veteran', 'Complete 10 quizzes'),
-        ('Expert', 'Complete 50 quizzes'),
-        ('On Fire', 'Get 5 consecutive correct answers'),
-        ('Unstoppable', 'Get 10 consecutive correct answers'),
-        ('Scholar', 'Score 8 or more in a quiz'),
-        ('Genius', 'Score 9 or more in a quiz')
-    ]
-
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-
-    header_cells = table.rows[0].cells
-    header_cells[0].text = 'Achievement'
-    header_cells[1].text = 'Requirement'
-
-    for cell in header_cells:
-        cell.paragraphs[0].runs[0].bold = True
-
-    for achievement, requirement in achievements:
-        row_cells = table.add_row().cells
-        row_cells[0].text = achievement
-        row_cells[1].text = requirement
-
-    doc.add_paragraph()
-
-    add_heading_with_style(doc, 'Streak System', 2)
-    doc.add_paragraph(
-        'The streak system tracks consecutive correct answers. When a streak of 2 or more '
-        'is achieved, a visual indicator appears that scales and pulses with flame animations. '
-        'The best streak is saved across sessions, encouraging players to beat their record.'
-    )
-
-    add_heading_with_style(doc, 'Statistics Dashboard', 2)
-
-    stats = [
-        'Total games played across all modes',
-        'Cumulative score from all quizzes',
-        'High scores per quiz mode (flags, capitals, population)',
-        'Best streak (all-time consecutive correct answers)',
-        'Achievement progress (X/8 unlocked)'
-    ]
-
-    for stat in stats:
-        doc.add_paragraph(stat, style='List Bullet')
-
-    doc.add_page_break()
-
-    # ============================================
-    # 6. USER INTERFACE & DESIGN
-    # ============================================
-
-    add_heading_with_style(doc, '6. User Interface & Design', 1)
-
-    add_heading_with_style(doc, 'Design Philosophy', 2)
-    doc.add_paragraph(
-        'The application employs a modern glassmorphism design language with animated '
-        'gradient backgrounds, creating a visually appealing and immersive experience. '
-        'The design is mobile-first, ensuring optimal usability on all screen sizes.'
-    )
-
-    add_heading_with_style(doc, 'Visual Elements', 2)
-
-    visuals = [
-        ('Glassmorphism', 'Semi-transparent cards with blur effects and subtle borders'),
-        ('Animated Gradient', '4-color gradient background with smooth animation'),
-        ('Framer Motion', 'Page transitions, button hover effects, streak pulses'),
-        ('Floating Particles', 'Background particles for added visual depth'),
-        ('Progress Bar', 'Animated question progress indicator')
-    ]
-
-    for element, desc in visuals:
-        para = doc.add_paragraph()
-        run = para.add_run(f'{element}: ')
-        run.bold = True
-        para.add_run(desc)
-
-    add_heading_with_style(doc, 'Micro-Interactions', 2)
-
-    interactions = [
-        'Button scale on hover (1.05x) and press (0.95x)',
-        'Question slide animations (left/right entrance)',
-        'Achievement pop-in with cascade delay',
-        'Icon rotation effects',
-        'Loading spinners with animation'
-    ]
-
-    for interaction in interactions:
-        doc.add_paragraph(interaction, style='List Bullet')
-
-    add_heading_with_style(doc, 'Haptic Feedback', 2)
-    doc.add_paragraph(
-        'On devices that support vibration, the app provides tactile feedback: '
-        'a short 50ms pulse for correct answers, and a pattern (100ms-50ms-100ms) '
-        'for incorrect answers, enhancing the mobile gaming experience.'
-    )
-
-    doc.add_page_break()
-
-    # ============================================
-    # 7. TECHNICAL ARCHITECTURE
-    # ============================================
-
-    add_heading_with_style(doc, '7. Technical Architecture', 1)
-
-    add_heading_with_style(doc, 'Component Architecture', 2)
-    doc.add_paragraph(
-        'The application follows a component-based architecture with clear separation '
-        'of concerns. Reusable components are stored in the /components directory, '
-        'utility functions in /lib, and type definitions in /types.'
-    )
-
-    add_heading_with_style(doc, 'Key Components', 2)
-
-    components = [
-        ('QuizContainer', 'Core game engine handling question progression, scoring, and feedback'),
-        ('StatsPanel', 'Statistics dashboard modal displaying player progress'),
-        ('PWAInstall', 'Progressive Web App installation prompt component')
-    ]
-
-    for comp, desc in components:
-        para = doc.add_paragraph()
-        run = para.add_run(f'{comp}: ')
-        run.bold = True
-        para.add_run(desc)
-
-    add_heading_with_style(doc, 'State Management', 2)
-    doc.add_paragraph(
-        'The application uses React hooks (useState, useEffect) for component state '
-        'and localStorage for persistent data storage. Game statistics, achievements, '
-        'and high scores are automatically saved to the browser\'s local storage.'
-    )
-
-    add_heading_with_style(doc, 'API Integration', 2)
-    doc.add_paragraph(
-        'A Next.js API route (/api/countries) handles communication with the REST '
-        'Countries API. Server-side caching with 1-hour expiration optimizes performance '
-        'and reduces external API calls. The client also caches questions in memory.'
-    )
-
-    add_heading_with_style(doc, 'Error Handling', 2)
-
-    error_features = [
-        'Graceful error screens with retry functionality',
-        'Fallback to cached data when API fails',
-        'User-friendly error messages',
-        'Loading states with animated indicators'
-    ]
-
-    for feature in error_features:
-        doc.add_paragraph(feature, style='List Bullet')
-
-    doc.add_page_break()
-
-    # ============================================
-    # 8. FILE STRUCTURE
-    # ============================================
-
-    add_heading_with_style(doc, '8. File Structure', 1)
-
-    structure = """
-/country_quiz_game
-├── /app                        # Next.js App Router
-│   ├── page.tsx               # Home page with quiz mode selection
-│   ├── layout.tsx             # Root layout with PWA setup
-│   ├── globals.css            # Global styles
-│   └── /quiz                  # Quiz mode pages
-│       ├── /flags/page.tsx    # Flag identification quiz
-│       ├── /capitals/page.tsx # Capital city quiz
-│       └── /population/page.tsx # Population quiz
-│   └── /api/countries/route.ts # Backend API route
-│
-├── /components                 # Reusable React components
-│   ├── QuizContainer.tsx      # Main quiz logic
-│   ├── StatsPanel.tsx         # Statistics dashboard
-│   └── PWAInstall.tsx         # PWA installation prompt
-│
-├── /lib                        # Utility functions
-│   ├── countries.ts           # Question generation
-│   └── storage.ts             # LocalStorage management
-│
-├── /types                      # TypeScript interfaces
-│   └── country.ts             # Type definitions
-│
-├── /public                     # Static assets
-│   ├── manifest.json          # PWA manifest
-│   ├── sw.js                  # Service Worker
-│   └── /icons/                # App icons
-│
-└── Configuration Files
-    ├── package.json           # Dependencies
-    ├── tsconfig.json          # TypeScript config
-    ├── tailwind.config.ts     # Tailwind config
-    └── next.config.js         # Next.js config
-"""
-
+def add_definition(doc, term, description):
+    """Add a 'Term: description' paragraph with the term in bold."""
     para = doc.add_paragraph()
-    run = para.add_run(structure)
-    run.font.name = 'Courier New'
-    run.font.size = Pt(9)
-
-    doc.add_page_break()
-
-    # ============================================
-    # 9. PROGRESSIVE WEB APP FEATURES
-    # ============================================
-
-    add_heading_with_style(doc, '9. Progressive Web App Features', 1)
-
-    add_heading_with_style(doc, 'Offline Capability', 2)
-    doc.add_paragraph(
-        'The application includes a Service Worker that enables offline play. '
-        'Once installed, users can enjoy the quiz even without an internet connection, '
-        'making it perfect for learning on-the-go.'
-    )
-
-    add_heading_with_style(doc, 'Installation', 2)
-    doc.add_paragraph(
-        'Users can install the app to their device\'s home screen for a native-like '
-        'experience. The PWAInstall component detects installation eligibility and '
-        'prompts users to add the app to their device.'
-    )
-
-    add_heading_with_style(doc, 'App Shortcuts', 2)
-    doc.add_paragraph(
-        'The PWA manifest includes shortcuts that allow users to launch directly '
-        'into specific quiz modes from their device\'s home screen or app launcher.'
-    )
-
-    add_heading_with_style(doc, 'PWA Features Summary', 2)
-
-    pwa_features = [
-        'Service Worker for asset caching and offline support',
-        'Web App Manifest with app metadata and icons',
-        'Standalone display mode (no browser chrome)',
-        'Custom theme colors matching app design',
-        'Maskable icons for Android adaptive icons',
-        'Quick-launch shortcuts to quiz modes'
-    ]
-
-    for feature in pwa_features:
-        doc.add_paragraph(feature, style='List Bullet')
-
-    doc.add_page_break()
-
-    # ============================================
-    # 10. SUMMARY
-    # ============================================
-
-    add_heading_with_style(doc, '10. Summary', 1)
-
-    doc.add_paragraph(
-        'The Country Quiz Game is a comprehensive, modern web application that '
-        'demonstrates best practices in React development with Next.js. It combines '
-        'educational content with engaging gamification to create an enjoyable '
-        'geography learning experience.'
-    )
-
-    add_heading_with_style(doc, 'Technical Highlights', 2)
-
-    highlights = [
-        'Built with Next.js 14 App Router and React 18',
-        'Full TypeScript implementation with strict mode',
-        'Tailwind CSS for responsive, utility-first styling',
-        'Framer Motion for smooth animations',
-        'Progressive Web App with offline support',
-        'REST Countries API integration with smart caching',
-        'Comprehensive gamification system'
-    ]
-
-    for highlight in highlights:
-        doc.add_paragraph(highlight, style='List Bullet')
-
-    add_heading_with_style(doc, 'Key Statistics', 2)
-
-    stats_table = doc.add_table(rows=1, cols=2)
-    stats_table.style = 'Table Grid'
-
-    header_cells = stats_table.rows[0].cells
-    header_cells[0].text = 'Metric'
-    header_cells[1].text = 'Value'
-
-    for cell in header_cells:
-        cell.paragraphs[0].runs[0].bold = True
-
-    stats_data = [
-        ('Quiz Modes', '3'),
-        ('Countries in Database', '195+'),
-        ('Achievements', '8'),
-        ('Questions per Quiz', '10'),
-        ('Technology Stack', 'Next.js, React, TypeScript, Tailwind')
-    ]
-
-    for metric, value in stats_data:
-        row_cells = stats_table.add_row().cells
-        row_cells[0].text = metric
-        row_cells[1].text = value
-
-    doc.add_paragraph()
-
-    # Final note
-    final = doc.add_paragraph()
-    final_run = final.add_run(
-        'This project showcases the power of modern web technologies to create '
-        'engaging, educational experiences that work seamlessly across all devices.'
-    )
-    final_run.italic = True
+    run = para.add_run(f'{term}: ')
+    run.bold = True
+    para.add_run(description)
+    return para
+
+def add_table(doc, header, rows):
+    """Add a 'Table Grid' table with a bold header row."""
+    return add_bulk_table(doc, header, rows, style='Table Grid')
+
+def render_ir(doc, ir, content, profiler=None):
+    """Render every section of a compiled spec into `doc`."""
+    for name, ops in ir['sections']:
+        if profiler is None:
+            render_ops(doc, ops, content)
+        else:
+            with profiler.section(name):
+                render_ops(doc, ops, content)
+
+def _filler(content):
+    if content is None:
+        return lambda text: text
+    return lambda text: Template(text).safe_substitute(content) if '$' in text else text
+
+def render_ops(doc, ops, content):
+    """Render one section's ops, filling ${placeholders} from `content`.
+
+    Ops that are already resolved (see build_document) pass None.
+    """
+    fill = _filler(content)
+
+    for op in ops:
+        kind = op[0]
+        if kind == 'paragraph':
+            _, text, bold, italic, size, font, align, style, space_after = op
+            add_styled_paragraph(doc, fill(text), bold=bold, italic=italic, size=size,
+                                 font=font, align=align, style=style,
+                                 space_after=space_after)
+        elif kind == 'heading':
+            add_heading_with_style(doc, fill(op[1]), op[2], op[3])
+        elif kind == 'definition':
+            add_definition(doc, fill(op[1]), fill(op[2]))
+        elif kind == 'table':
+            add_table(doc, [fill(c) for c in op[1]], ([fill(c) for c in row] for row in op[2]))
+        elif kind == 'data_table':
+            add_table(doc, op[1], op[2])
+        elif kind == 'picture':
+            doc.add_picture(op[1], width=Inches(op[2]))
+        elif kind == 'spacer':
+            for _ in range(op[1]):
+                doc.add_paragraph()
+        elif kind == 'page_break':
+            doc.add_page_break()
+        else:
+            raise ValueError(f'Unknown render op {kind!r}')
+
+def resolve_ops(ops, content):
+    """Yield `ops` with placeholders filled and table rows materialised."""
+    fill = _filler(content)
+    for op in ops:
+        kind = op[0]
+        if kind == 'paragraph':
+            yield (kind, fill(op[1])) + op[2:]
+        elif kind == 'heading':
+            yield (kind, fill(op[1])) + op[2:]
+        elif kind == 'definition':
+            yield (kind, fill(op[1]), fill(op[2]))
+        elif kind == 'table':
+            yield ('table', tuple(fill(c) for c in op[1]),
+                   tuple(tuple(fill(c) for c in row) for row in op[2]))
+        elif kind == 'data_table':
+            yield ('data_table', tuple(op[1]), tuple(tuple(str(c) for c in row) for row in op[2]))
+        else:
+            yield op
+
+def build_document(overrides=None, spec=DEFAULT_SPEC, ir=None, countries=None, facts=None,
+                   analytics=None, charts=None, profiler=None):
+    """Build the document model every output format is rendered from.
+
+    Takes the arguments of create_presentation and returns {'meta': content,
+    'sections': ((name, ops), ...)} with the extra sections added, every
+    placeholder filled and every table materialised. It is built once per
+    run and only read afterwards, so backends can share it.
+    """
+    stage = profiler.section if profiler is not None else _no_profile
+    with stage('Load spec'):
+        if ir is None:
+            ir = compile_spec(spec)
+    sections = ir['sections']
+    if charts:
+        sections += (charts_section(charts),)
+    if analytics:
+        sections += (analytics_section(analytics),)
+    if countries:
+        sections += (appendix_section(countries),)
+
+    if facts is None:
+        with stage('Derive facts'):
+            facts = collect_facts()
+
+    content = dict(ir['meta'])
+    content.update((k, v) for k, v in facts.items() if k in content)
+    if overrides:
+        unknown = set(overrides) - set(content)
+        if unknown:
+            raise ValueError(f'Unknown content overrides: {", ".join(sorted(unknown))}')
+        content.update(overrides)
+
+    with stage('Resolve'):
+        sections = tuple((name, tuple(resolve_ops(ops, content))) for name, ops in sections)
+    return {'meta': content, 'sections': sections}
+
+def render_docx(document, output, template=None, profiler=None, level=DEFAULT_LEVEL,
+                image_level=DEFAULT_IMAGE_LEVEL, parts=None):
+    """Render a document model (see build_document) to .docx.
+
+    `output` is a path or a writable binary stream such as a BytesIO or a
+    socket file. `template` is raw .docx bytes or a
+    presentation.docx_writer.BaseTemplate, parsed once and copied for each
+    call. `level` and `image_level` are the zlib levels of the XML and image
+    parts, and a PartCache as `parts` reuses parts compressed by earlier calls.
+    """
+    stage = profiler.section if profiler is not None else _no_profile
+    with stage('Load template'):
+        if isinstance(template, BaseTemplate):
+            doc = template.document()
+        else:
+            doc = open_document(template)
+    render_ir(doc, document, None, profiler)
 
     # Save the document
-    doc.save('/home/user/country_quiz_game/Country_Quiz_Game_Presentation.docx')
-    print('Presentation created successfully: Country_Quiz_Game_Presentation.docx')
+    with stage('Save'):
+        write_docx(doc, output, level, image_level, parts)
+    return output
+
+def create_presentation(output_path=DEFAULT_OUTPUT, overrides=None, template=None,
+                        spec=DEFAULT_SPEC, ir=None, countries=None, facts=None,
+                        analytics=None, charts=None, profiler=None):
+    """Create the Word presentation document.
+
+    `overrides` replaces entries of the spec's "meta" block, `template` is the
+    raw bytes of a .docx to start from (see load_template) or a BaseTemplate,
+    and `ir` is an already compiled spec, which skips loading `spec`. When `countries` (a
+    list of REST Countries records) is given, a reference table of them is
+    appended. `facts` fills spec placeholders with values derived from the
+    app source (see presentation.source_stats) and is collected when None.
+    `analytics`, a summary written by tools/analytics.py, adds gameplay
+    tables before the appendix, and `charts`, chart records returned by
+    presentation.charts.render_charts, embeds the chart images before those.
+    A presentation.profiling.SectionProfiler passed as `profiler` records
+    each stage of the build.
+    """
+    document = build_document(overrides, spec, ir, countries, facts, analytics, charts, profiler)
+    return render_docx(document, output_path, template, profiler)
+
+def output_writer(path, template=None, profiler=None):
+    """Return writer(document, path) for the format named by `path`'s extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.docx':
+        return lambda document, output: render_docx(document, output, template, profiler)
+    if ext in WRITERS:
+        return WRITERS[ext]
+    supported = ', '.join(['.docx'] + sorted(WRITERS))
+    raise ValueError(f'Unsupported output format {ext or path!r} (expected {supported})')
+
+def export_presentation(outputs, overrides=None, template=None, spec=DEFAULT_SPEC, ir=None,
+                        countries=None, facts=None, analytics=None, charts=None,
+                        profiler=None):
+    """Render one document model to every path in `outputs`, by extension.
+
+    Takes the arguments of create_presentation. The model is built once and
+    the backends run concurrently in threads, all reading the same tree.
+    """
+    if profiler is not None and len(outputs) > 1:
+        raise ValueError('Profiling needs a single output')
+    writers = [(path, output_writer(path, template, profiler)) for path in outputs]
+    document = build_document(overrides, spec, ir, countries, facts, analytics, charts, profiler)
+    if len(writers) == 1:
+        path, writer = writers[0]
+        return [writer(document, path)]
+    with ThreadPoolExecutor(max_workers=len(writers)) as pool:
+        futures = [pool.submit(writer, document, path) for path, writer in writers]
+        return [future.result() for future in futures]
+
+@contextmanager
+def _no_profile(_name):
+    yield
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-o', '--output', action='append',
+                        help='where to write the deck; repeat for several formats, chosen by '
+                             'extension: .docx, .html (print-ready for PDF) or .md '
+                             f'(default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--template', help='.docx file to use as the base template')
+    parser.add_argument('--spec', default=DEFAULT_SPEC,
+                        help='section spec to render (default: %(default)s)')
+    parser.add_argument('--countries', metavar='JSON',
+                        help='append a country reference table from a REST Countries snapshot')
+    parser.add_argument('--analytics', metavar='SUMMARY',
+                        help='add gameplay tables from a tools/analytics.py summary')
+    parser.add_argument('--charts', action='store_true',
+                        help='embed charts of the --countries and --analytics data')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='time each section and the save step; writes JSON, or folded '
+                             'flamegraph stacks when REPORT ends in .folded')
+    parser.add_argument('--cprofile', metavar='PSTATS',
+                        help='dump cProfile stats for the whole run to this file')
+    parser.add_argument('--force', action='store_true',
+                        help='always re-render, even when a cached build with the same inputs exists')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help='size bound of the build cache (default: %(default)s)')
+    parser.add_argument('--cache-max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help='age bound of build cache entries (default: %(default)s)')
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help='render every variant listed in a JSON manifest')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='process pool size for --batch, --serve and --charts '
+                             '(default: CPU count)')
+    parser.add_argument('--report', help='write the --batch timing report to this JSON file')
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help='serve decks rendered on request at /report (see presentation.service)')
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE,
+                        help='--serve requests that may wait for a worker before the service '
+                             'answers 503 (default: %(default)s)')
+    parser.add_argument('--compress-level', type=int, choices=range(10), default=DEFAULT_LEVEL,
+                        metavar='0-9', help='zlib level of the XML parts of --serve .docx '
+                                            'responses, 0 stores (default: %(default)s)')
+    parser.add_argument('--image-level', type=int, choices=range(10), default=DEFAULT_IMAGE_LEVEL,
+                        metavar='0-9', help='zlib level of the images embedded in --serve '
+                                            '.docx responses (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.cprofile:
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(_run, args)
+        finally:
+            profile.dump_stats(args.cprofile)
+    return _run(args)
+
+def _run(args):
+    cache = ArtifactCache(max_bytes=int(args.cache_max_mb * 2**20),
+                          max_age_days=args.cache_max_age_days)
+    outputs = args.output or [DEFAULT_OUTPUT]
+    try:
+        for path in outputs:
+            output_writer(path)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    if args.profile and len(outputs) > 1:
+        raise SystemExit('--profile needs a single --output')
+
+    if args.serve:
+        from presentation.service import parse_address, serve
+        try:
+            address = parse_address(args.serve)
+        except ValueError:
+            raise SystemExit(f'--serve expects [HOST:]PORT, got {args.serve!r}')
+        try:
+            return serve(address, template=args.template, spec=args.spec,
+                         countries=args.countries, analytics=args.analytics, charts=args.charts,
+                         workers=args.workers, queue=args.queue, level=args.compress_level,
+                         image_level=args.image_level)
+        except ValueError as error:
+            raise SystemExit(str(error))
+
+    if args.batch:
+        from presentation.batch import load_manifest, render_batch, write_report
+        manifest = load_manifest(args.batch)
+        template = args.template or manifest.get('template')
+        countries = args.countries or manifest.get('countries')
+        analytics = args.analytics or manifest.get('analytics')
+        report = render_batch(manifest['variants'], template=template, spec=args.spec,
+                              countries=countries, analytics=analytics,
+                              charts=args.charts or manifest.get('charts', False),
+                              workers=args.workers, cache=cache, force=args.force)
+        write_report(report, args.report)
+        return 0 if not report['failed'] else 1
+
+    facts = collect_facts()
+    countries = load_countries(args.countries) if args.countries else None
+    analytics = load_summary(args.analytics) if args.analytics else None
+    # Chart digests are part of the inputs, so charts are brought up to date
+    # before the cache lookup; unchanged ones are not re-rendered
+    charts = None
+    extra = facts
+    if args.charts:
+        specs = chart_specs(countries, analytics)
+        if not specs:
+            raise SystemExit('--charts needs --countries and/or --analytics data to plot')
+        charts = render_charts(specs, workers=args.workers)
+        extra = [facts, [chart['digest'] for chart in charts]]
+        drawn = sum(1 for chart in charts if not chart['cached'])
+        print(f'Charts: {drawn} rendered, {len(charts) - drawn} cached')
+
+    digest = input_digest(args.spec, args.template, [args.countries, args.analytics],
+                          extra=extra)
+    # One artifact per format under the same digest
+    caches = {path: ArtifactCache(cache.directory, cache.max_bytes, args.cache_max_age_days,
+                                  suffix=os.path.splitext(path)[1].lower())
+              for path in outputs}
+    pending = []
+    for path in outputs:
+        if not (args.force or args.profile) and caches[path].fetch(digest, path):
+            print(f'Presentation up to date (cached): {os.path.basename(path)}')
+        else:
+            pending.append(path)
+    if not pending:
+        return 0
+
+    template = load_template(args.template) if args.template else None
+
+    if not args.profile:
+        paths = export_presentation(pending, template=template, spec=args.spec,
+                                    countries=countries, facts=facts, analytics=analytics,
+                                    charts=charts)
+    else:
+        from presentation.profiling import SectionProfiler
+        with SectionProfiler() as profiler:
+            paths = export_presentation(pending, template=template, spec=args.spec,
+                                        countries=countries, facts=facts,
+                                        analytics=analytics, charts=charts,
+                                        profiler=profiler)
+        profiler.write(args.profile)
+
+    for path in paths:
+        caches[path].store(digest, path)
+        print(f'Presentation created successfully: {os.path.basename(path)}')
+    if args.profile:
+        print(profiler.summary())
+    return 0
 
 if __name__ == '__main__':
-    create_presentation()
+    raise SystemExit(main())
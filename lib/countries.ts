@@ -1,16 +1,30 @@
 import { Country, QuizQuestion } from '@/types/country'
+import { Difficulty, DistractorIndex } from '@/lib/distractors'
+import { Random, SamplingEngine, getSamplingEngine, sampleIndices } from '@/lib/sampling'
 
 const COUNTRIES_API = '/api/countries'
+const QUIZ_API = '/api/quiz'
+const DISTRACTORS_URL = '/distractors.json'
 
-let cachedCountries: Country[] | null = null
+// Field projections each quiz needs from /api/countries (see
+// lib/countryPayloads.ts), which keeps the payloads small on mobile
+export const QUIZ_FIELDS = {
+  flag: 'cca2,cca3,flags.png,name.common,population,region',
+  capital: 'capital,cca3,name.common,population,region',
+  population: 'cca3,name.common,population,region'
+}
+
+const cachedCountries = new Map<string, Country[]>()
+let cachedDistractors: DistractorIndex | null | undefined
 
-export async function fetchCountries(): Promise<Country[]> {
-  if (cachedCountries) {
-    return cachedCountries
+export async function fetchCountries(fields: string = ''): Promise<Country[]> {
+  const cached = cachedCountries.get(fields)
+  if (cached) {
+    return cached
   }
 
   try {
-    const response = await fetch(COUNTRIES_API)
+    const response = await fetch(fields ? `${COUNTRIES_API}?fields=${fields}` : COUNTRIES_API)
 
     if (!response.ok) {
       throw new Error(`API returned ${response.status}`)
@@ -25,59 +39,119 @@ export async function fetchCountries(): Promise<Country[]> {
     }
 
     // Filter out countries without essential data
-    cachedCountries = data.filter((country: Country) =>
+    const needsFlag = !fields || fields.split(',').some(field => field.startsWith('flags'))
+    const countries = data.filter((country: Country) =>
       country.name?.common &&
-      country.flags?.png &&
+      (!needsFlag || country.flags?.png) &&
       country.population > 0
     )
+    cachedCountries.set(fields, countries)
 
-    return cachedCountries || []
+    return countries
   } catch (error) {
     console.error('Error fetching countries:', error)
     return []
   }
 }
 
-export function shuffleArray<T>(array: T[]): T[] {
+// Precomputed nearest-neighbour distractors (see tools/distractors.py), or
+// null when the index has not been built
+export async function fetchDistractorIndex(): Promise<DistractorIndex | null> {
+  if (cachedDistractors !== undefined) {
+    return cachedDistractors
+  }
+
+  try {
+    const response = await fetch(DISTRACTORS_URL)
+    cachedDistractors = response.ok ? new DistractorIndex(await response.json()) : null
+  } catch (error) {
+    console.error('Error fetching distractor index:', error)
+    cachedDistractors = null
+  }
+  return cachedDistractors
+}
+
+export function shuffleArray<T>(array: T[], random: Random = Math.random): T[] {
   const newArray = [...array]
   for (let i = newArray.length - 1; i > 0; i--) {
-    const j = Math.floor(Math.random() * (i + 1));
+    const j = Math.floor(random() * (i + 1));
     [newArray[i], newArray[j]] = [newArray[j], newArray[i]]
   }
   return newArray
 }
 
-export function getRandomCountries(countries: Country[], count: number): Country[] {
-  const shuffled = shuffleArray(countries)
-  return shuffled.slice(0, count)
+export function getRandomCountries(countries: Country[], count: number, random: Random = Math.random): Country[] {
+  return sampleIndices(countries.length, count, random).map(i => countries[i])
 }
 
-export async function generateFlagQuestions(numberOfQuestions: number = 10): Promise<QuizQuestion[]> {
-  const countries = await fetchCountries()
+export interface QuestionOptions {
+  random?: Random
+  distractors?: DistractorIndex | null
+  difficulty?: Difficulty
+}
 
-  // Prioritize well-known countries for better gameplay
-  const popularCountries = countries.filter(c =>
-    c.population > 5_000_000 || c.name.common.length <= 12
-  )
+// Wrong answers that favour the correct country's region, drawn from the
+// region's pool and from the whole list. The original filter accepted
+// other-region countries half of the time; the split below keeps the odds
+// of a region-mate it gave.
+function pickRegionalWrongOptions(
+  engine: SamplingEngine,
+  correct: Country,
+  count: number,
+  random: Random
+): Country[] {
+  const region = engine.region(correct.region)
+  const mates = region ? region.size - 1 : 0
+  const others = engine.all.size - 1 - mates
+  const regionShare = mates + others > 0 ? mates / (mates + others / 2) : 0
+  let fromRegion = 0
+  for (let i = 0; i < count; i++) {
+    if (random() < regionShare) fromRegion++
+  }
+
+  const taken = new Set([correct.cca3])
+  const wrongOptions = region ? region.sample(fromRegion, random, c => taken.has(c.cca3)) : []
+  wrongOptions.forEach(c => taken.add(c.cca3))
+  const outside = engine.all.sample(count - wrongOptions.length, random,
+    c => taken.has(c.cca3) || c.region === correct.region)
+  outside.forEach(c => taken.add(c.cca3))
+  wrongOptions.push(...outside)
+  // Too few countries outside the region: top up from anywhere
+  if (wrongOptions.length < count) {
+    wrongOptions.push(...engine.all.sample(count - wrongOptions.length, random, c => taken.has(c.cca3)))
+  }
+  return wrongOptions
+}
+
+export function buildFlagQuestions(
+  engine: SamplingEngine,
+  numberOfQuestions: number = 10,
+  { random = Math.random, distractors = null, difficulty = 'hard' }: QuestionOptions = {}
+): QuizQuestion[] {
+  const byCode = distractors ? new Map(engine.source.map(c => [c.cca3, c])) : null
 
-  const sourceCountries = popularCountries.length >= numberOfQuestions
-    ? popularCountries
-    : countries
+  // Prioritize well-known countries for better gameplay
+  const sourceCountries = engine.popular.size >= numberOfQuestions
+    ? engine.popular
+    : engine.all
 
   const questions: QuizQuestion[] = []
-  const selectedCountries = getRandomCountries(sourceCountries, numberOfQuestions)
+  const selectedCountries = sourceCountries.sample(numberOfQuestions, random)
 
   for (const correct of selectedCountries) {
-    // Get wrong options from similar regions for more challenging questions
-    const wrongOptions = getRandomCountries(
-      countries.filter(c =>
-        c.cca3 !== correct.cca3 &&
-        (c.region === correct.region || Math.random() > 0.5)
-      ),
-      3
-    )
+    // Prefer the most similar countries from the distractor index
+    const similar = distractors && byCode
+      ? distractors.pick(correct.cca3, difficulty, 3, random)
+        .map(code => byCode.get(code))
+        .filter((c): c is Country => c !== undefined)
+      : []
+
+    // Otherwise get wrong options from similar regions for more challenging questions
+    const wrongOptions = similar.length === 3
+      ? similar
+      : pickRegionalWrongOptions(engine, correct, 3, random)
 
-    const options = shuffleArray([correct, ...wrongOptions])
+    const options = shuffleArray([correct, ...wrongOptions], random)
 
     questions.push({
       correct,
@@ -89,20 +163,18 @@ export async function generateFlagQuestions(numberOfQuestions: number = 10): Pro
   return questions
 }
 
-export async function generateCapitalQuestions(numberOfQuestions: number = 10): Promise<QuizQuestion[]> {
-  const countries = await fetchCountries()
-  const countriesWithCapitals = countries.filter(c => c.capital && c.capital.length > 0)
+export function buildCapitalQuestions(
+  engine: SamplingEngine,
+  numberOfQuestions: number = 10,
+  { random = Math.random }: QuestionOptions = {}
+): QuizQuestion[] {
   const questions: QuizQuestion[] = []
-
-  const selectedCountries = getRandomCountries(countriesWithCapitals, numberOfQuestions)
+  const selectedCountries = engine.withCapitals.sample(numberOfQuestions, random)
 
   for (const correct of selectedCountries) {
-    const wrongOptions = getRandomCountries(
-      countriesWithCapitals.filter(c => c.cca3 !== correct.cca3),
-      3
-    )
+    const wrongOptions = engine.withCapitals.sample(3, random, c => c.cca3 === correct.cca3)
 
-    const options = shuffleArray([correct, ...wrongOptions])
+    const options = shuffleArray([correct, ...wrongOptions], random)
 
     questions.push({
       correct,
@@ -114,14 +186,18 @@ export async function generateCapitalQuestions(numberOfQuestions: number = 10):
   return questions
 }
 
-export async function generatePopulationQuestions(numberOfQuestions: number = 10): Promise<QuizQuestion[]> {
-  const countries = await fetchCountries()
+export function buildPopulationQuestions(
+  engine: SamplingEngine,
+  numberOfQuestions: number = 10,
+  { random = Math.random }: QuestionOptions = {}
+): QuizQuestion[] {
   const questions: QuizQuestion[] = []
 
-  const selectedCountries = getRandomCountries(countries, numberOfQuestions * 2)
+  const selectedCountries = engine.all.sample(numberOfQuestions * 2, random)
 
-  for (let i = 0; i < numberOfQuestions; i++) {
-    const [country1, country2] = selectedCountries.slice(i * 2, i * 2 + 2)
+  for (let i = 0; i + 1 < selectedCountries.length && questions.length < numberOfQuestions; i += 2) {
+    const country1 = selectedCountries[i]
+    const country2 = selectedCountries[i + 1]
     const correct = country1.population > country2.population ? country1 : country2
     const options = [country1, country2]
 
@@ -135,6 +211,57 @@ export async function generatePopulationQuestions(numberOfQuestions: number = 10
   return questions
 }
 
+// A quiz generated on the server (see app/api/quiz), or null when the
+// endpoint is unavailable. Pass seed 'daily' for the daily challenge.
+export async function fetchQuiz(
+  mode: QuizQuestion['type'],
+  numberOfQuestions: number = 10,
+  seed?: number | 'daily'
+): Promise<QuizQuestion[] | null> {
+  try {
+    const params = new URLSearchParams({ mode, n: String(numberOfQuestions) })
+    if (seed !== undefined) params.set('seed', String(seed))
+    const response = await fetch(`${QUIZ_API}?${params}`)
+
+    if (!response.ok) {
+      throw new Error(`API returned ${response.status}`)
+    }
+    const { questions } = await response.json()
+    return Array.isArray(questions) && questions.length > 0 ? questions : null
+  } catch (error) {
+    console.error('Error fetching quiz:', error)
+    return null
+  }
+}
+
+export async function generateFlagQuestions(
+  numberOfQuestions: number = 10,
+  difficulty: Difficulty = 'hard'
+): Promise<QuizQuestion[]> {
+  // The server picks distractors from the hard tier
+  const quiz = difficulty === 'hard' ? await fetchQuiz('flag', numberOfQuestions) : null
+  if (quiz) return quiz
+
+  const [countries, distractors] = await Promise.all([fetchCountries(QUIZ_FIELDS.flag), fetchDistractorIndex()])
+  return buildFlagQuestions(getSamplingEngine(countries), numberOfQuestions, { distractors, difficulty })
+}
+
+export async function generateCapitalQuestions(numberOfQuestions: number = 10): Promise<QuizQuestion[]> {
+  const quiz = await fetchQuiz('capital', numberOfQuestions)
+  if (quiz) return quiz
+
+  const countries = await fetchCountries(QUIZ_FIELDS.capital)
+  return buildCapitalQuestions(getSamplingEngine(countries), numberOfQuestions)
+}
+
+export async function generatePopulationQuestions(numberOfQuestions: number = 10): Promise<QuizQuestion[]> {
+  const quiz = await fetchQuiz('population', numberOfQuestions)
+  if (quiz) return quiz
+
+  const countries = await fetchCountries(QUIZ_FIELDS.population)
+  return buildPopulationQuestions(getSamplingEngine(countries), numberOfQuestions)
+}
+
 export function formatPopulation(population: number): string {
   if (population >= 1_000_000_000) {
     return `${(population / 1_000_000_000).toFixed(1)}B`
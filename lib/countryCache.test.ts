@@ -0,0 +1,69 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { mkdtempSync, writeFileSync } from 'fs'
+import { tmpdir } from 'os'
+import path from 'path'
+
+const flush = () => new Promise(resolve => setTimeout(resolve, 0))
+
+test('stale hits back off while upstream keeps failing', async () => {
+  // A stale copy on disk, so every request is a stale hit
+  const dir = mkdtempSync(path.join(tmpdir(), 'country-cache-'))
+  process.env.COUNTRIES_CACHE_FILE = path.join(dir, 'countries.json')
+  process.env.COUNTRIES_CACHE_TTL_MS = '60000'
+  writeFileSync(process.env.COUNTRIES_CACHE_FILE, JSON.stringify({ time: 0, data: [{ cca3: 'FRA' }] }))
+
+  let upstreamCalls = 0
+  const realFetch = globalThis.fetch
+  const realNow = Date.now
+  let now = 1_000_000
+  globalThis.fetch = (async () => {
+    upstreamCalls++
+    throw new Error('upstream down')
+  }) as typeof fetch
+  Date.now = () => now
+  const logError = console.error
+  console.error = () => {}
+
+  try {
+    const cache = await import('./countryCache')
+    const request = async () => {
+      const entry = await cache.getCountryEntry()
+      assert.deepEqual(entry.data, [{ cca3: 'FRA' }])
+      await flush()
+    }
+
+    await request()
+    assert.equal(upstreamCalls, 1)
+
+    // Within the first backoff window (1s) no request reaches upstream
+    for (let i = 0; i < 50; i++) await request()
+    assert.equal(upstreamCalls, 1)
+
+    now += 1000
+    await request()
+    assert.equal(upstreamCalls, 2)
+
+    // The window doubles after each consecutive failure
+    now += 1999
+    await request()
+    assert.equal(upstreamCalls, 2)
+    now += 1
+    await request()
+    assert.equal(upstreamCalls, 3)
+
+    // ...and is capped at the cache TTL
+    for (let i = 0; i < 20; i++) {
+      now += 60000
+      await request()
+    }
+    assert.equal(upstreamCalls, 23)
+    assert.equal(cache.metrics.backoffSkips, 51)
+  } finally {
+    globalThis.fetch = realFetch
+    Date.now = realNow
+    console.error = logError
+  }
+})
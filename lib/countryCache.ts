@@ -0,0 +1,218 @@
+// Server-side cache of the REST Countries payload behind /api/countries.
+// Concurrent misses share one upstream fetch, an expired copy keeps being
+// served while a single background refresh replaces it (backing off while
+// upstream fails), and the last good payload is written to disk so a cold
+// process can answer without the network.
+
+import { promises as fs, readFileSync } from 'fs'
+import path from 'path'
+import { loadSnapshotCountries } from '@/lib/countrySnapshot'
+
+export const COUNTRIES_API = process.env.COUNTRIES_API_URL
+  || 'https://restcountries.com/v3.1/all?fields=name,capital,population,flags,region,subregion,languages,area,cca2,cca3'
+
+export const CACHE_FILE = process.env.COUNTRIES_CACHE_FILE
+  || path.join(process.cwd(), '.cache', 'countries.json')
+
+// 1 hour in milliseconds; load tests shorten it to reach the expiry paths
+export const CACHE_DURATION = Number(process.env.COUNTRIES_CACHE_TTL_MS) || 3600000
+
+// After an upstream failure, background refreshes wait this long, doubling
+// with each consecutive failure up to CACHE_DURATION
+const REFRESH_BACKOFF_MS = 1000
+
+// Upper bounds (seconds) of the refresh latency histogram
+const LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+export interface CacheEntry {
+  data: any
+  time: number
+  // Bumped on every fill so derived caches know when to rebuild
+  version: number
+  source: 'api' | 'disk' | 'snapshot'
+}
+
+export const metrics = {
+  hits: 0,
+  staleHits: 0,
+  misses: 0,
+  coalesced: 0,
+  refreshes: 0,
+  refreshErrors: 0,
+  backoffSkips: 0,
+  persistErrors: 0,
+  refreshSeconds: { buckets: LATENCY_BUCKETS.map(() => 0), sum: 0, count: 0 }
+}
+
+let entry: CacheEntry | null = null
+let inflight: Promise<CacheEntry> | null = null
+let coldStartChecked = false
+let failures = 0
+let lastFailureAt = 0
+
+function setEntry(data: any, time: number, source: CacheEntry['source']): CacheEntry {
+  entry = { data, time, version: (entry?.version ?? 0) + 1, source }
+  return entry
+}
+
+// Last good API payload from disk, falling back to the columnar snapshot.
+// The snapshot has no fetch time, so it is served as already stale.
+function loadColdStart(): CacheEntry | null {
+  try {
+    const { time, data } = JSON.parse(readFileSync(CACHE_FILE, 'utf8'))
+    if (Array.isArray(data)) {
+      return setEntry(data, time, 'disk')
+    }
+  } catch (error: any) {
+    if (error?.code !== 'ENOENT') {
+      console.error('Error reading countries cache file:', error)
+    }
+  }
+
+  const snapshot = loadSnapshotCountries()
+  return snapshot ? setEntry(snapshot, 0, 'snapshot') : null
+}
+
+async function persist(data: any, time: number) {
+  const tmp = `${CACHE_FILE}.${process.pid}.tmp`
+  try {
+    await fs.mkdir(path.dirname(CACHE_FILE), { recursive: true })
+    await fs.writeFile(tmp, JSON.stringify({ time, data }))
+    await fs.rename(tmp, CACHE_FILE)
+  } catch (error) {
+    metrics.persistErrors++
+    console.error('Error persisting countries cache:', error)
+  }
+}
+
+function observeRefresh(seconds: number) {
+  const histogram = metrics.refreshSeconds
+  LATENCY_BUCKETS.forEach((bound, i) => {
+    if (seconds <= bound) histogram.buckets[i]++
+  })
+  histogram.sum += seconds
+  histogram.count++
+}
+
+async function fetchUpstream(): Promise<CacheEntry> {
+  const started = performance.now()
+  metrics.refreshes++
+  try {
+    const response = await fetch(COUNTRIES_API, {
+      headers: {
+        'Accept': 'application/json',
+        'User-Agent': 'CountryQuizGame/1.0'
+      },
+      cache: 'no-store'
+    })
+
+    if (!response.ok) {
+      console.error(`REST Countries API returned ${response.status}`)
+      throw new Error(`API returned ${response.status}`)
+    }
+
+    const data = await response.json()
+    const time = Date.now()
+    void persist(data, time)
+    failures = 0
+    return setEntry(data, time, 'api')
+  } catch (error) {
+    metrics.refreshErrors++
+    failures++
+    lastFailureAt = Date.now()
+    throw error
+  } finally {
+    observeRefresh((performance.now() - started) / 1000)
+  }
+}
+
+// Single-flight: callers arriving while a fetch is running share its promise
+export function refreshCountries(): Promise<CacheEntry> {
+  if (inflight) {
+    metrics.coalesced++
+    return inflight
+  }
+  inflight = fetchUpstream().finally(() => {
+    inflight = null
+  })
+  return inflight
+}
+
+function backoffMs(): number {
+  return failures ? Math.min(REFRESH_BACKOFF_MS * 2 ** (failures - 1), CACHE_DURATION) : 0
+}
+
+function refreshInBackground() {
+  if (inflight) return
+  // While upstream is failing, stale hits keep serving the old copy instead
+  // of each starting another fetch
+  if (Date.now() - lastFailureAt < backoffMs()) {
+    metrics.backoffSkips++
+    return
+  }
+  refreshCountries().catch(error => {
+    console.error('Error refreshing countries:', error?.message || error)
+  })
+}
+
+export async function getCountryEntry(): Promise<CacheEntry> {
+  if (!entry && !coldStartChecked) {
+    coldStartChecked = true
+    loadColdStart()
+  }
+
+  if (entry) {
+    if (Date.now() - entry.time < CACHE_DURATION) {
+      metrics.hits++
+    } else {
+      // Serve the stale copy and let one request refresh it
+      metrics.staleHits++
+      refreshInBackground()
+    }
+    return entry
+  }
+
+  metrics.misses++
+  return refreshCountries()
+}
+
+export async function getCountries(): Promise<any> {
+  return (await getCountryEntry()).data
+}
+
+// Prometheus text exposition of the counters above
+export function renderMetrics(): string {
+  const lines: string[] = []
+  const counter = (name: string, help: string, value: number) => {
+    lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} counter`, `${name} ${value}`)
+  }
+
+  counter('countries_cache_hits_total', 'Requests served from a fresh cache entry.', metrics.hits)
+  counter('countries_cache_stale_hits_total', 'Requests served from an expired entry while it refreshes.', metrics.staleHits)
+  counter('countries_cache_misses_total', 'Requests that had to wait for the upstream API.', metrics.misses)
+  counter('countries_cache_coalesced_total', 'Refreshes that joined an in-flight upstream fetch.', metrics.coalesced)
+  counter('countries_cache_refreshes_total', 'Upstream fetches started.', metrics.refreshes)
+  counter('countries_cache_refresh_errors_total', 'Upstream fetches that failed.', metrics.refreshErrors)
+  counter('countries_cache_refresh_backoff_skips_total', 'Background refreshes skipped while backing off after upstream failures.', metrics.backoffSkips)
+  counter('countries_cache_persist_errors_total', 'Failed writes of the on-disk copy.', metrics.persistErrors)
+
+  const histogram = metrics.refreshSeconds
+  const name = 'countries_cache_refresh_seconds'
+  lines.push(`# HELP ${name} Latency of upstream fetches.`, `# TYPE ${name} histogram`)
+  LATENCY_BUCKETS.forEach((bound, i) => {
+    lines.push(`${name}_bucket{le="${bound}"} ${histogram.buckets[i]}`)
+  })
+  lines.push(
+    `${name}_bucket{le="+Inf"} ${histogram.count}`,
+    `${name}_sum ${histogram.sum}`,
+    `${name}_count ${histogram.count}`
+  )
+
+  const age = entry && entry.time ? (Date.now() - entry.time) / 1000 : -1
+  lines.push(
+    '# HELP countries_cache_age_seconds Age of the cached payload (-1 when empty or from the snapshot).',
+    '# TYPE countries_cache_age_seconds gauge',
+    `countries_cache_age_seconds ${age}`
+  )
+  return lines.join('\n') + '\n'
+}
@@ -0,0 +1,78 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { brotliDecompressSync, gunzipSync } from 'zlib'
+import {
+  FieldsError,
+  PRESET_PROJECTIONS,
+  getPayload,
+  isNotModified,
+  negotiateEncoding,
+  normalizeFields
+} from './countryPayloads'
+
+const countries = Array.from({ length: 30 }, (_, i) => ({
+  name: { common: `Country ${i}`, official: `Republic of Country ${i}` },
+  capital: [`Capital ${i}`],
+  population: 1000 * i,
+  flags: { png: `${i}.png`, svg: `${i}.svg` },
+  region: i % 2 ? 'Europe' : 'Asia',
+  cca2: `C${i}`,
+  cca3: `CC${i}`
+}))
+
+let version = 0
+const fill = () => ({ data: countries, time: 0, version: ++version, source: 'api' as const })
+
+test('fields are normalized and validated', () => {
+  assert.equal(normalizeFields(null), '')
+  assert.equal(normalizeFields(' region, name.common ,region,,'), 'name.common,region')
+  assert.equal(normalizeFields('name.common,name,flags.png'), 'flags.png,name')
+  assert.throws(() => normalizeFields('password'), FieldsError)
+  assert.throws(() => normalizeFields('name.'), FieldsError)
+  assert.throws(() => normalizeFields('name.common.x'), FieldsError)
+})
+
+test('presets are projected, then compressed off the request path', async () => {
+  const entry = fill()
+  const key = normalizeFields(PRESET_PROJECTIONS[2])
+  const payload = getPayload(entry, key)
+
+  const body = JSON.parse(payload.bodies.identity.toString())
+  assert.deepEqual(body[3], { capital: ['Capital 3'], cca3: 'CC3', name: { common: 'Country 3' }, population: 3000, region: 'Europe' })
+  // Until the compressed bodies exist, every client gets JSON
+  assert.equal(payload.bodies.br, undefined)
+  assert.equal(negotiateEncoding('br, gzip', payload), 'identity')
+
+  await payload.compressed
+  assert.deepEqual(brotliDecompressSync(payload.bodies.br!), payload.bodies.identity)
+  assert.deepEqual(gunzipSync(payload.bodies.gzip!), payload.bodies.identity)
+  assert.equal(negotiateEncoding('gzip, br', payload), 'br')
+  assert.equal(negotiateEncoding('br;q=0, gzip', payload), 'gzip')
+  assert.equal(negotiateEncoding('*;q=0, identity', payload), 'identity')
+  assert.equal(getPayload(entry, key), payload)
+
+  assert.ok(isNotModified(`"x", W/${payload.etags.gzip}`, payload))
+  assert.ok(isNotModified('*', payload))
+  assert.ok(!isNotModified('"x"', payload))
+  assert.ok(getPayload(fill(), key) !== payload)
+})
+
+test('ad-hoc projections are uncompressed and bounded', () => {
+  const entry = fill()
+  const payload = getPayload(entry, 'area')
+  assert.deepEqual(Object.keys(payload.bodies), ['identity'])
+  assert.equal(payload.compressed, undefined)
+  assert.equal(negotiateEncoding('br', payload), 'identity')
+  assert.equal(getPayload(entry, 'area'), payload)
+
+  // Reading 'area' again keeps it; it goes once it is the least recently
+  // used of more than 32
+  const keys = ['capital', 'flags', 'languages', 'name', 'population', 'region', 'subregion', 'cca2', 'cca3']
+  const projections = keys.flatMap(a => keys.filter(b => a < b).map(b => `${a},${b}`))
+  for (const key of projections.slice(0, 31)) getPayload(entry, key)
+  assert.equal(getPayload(entry, 'area'), payload)
+  for (const key of projections.slice(0, 32)) getPayload(entry, key)
+  assert.ok(getPayload(entry, 'area') !== payload)
+})
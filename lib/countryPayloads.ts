@@ -0,0 +1,165 @@
+// Serialized /api/countries bodies, one per field projection (`?fields=`).
+// The projections the quiz pages use are encoded when the cache is filled and
+// stored alongside a strong ETag, so serving them costs no JSON encoding.
+// Their gzip and brotli bodies are compressed in zlib's thread pool, off the
+// event loop, and served once ready; until then the JSON is sent as is. Any
+// other projection is encoded on first use as uncompressed JSON only, so a
+// client cycling through projections cannot make every request pay for a
+// compression of the country list.
+
+import { createHash } from 'crypto'
+import { promisify } from 'util'
+import { brotliCompress, constants, gzip } from 'zlib'
+import { CacheEntry } from '@/lib/countryCache'
+
+// Top-level fields of the REST Countries payload; `flags.png` style paths
+// select a single nested field
+const FIELDS = [
+  'name', 'capital', 'population', 'flags', 'region', 'subregion',
+  'languages', 'area', 'cca2', 'cca3'
+]
+
+// Projections requested by the quiz pages, built and compressed on every fill
+export const PRESET_PROJECTIONS = [
+  '',
+  'cca2,cca3,flags.png,name.common,population,region',
+  'capital,cca3,name.common,population,region',
+  'cca3,name.common,population,region'
+]
+
+// Bound on the ad-hoc (uncompressed) projections kept per fill
+const MAX_PROJECTIONS = 32
+
+// Within a few percent of the maximum levels' sizes for a fraction of the
+// CPU (brotli's maximum quality is ~50x slower on the country list)
+const BROTLI_QUALITY = 6
+const GZIP_LEVEL = 6
+
+const brotliAsync = promisify(brotliCompress)
+const gzipAsync = promisify(gzip)
+
+export type Encoding = 'br' | 'gzip' | 'identity'
+
+export interface Payload {
+  // Ad-hoc projections only have the identity body, presets get the
+  // compressed ones once `compressed` resolves
+  bodies: Partial<Record<Encoding, Buffer>> & { identity: Buffer }
+  etags: Partial<Record<Encoding, string>> & { identity: string }
+  compressed?: Promise<void>
+}
+
+export class FieldsError extends Error {}
+
+let version = -1
+let payloads = new Map<string, Payload>()
+
+// Canonical projection key: sorted, de-duplicated paths ('' is everything)
+export function normalizeFields(fields: string | null): string {
+  if (!fields) return ''
+  const paths = new Set<string>()
+  for (const raw of fields.split(',')) {
+    const path = raw.trim()
+    if (!path) continue
+    const [top, nested, ...rest] = path.split('.')
+    if (!FIELDS.includes(top) || nested === '' || rest.length > 0) {
+      throw new FieldsError(`Unknown field ${path}`)
+    }
+    paths.add(path)
+  }
+  // A whole field already covers its nested paths
+  return Array.from(paths)
+    .filter(path => !path.includes('.') || !paths.has(path.split('.')[0]))
+    .sort()
+    .join(',')
+}
+
+function project(countries: any[], key: string): any[] {
+  if (!key) return countries
+  const paths = key.split(',').map(path => path.split('.'))
+  return countries.map(country => {
+    const out: any = {}
+    for (const [top, nested] of paths) {
+      const value = country[top]
+      if (value === undefined) continue
+      if (nested === undefined) {
+        out[top] = value
+      } else if (value && value[nested] !== undefined) {
+        out[top] = { ...out[top], [nested]: value[nested] }
+      }
+    }
+    return out
+  })
+}
+
+function encode(data: any, compress: boolean): Payload {
+  const identity = Buffer.from(JSON.stringify(data))
+  // Each content-coding is its own representation, so each gets its own tag
+  const hash = createHash('sha256').update(identity).digest('base64url').slice(0, 27)
+  const payload: Payload = { bodies: { identity }, etags: { identity: `"${hash}"` } }
+  if (compress) {
+    payload.compressed = Promise.all([
+      gzipAsync(identity, { level: GZIP_LEVEL }),
+      brotliAsync(identity, {
+        params: {
+          [constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+          [constants.BROTLI_PARAM_SIZE_HINT]: identity.length
+        }
+      })
+    ])
+      .then(([gzipped, brotlied]) => {
+        payload.bodies.gzip = gzipped
+        payload.etags.gzip = `"${hash}-gz"`
+        payload.bodies.br = brotlied
+        payload.etags.br = `"${hash}-br"`
+      })
+      .catch(error => console.error('Error compressing countries payload:', error))
+  }
+  return payload
+}
+
+export function getPayload(entry: CacheEntry, key: string): Payload {
+  if (entry.version !== version) {
+    version = entry.version
+    payloads = new Map(PRESET_PROJECTIONS.map(preset => [preset, encode(project(entry.data, preset), true)]))
+  }
+
+  let payload = payloads.get(key)
+  if (PRESET_PROJECTIONS.includes(key)) return payload!
+  if (payload) {
+    // Least recently used ad-hoc projections are dropped first
+    payloads.delete(key)
+  } else {
+    if (payloads.size >= PRESET_PROJECTIONS.length + MAX_PROJECTIONS) {
+      const oldest = Array.from(payloads.keys()).find(k => !PRESET_PROJECTIONS.includes(k))
+      if (oldest !== undefined) payloads.delete(oldest)
+    }
+    payload = encode(project(entry.data, key), false)
+  }
+  payloads.set(key, payload)
+  return payload
+}
+
+// Best coding the client accepts that the payload has, honouring q=0 exclusions
+export function negotiateEncoding(acceptEncoding: string | null, payload: Payload): Encoding {
+  const accepted = new Map<string, number>()
+  for (const part of (acceptEncoding || '').split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';')
+    if (!name) continue
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='))
+    accepted.set(name, q ? parseFloat(q.slice(2)) || 0 : 1)
+  }
+  const allows = (name: string) => (accepted.get(name) ?? accepted.get('*') ?? 0) > 0
+  if (payload.bodies.br && allows('br')) return 'br'
+  if (payload.bodies.gzip && allows('gzip')) return 'gzip'
+  return 'identity'
+}
+
+// True when If-None-Match names any representation of the payload
+export function isNotModified(ifNoneMatch: string | null, payload: Payload): boolean {
+  if (!ifNoneMatch) return false
+  const tags = Object.values(payload.etags)
+  return ifNoneMatch.split(',').some(tag => {
+    const value = tag.trim().replace(/^W\//, '')
+    return value === '*' || tags.includes(value)
+  })
+}
@@ -0,0 +1,206 @@
+// Reader for the columnar country snapshot written by tools/country_snapshot.py.
+// Server-only. Node has no mmap, so unlike the Python reader this is an eager
+// load: the whole file (tens of KB) is read into one heap Buffer with
+// readFileSync. Fields are then decoded from that Buffer through a DataView,
+// without a JSON parse. find() and country() decode one row on demand;
+// countries() builds every record up front.
+
+import { readFileSync } from 'fs'
+import path from 'path'
+import { Country } from '@/types/country'
+
+const MAGIC = 'CQSNAP\0\u0001'
+const VERSION = 1
+const NONE = 0xffffffff
+const NO_CODE = 0xff
+const HEADER_SIZE = 20
+const SECTION_SIZE = 16
+
+// Must match SECTIONS in tools/country_snapshot.py
+const SECTIONS = [
+  'population', 'area', 'region', 'subregion', 'name', 'official',
+  'flag_png', 'flag_svg', 'flag_alt', 'cca2', 'cca3',
+  'capital_offsets', 'capital_ids', 'language_offsets', 'language_ids',
+  'region_dict', 'subregion_dict', 'language_dict',
+  'cca3_index', 'cca2_index', 'string_offsets', 'string_data'
+] as const
+
+type SectionName = typeof SECTIONS[number]
+
+export const DEFAULT_SNAPSHOT_PATH = process.env.COUNTRIES_SNAPSHOT
+  || path.join(process.cwd(), 'data', 'countries.snap')
+
+export class CountrySnapshot {
+  readonly count: number
+  private view: DataView
+  private buffer: Buffer
+  private sections = {} as Record<SectionName, { offset: number, length: number }>
+  private stringCache = new Map<number, string>()
+
+  constructor(buffer: Buffer) {
+    this.buffer = buffer
+    this.view = new DataView(buffer.buffer, buffer.byteOffset, buffer.byteLength)
+
+    if (buffer.toString('latin1', 0, 8) !== MAGIC || this.view.getUint32(8, true) !== VERSION) {
+      throw new Error(`Not a version ${VERSION} country snapshot`)
+    }
+    this.count = this.view.getUint32(12, true)
+    const sectionCount = this.view.getUint32(16, true)
+
+    SECTIONS.forEach((name, i) => {
+      if (i >= sectionCount) {
+        throw new Error(`Country snapshot is missing section ${name}`)
+      }
+      const at = HEADER_SIZE + i * SECTION_SIZE
+      this.sections[name] = {
+        offset: Number(this.view.getBigUint64(at, true)),
+        length: Number(this.view.getBigUint64(at + 8, true))
+      }
+    })
+  }
+
+  static fromFile(file: string = DEFAULT_SNAPSHOT_PATH): CountrySnapshot {
+    return new CountrySnapshot(readFileSync(file))
+  }
+
+  private u32(section: SectionName, i: number): number {
+    return this.view.getUint32(this.sections[section].offset + i * 4, true)
+  }
+
+  private u16(section: SectionName, i: number): number {
+    return this.view.getUint16(this.sections[section].offset + i * 2, true)
+  }
+
+  private u8(section: SectionName, i: number): number {
+    return this.view.getUint8(this.sections[section].offset + i)
+  }
+
+  private ascii(section: SectionName, row: number, width: number): string {
+    const start = this.sections[section].offset + row * width
+    return this.buffer.toString('latin1', start, start + width)
+  }
+
+  string(id: number): string | undefined {
+    if (id === NONE) return undefined
+    let value = this.stringCache.get(id)
+    if (value === undefined) {
+      const base = this.sections.string_data.offset
+      value = this.buffer.toString(
+        'utf8',
+        base + this.u32('string_offsets', id),
+        base + this.u32('string_offsets', id + 1)
+      )
+      this.stringCache.set(id, value)
+    }
+    return value
+  }
+
+  population(row: number): number {
+    return Number(this.view.getBigUint64(this.sections.population.offset + row * 8, true))
+  }
+
+  area(row: number): number {
+    return this.view.getFloat64(this.sections.area.offset + row * 8, true)
+  }
+
+  cca2(row: number): string {
+    return this.ascii('cca2', row, 2)
+  }
+
+  cca3(row: number): string {
+    return this.ascii('cca3', row, 3)
+  }
+
+  region(row: number): string {
+    return this.string(this.u32('region_dict', this.u8('region', row))) ?? ''
+  }
+
+  subregion(row: number): string | undefined {
+    const code = this.u8('subregion', row)
+    return code === NO_CODE ? undefined : this.string(this.u32('subregion_dict', code))
+  }
+
+  // Binary search of the cca3 / cca2 index
+  find(code: string): number | undefined {
+    const key = code.toUpperCase()
+    const [index, read] = key.length === 3
+      ? ['cca3_index' as const, (row: number) => this.cca3(row)]
+      : key.length === 2
+        ? ['cca2_index' as const, (row: number) => this.cca2(row)]
+        : [null, null]
+    if (!index || !read) return undefined
+
+    let lo = 0
+    let hi = this.count
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1
+      const value = read(this.u16(index, mid))
+      if (value < key) lo = mid + 1
+      else hi = mid
+    }
+    if (lo < this.count) {
+      const row = this.u16(index, lo)
+      if (read(row) === key) return row
+    }
+    return undefined
+  }
+
+  country(row: number): Country {
+    const capital: string[] = []
+    for (let i = this.u32('capital_offsets', row); i < this.u32('capital_offsets', row + 1); i++) {
+      capital.push(this.string(this.u32('capital_ids', i))!)
+    }
+
+    const languages: { [key: string]: string } = {}
+    for (let i = this.u32('language_offsets', row); i < this.u32('language_offsets', row + 1); i++) {
+      const entry = this.u16('language_ids', i)
+      languages[this.string(this.u32('language_dict', 2 * entry))!] =
+        this.string(this.u32('language_dict', 2 * entry + 1))!
+    }
+
+    const country: Country = {
+      name: {
+        common: this.string(this.u32('name', row))!,
+        official: this.string(this.u32('official', row))!
+      },
+      capital,
+      population: this.population(row),
+      flags: {
+        png: this.string(this.u32('flag_png', row))!,
+        svg: this.string(this.u32('flag_svg', row))!
+      },
+      region: this.region(row),
+      languages,
+      area: this.area(row),
+      cca2: this.cca2(row),
+      cca3: this.cca3(row)
+    }
+
+    const alt = this.string(this.u32('flag_alt', row))
+    if (alt !== undefined) country.flags.alt = alt
+    const subregion = this.subregion(row)
+    if (subregion !== undefined) country.subregion = subregion
+    return country
+  }
+
+  // Every record as a Country object, e.g. for the offline fallback list
+  countries(): Country[] {
+    const result: Country[] = []
+    for (let row = 0; row < this.count; row++) {
+      result.push(this.country(row))
+    }
+    return result
+  }
+}
+
+// Countries from the snapshot on disk, or null when there is none
+export function loadSnapshotCountries(file: string = DEFAULT_SNAPSHOT_PATH): Country[] | null {
+  try {
+    return CountrySnapshot.fromFile(file).countries()
+  } catch (error: any) {
+    if (error?.code !== 'ENOENT') {
+      console.error('Error reading country snapshot:', error?.message || error)
+    }
+    return null
+  }
+}
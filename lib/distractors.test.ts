@@ -0,0 +1,47 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { DistractorIndex } from './distractors'
+import { seededRandom } from './sampling'
+
+// Five countries, four neighbours each, closest first
+const data = {
+  version: 1,
+  k: 4,
+  tiers: { hard: [0, 2], medium: [2, 3], easy: [3, 4] } as { [tier: string]: [number, number] },
+  codes: ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'],
+  neighbours: [
+    1, 2, 3, 4,
+    0, 2, 3, 4,
+    3, 1, 0, 4,
+    2, 4, 1, 0,
+    3, 2, 1, 0
+  ]
+}
+
+test('picks stay within the tier and are distinct', () => {
+  const index = new DistractorIndex(data)
+  const random = seededRandom(9)
+  const seen = new Set<string>()
+  for (let round = 0; round < 200; round++) {
+    const hard = index.pick('CCC', 'hard', 3, random)
+    assert.equal(hard.length, 2)
+    assert.deepEqual([...hard].sort(), ['BBB', 'DDD'])
+    seen.add(hard.join())
+    assert.deepEqual(index.pick('CCC', 'medium', 3, random), ['AAA'])
+    assert.deepEqual(index.pick('CCC', 'easy', 3, random), ['EEE'])
+  }
+  // Both orders of the hard tier come up
+  assert.equal(seen.size, 2)
+  assert.equal(index.pick('EEE', 'hard', 1, random).length, 1)
+})
+
+test('unknown countries and tiers have no distractors', () => {
+  const index = new DistractorIndex(data)
+  assert.ok(index.has('AAA'))
+  assert.ok(!index.has('ZZZ'))
+  assert.deepEqual(index.pick('ZZZ'), [])
+  assert.deepEqual(index.pick('AAA', 'expert' as any), [])
+  assert.throws(() => new DistractorIndex({ ...data, version: 2 }), /version 2/)
+})
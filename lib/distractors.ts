@@ -0,0 +1,62 @@
+// Nearest-neighbour distractor index built by tools/distractors.py.
+// Each country's k most similar countries are stored closest first in a
+// flat array and split into difficulty tiers of consecutive ranks, so
+// picking wrong answers is a fixed-size slice lookup.
+
+export type Difficulty = 'hard' | 'medium' | 'easy'
+
+export interface DistractorIndexData {
+  version: number
+  k: number
+  tiers: { [tier: string]: [number, number] }
+  codes: string[]
+  neighbours: number[]
+}
+
+const INDEX_VERSION = 1
+
+export class DistractorIndex {
+  readonly k: number
+  private codes: string[]
+  private rows: Map<string, number>
+  private neighbours: Uint16Array
+  private tiers: DistractorIndexData['tiers']
+
+  constructor(data: DistractorIndexData) {
+    if (data.version !== INDEX_VERSION) {
+      throw new Error(`Unsupported distractor index version ${data.version}`)
+    }
+    this.k = data.k
+    this.codes = data.codes
+    this.tiers = data.tiers
+    this.neighbours = Uint16Array.from(data.neighbours)
+    this.rows = new Map(data.codes.map((code, row) => [code, row]))
+  }
+
+  has(cca3: string): boolean {
+    return this.rows.has(cca3)
+  }
+
+  // Up to `count` random cca3 codes from a country's neighbours in `tier`
+  pick(
+    cca3: string,
+    tier: Difficulty = 'hard',
+    count: number = 3,
+    random: () => number = Math.random
+  ): string[] {
+    const row = this.rows.get(cca3)
+    const bounds = this.tiers[tier]
+    if (row === undefined || !bounds) return []
+
+    const start = row * this.k + bounds[0]
+    const slice = Array.from(this.neighbours.subarray(start, row * this.k + bounds[1]))
+    const n = Math.min(count, slice.length)
+
+    // Partial Fisher-Yates over the (small) tier slice
+    for (let i = 0; i < n; i++) {
+      const j = i + Math.floor(random() * (slice.length - i));
+      [slice[i], slice[j]] = [slice[j], slice[i]]
+    }
+    return slice.slice(0, n).map(neighbour => this.codes[neighbour])
+  }
+}
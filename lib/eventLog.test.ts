@@ -0,0 +1,197 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+
+// A minimal in-memory IndexedDB: requests of a transaction run in order on
+// later ticks and the transaction completes once none are pending. Enough
+// for lib/eventLog.ts, which uses add/get/put, cursors and key ranges.
+
+type Key = number | string
+
+// A later tick; setTimeout would clamp nested calls to 4 ms
+const later = (callback: () => void) => setImmediate(callback)
+
+class FakeRange {
+  constructor(private lower?: Key, private upper?: Key, private lowerOpen = false) {}
+  static lowerBound(key: Key, open = false) { return new FakeRange(key, undefined, open) }
+  static upperBound(key: Key) { return new FakeRange(undefined, key) }
+  includes(key: Key) {
+    if (this.lower !== undefined && (this.lowerOpen ? key <= this.lower : key < this.lower)) return false
+    return this.upper === undefined || key <= this.upper
+  }
+}
+
+class FakeRequest {
+  result: any
+  error = null
+  onsuccess: (() => void) | null = null
+  onerror: (() => void) | null = null
+}
+
+class FakeStore {
+  records = new Map<Key, any>()
+  nextKey = 1
+  constructor(public autoIncrement: boolean) {}
+  sortedKeys(range?: FakeRange) {
+    return [...this.records.keys()].filter(key => !range || range.includes(key)).sort((a, b) => (a < b ? -1 : 1))
+  }
+}
+
+class FakeTransaction {
+  private pending = 0
+  private finished = false
+  error = null
+  oncomplete: (() => void) | null = null
+  onerror: (() => void) | null = null
+  onabort: (() => void) | null = null
+
+  constructor(private stores: Map<string, FakeStore>) {
+    this.check()
+  }
+
+  run(request: FakeRequest, step: () => any) {
+    this.pending++
+    later(() => {
+      request.result = step()
+      this.pending--
+      request.onsuccess?.()
+      this.check()
+    })
+    return request
+  }
+
+  private check() {
+    later(() => {
+      if (this.pending === 0 && !this.finished) {
+        this.finished = true
+        this.oncomplete?.()
+      }
+    })
+  }
+
+  objectStore(name: string) {
+    const store = this.stores.get(name)!
+    const tx = this
+    return {
+      add(value: any) {
+        return tx.run(new FakeRequest(), () => {
+          const key = store.nextKey++
+          store.records.set(key, structuredClone(value))
+          return key
+        })
+      },
+      put(value: any, key: Key) {
+        return tx.run(new FakeRequest(), () => {
+          store.records.set(key, structuredClone(value))
+          return key
+        })
+      },
+      get(key: Key) {
+        return tx.run(new FakeRequest(), () => structuredClone(store.records.get(key)))
+      },
+      openCursor(range?: FakeRange | null, direction: string = 'next') {
+        const keys = store.sortedKeys(range ?? undefined)
+        if (direction === 'prev') keys.reverse()
+        const request = new FakeRequest()
+        let index = 0
+        const step = () => {
+          while (index < keys.length && !store.records.has(keys[index])) index++
+          if (index >= keys.length) return null
+          const key = keys[index++]
+          return {
+            key,
+            value: structuredClone(store.records.get(key)),
+            continue: () => tx.run(request, step),
+            delete: () => store.records.delete(key)
+          }
+        }
+        return tx.run(request, step)
+      }
+    }
+  }
+}
+
+class FakeDatabase {
+  stores = new Map<string, FakeStore>()
+  createObjectStore(name: string, options?: { autoIncrement?: boolean }) {
+    this.stores.set(name, new FakeStore(!!options?.autoIncrement))
+  }
+  transaction() {
+    return new FakeTransaction(this.stores)
+  }
+}
+
+const database = new FakeDatabase()
+let opened = false
+
+Object.assign(globalThis, {
+  IDBKeyRange: FakeRange,
+  requestIdleCallback: later,
+  indexedDB: {
+    open() {
+      const request: any = new FakeRequest()
+      later(() => {
+        request.result = database
+        if (!opened) {
+          opened = true
+          request.onupgradeneeded?.()
+        }
+        request.onsuccess?.()
+      })
+      return request
+    }
+  }
+})
+
+const wait = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+const DAY = 24 * 3600 * 1000
+
+test('events appended or compacted by another tab are never lost', async () => {
+  const log = await import('./eventLog')
+  const answer = (cca3: string, correct: boolean, time = Date.now()) =>
+    ({ type: 'answer', mode: 'flags', cca3, correct, time }) as const
+  const aggregates = await log.loadAggregates()
+  const events = database.stores.get('events')!
+  const snapshots = database.stores.get('snapshots')!
+  // What another tab does: its own appends, and a compaction
+  const otherTab = (event: ReturnType<typeof answer>) => events.records.set(events.nextKey++, event)
+
+  await log.appendEvent(answer('FRA', true))
+  otherTab(answer('DEU', true))
+  await log.appendEvent(answer('ITA', false))
+  assert.equal(aggregates.modes.flags.questions, 3)
+  assert.equal(aggregates.countries.DEU.seen, 1)
+  assert.equal(aggregates.lastEventId, 3)
+
+  // The other tab folds ids 1-5 into a snapshot and drops them
+  otherTab(answer('ESP', true, Date.now() - 60 * DAY))
+  otherTab(answer('PRT', true, Date.now() - 60 * DAY))
+  const folded = log.emptyAggregates()
+  for (const key of events.sortedKeys()) {
+    log.applyEvent(folded, events.records.get(key))
+    folded.lastEventId = key as number
+  }
+  snapshots.records.set('aggregates', folded)
+  events.records.clear()
+
+  await log.appendEvent(answer('FRA', false, Date.now() - 59 * DAY))
+  assert.equal(aggregates.modes.flags.questions, 6)
+  assert.equal(aggregates.countries.PRT.seen, 1)
+  assert.equal(aggregates.countries.FRA.seen, 2)
+  assert.equal(aggregates.lastEventId, 6)
+
+  // Enough events for this tab to compact; its snapshot covers every event
+  for (let i = 0; i < 500; i++) otherTab(answer('BEL', i % 2 === 0, Date.now() - 60 * DAY))
+  await log.appendEvent(answer('NLD', true))
+  await wait(10)
+  await log.appendEvent(answer('NLD', true))
+
+  const snapshot = snapshots.records.get('aggregates')
+  assert.equal(snapshot.modes.flags.questions, 507)
+  assert.equal(snapshot.countries.BEL.seen, 500)
+  assert.equal(aggregates.modes.flags.questions, 508)
+  assert.equal(aggregates.lastEventId, 508)
+  // Old events were folded and dropped, recent ones kept as history
+  assert.deepEqual(events.sortedKeys(), [507, 508])
+})
@@ -0,0 +1,274 @@
+// Append-only log of answers and finished games, stored in IndexedDB.
+// Aggregates (per mode, per country, answer streaks) are kept in memory and
+// updated by a delta per event, so recording is one append. On load the last
+// persisted aggregate snapshot is read and only the newer events are replayed;
+// a background compaction folds old events into the snapshot and drops them.
+// Other tabs append to and compact the same log, so every write also folds
+// in whatever the store holds beyond this tab's aggregates (catchUp).
+
+export type StatsMode = 'flags' | 'capitals' | 'population'
+
+export interface AnswerEvent {
+  type: 'answer'
+  mode: StatsMode
+  cca3: string
+  correct: boolean
+  // Option picked and milliseconds taken, when known
+  chosen?: string
+  ms?: number
+  time: number
+}
+
+export interface GameEvent {
+  type: 'game'
+  mode: StatsMode
+  score: number
+  total: number
+  // Achievements first unlocked by this game
+  achievements?: string[]
+  time: number
+}
+
+export type QuizEvent = AnswerEvent | GameEvent
+
+export interface ModeAggregate {
+  games: number
+  questions: number
+  correct: number
+  bestScore: number
+  currentStreak: number
+  bestStreak: number
+}
+
+export interface CountryAggregate {
+  seen: number
+  correct: number
+  lastSeen: number
+}
+
+export interface Aggregates {
+  // Id of the newest event folded in
+  lastEventId: number
+  modes: Record<StatsMode, ModeAggregate>
+  countries: { [cca3: string]: CountryAggregate }
+}
+
+const DB_NAME = 'country-quiz'
+const DB_VERSION = 1
+const EVENTS = 'events'
+const SNAPSHOTS = 'snapshots'
+const SNAPSHOT_KEY = 'aggregates'
+
+// Events appended since the last snapshot before a compaction is scheduled
+const COMPACT_AFTER = 500
+// Folded events younger than this are kept as per-question history
+const RETENTION_MS = 30 * 24 * 3600 * 1000
+
+function emptyMode(): ModeAggregate {
+  return { games: 0, questions: 0, correct: 0, bestScore: 0, currentStreak: 0, bestStreak: 0 }
+}
+
+export function emptyAggregates(): Aggregates {
+  return {
+    lastEventId: 0,
+    modes: { flags: emptyMode(), capitals: emptyMode(), population: emptyMode() },
+    countries: {}
+  }
+}
+
+// The delta of one event
+export function applyEvent(aggregates: Aggregates, event: QuizEvent) {
+  const mode = aggregates.modes[event.mode]
+  if (event.type === 'game') {
+    mode.games++
+    mode.bestScore = Math.max(mode.bestScore, event.score)
+    return
+  }
+
+  mode.questions++
+  const country = aggregates.countries[event.cca3] ??= { seen: 0, correct: 0, lastSeen: 0 }
+  country.seen++
+  country.lastSeen = event.time
+  if (event.correct) {
+    mode.correct++
+    country.correct++
+    mode.currentStreak++
+    mode.bestStreak = Math.max(mode.bestStreak, mode.currentStreak)
+  } else {
+    mode.currentStreak = 0
+  }
+}
+
+let db: Promise<IDBDatabase> | null = null
+
+function openDb(): Promise<IDBDatabase> {
+  if (!db) {
+    db = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION)
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(EVENTS, { autoIncrement: true })
+        request.result.createObjectStore(SNAPSHOTS)
+      }
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => {
+        db = null
+        reject(request.error)
+      }
+    })
+  }
+  return db
+}
+
+function done(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve()
+    tx.onerror = () => reject(tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+const available = () => typeof indexedDB !== 'undefined'
+
+let aggregates: Aggregates | null = null
+let loading: Promise<Aggregates> | null = null
+let sinceSnapshot = 0
+let compactionScheduled = false
+
+// Aggregates over every recorded event: the stored snapshot plus a replay
+// of the events appended after it
+export function loadAggregates(): Promise<Aggregates> {
+  if (aggregates) return Promise.resolve(aggregates)
+  if (!loading) {
+    loading = replay()
+      .catch(error => {
+        console.error('Error loading event log:', error)
+        return emptyAggregates()
+      })
+      .then(loaded => {
+        aggregates = loaded
+        return loaded
+      })
+  }
+  return loading
+}
+
+async function replay(): Promise<Aggregates> {
+  if (!available()) return emptyAggregates()
+
+  const result = emptyAggregates()
+  const tx = (await openDb()).transaction([SNAPSHOTS, EVENTS], 'readonly')
+  await catchUp(tx, result)
+  if (sinceSnapshot >= COMPACT_AFTER) scheduleCompaction()
+  return result
+}
+
+// Bring `target` up to date with the store within `tx`, then call `then`
+// (still inside the transaction). A stored snapshot newer than `target`
+// replaces it: another tab compacted, and the events it folded may be gone.
+// Every event after that is replayed, including ones other tabs appended.
+function catchUp(tx: IDBTransaction, target: Aggregates, then?: () => void): Promise<void> {
+  const snapshotRequest = tx.objectStore(SNAPSHOTS).get(SNAPSHOT_KEY)
+  snapshotRequest.onsuccess = () => {
+    const snapshot: Aggregates | undefined = snapshotRequest.result
+    if (snapshot && snapshot.lastEventId > target.lastEventId) Object.assign(target, snapshot)
+
+    const range = target.lastEventId > 0 ? IDBKeyRange.lowerBound(target.lastEventId, true) : undefined
+    const cursorRequest = tx.objectStore(EVENTS).openCursor(range)
+    cursorRequest.onsuccess = () => {
+      const cursor = cursorRequest.result
+      if (!cursor) {
+        then?.()
+        return
+      }
+      applyEvent(target, cursor.value)
+      target.lastEventId = cursor.key as number
+      sinceSnapshot++
+      cursor.continue()
+    }
+  }
+  return done(tx)
+}
+
+// Appends run one after another, so ids and aggregate deltas stay in order
+let queue: Promise<unknown> = Promise.resolve()
+
+export function appendEvent(event: QuizEvent): Promise<void> {
+  const append = queue.then(async () => {
+    const current = await loadAggregates()
+    if (!available()) {
+      applyEvent(current, event)
+      return
+    }
+
+    // The new event is folded in by the replay, after any other tab's;
+    // the copy is kept only if the transaction commits
+    const next = structuredClone(current)
+    const tx = (await openDb()).transaction([SNAPSHOTS, EVENTS], 'readwrite')
+    tx.objectStore(EVENTS).add(event)
+    await catchUp(tx, next)
+
+    Object.assign(current, next)
+    if (sinceSnapshot >= COMPACT_AFTER) scheduleCompaction()
+  })
+  queue = append.catch(error => console.error('Error appending to event log:', error))
+  return append
+}
+
+// Retained events as JSONL, the input format of tools/analytics.py
+export async function exportEvents(): Promise<string> {
+  const events = await recentEvents(Infinity)
+  return events.reverse().map(event => JSON.stringify(event)).join('\n') + '\n'
+}
+
+// Newest-first per-question history still held in the log
+export async function recentEvents(limit: number = 50): Promise<QuizEvent[]> {
+  if (!available()) return []
+  const tx = (await openDb()).transaction(EVENTS, 'readonly')
+  const events: QuizEvent[] = []
+  const request = tx.objectStore(EVENTS).openCursor(null, 'prev')
+  request.onsuccess = () => {
+    const cursor = request.result
+    if (!cursor || events.length >= limit) return
+    events.push(cursor.value)
+    cursor.continue()
+  }
+  await done(tx)
+  return events
+}
+
+function scheduleCompaction() {
+  if (compactionScheduled) return
+  compactionScheduled = true
+  const run = () => {
+    queue = queue.then(compact)
+      .catch(error => console.error('Error compacting event log:', error))
+      .finally(() => { compactionScheduled = false })
+  }
+  if (typeof requestIdleCallback !== 'undefined') requestIdleCallback(run)
+  else setTimeout(run, 1000)
+}
+
+// Fold every stored event into a new snapshot and delete the folded events
+// older than RETENTION_MS. The snapshot is rebuilt from the store, not from
+// this tab's aggregates, so it covers exactly the events up to its
+// lastEventId whichever tabs appended them. Ids grow with time, so the walk
+// stops at the first event that is still recent.
+async function compact() {
+  if (!aggregates || !available()) return
+  const snapshot = emptyAggregates()
+  const cutoff = Date.now() - RETENTION_MS
+
+  const tx = (await openDb()).transaction([SNAPSHOTS, EVENTS], 'readwrite')
+  await catchUp(tx, snapshot, () => {
+    tx.objectStore(SNAPSHOTS).put(snapshot, SNAPSHOT_KEY)
+    const request = tx.objectStore(EVENTS).openCursor(IDBKeyRange.upperBound(snapshot.lastEventId))
+    request.onsuccess = () => {
+      const cursor = request.result
+      if (!cursor || cursor.value.time >= cutoff) return
+      cursor.delete()
+      cursor.continue()
+    }
+  })
+  Object.assign(aggregates, snapshot)
+  sinceSnapshot = 0
+}
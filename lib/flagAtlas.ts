@@ -0,0 +1,106 @@
+// Flag sprite atlases built by tools/flag_atlas.py. One atlas image holds
+// every flag at a given cell width, so a quiz session loads a single file
+// instead of one PNG per flag; rectangles are looked up by cca2.
+
+import type { CSSProperties } from 'react'
+
+export interface FlagAtlasSize {
+  cell: [number, number]
+  width: number
+  height: number
+  files: { [format: string]: string }
+  // Flat [x, y, w, h] per code
+  rects: number[]
+}
+
+export interface FlagAtlasData {
+  version: number
+  codes: string[]
+  sizes: { [cellWidth: string]: FlagAtlasSize }
+}
+
+const ATLAS_VERSION = 1
+const ATLAS_DIR = '/flags/'
+// Preferred first; image-set() lets the browser skip types it cannot decode
+const FORMATS: [string, string][] = [['avif', 'image/avif'], ['webp', 'image/webp'], ['png', 'image/png']]
+
+export class FlagAtlas {
+  private rows: Map<string, number>
+  private widths: number[]
+
+  constructor(private data: FlagAtlasData) {
+    if (data.version !== ATLAS_VERSION) {
+      throw new Error(`Unsupported flag atlas version ${data.version}`)
+    }
+    this.rows = new Map(data.codes.map((code, row) => [code, row]))
+    this.widths = Object.keys(data.sizes).map(Number).sort((a, b) => a - b)
+  }
+
+  has(cca2: string): boolean {
+    return this.rows.has(cca2.toUpperCase())
+  }
+
+  // Smallest cell width that covers `pixels` device pixels, else the largest
+  pickWidth(pixels: number): number {
+    return this.widths.find(width => width >= pixels) ?? this.widths[this.widths.length - 1]
+  }
+
+  // Background styles that show one flag filling an element of the flag's
+  // aspect ratio, or null when the flag is not in the atlas
+  style(cca2: string, pixels: number): CSSProperties | null {
+    const row = this.rows.get(cca2.toUpperCase())
+    if (row === undefined) return null
+
+    const size = this.data.sizes[this.pickWidth(pixels)]
+    const [x, y, w, h] = size.rects.slice(row * 4, row * 4 + 4)
+    const percent = (offset: number, span: number, total: number) =>
+      total === span ? 0 : (offset / (total - span)) * 100
+
+    return {
+      aspectRatio: `${w} / ${h}`,
+      backgroundImage: atlasImage(size.files),
+      backgroundSize: `${(size.width / w) * 100}% ${(size.height / h) * 100}%`,
+      backgroundPosition: `${percent(x, w, size.width)}% ${percent(y, h, size.height)}%`,
+      backgroundRepeat: 'no-repeat'
+    }
+  }
+}
+
+function atlasImage(files: FlagAtlasSize['files']): string {
+  const available = FORMATS.filter(([format]) => files[format])
+  const supportsTypes = typeof CSS !== 'undefined' &&
+    CSS.supports('background-image', 'image-set(url("a.png") type("image/png"))')
+
+  if (!supportsTypes || available.length === 1) {
+    const [format] = available.find(([format]) => format === 'png') ?? available[0]
+    return `url("${ATLAS_DIR}${files[format]}")`
+  }
+  const candidates = available.map(([format, type]) => `url("${ATLAS_DIR}${files[format]}") type("${type}")`)
+  return `image-set(${candidates.join(', ')})`
+}
+
+let cachedAtlas: Promise<FlagAtlas | null> | null = null
+let loadedAtlas: FlagAtlas | null | undefined
+
+// The atlas index, or null when no atlas has been built
+export function fetchFlagAtlas(): Promise<FlagAtlas | null> {
+  if (!cachedAtlas) {
+    cachedAtlas = fetch(`${ATLAS_DIR}atlas.json`)
+      .then(async response => response.ok ? new FlagAtlas(await response.json()) : null)
+      .catch(error => {
+        console.error('Error fetching flag atlas:', error)
+        return null
+      })
+      .then(atlas => {
+        loadedAtlas = atlas
+        return atlas
+      })
+  }
+  return cachedAtlas
+}
+
+// The atlas once fetchFlagAtlas() has resolved (null when there is none),
+// undefined while it is still unknown
+export function getLoadedFlagAtlas(): FlagAtlas | null | undefined {
+  return loadedAtlas
+}
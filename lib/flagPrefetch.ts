@@ -0,0 +1,42 @@
+// Asks the service worker (public/sw.js) to cache flag images ahead of time,
+// so the next questions' flags show instantly, including offline.
+
+import { QuizQuestion } from '@/types/country'
+import type { FlagAtlas } from '@/lib/flagAtlas'
+
+export interface PrefetchResult {
+  cached: number
+  fetched: number
+  failed: number
+}
+
+// Flags of the `ahead` questions after `current`, leaving out those the
+// sprite atlas shows (they never load as separate images)
+export function upcomingFlags(
+  questions: QuizQuestion[],
+  current: number,
+  ahead: number = 3,
+  atlas: FlagAtlas | null = null
+): string[] {
+  return questions
+    .slice(current + 1, current + 1 + ahead)
+    .filter(question => !(atlas && question.correct.cca2 && atlas.has(question.correct.cca2)))
+    .map(question => question.correct.flags?.png)
+    .filter((url): url is string => Boolean(url))
+}
+
+// Resolves to null when no service worker controls the page
+export function prefetchFlags(urls: string[]): Promise<PrefetchResult | null> {
+  const worker = typeof navigator !== 'undefined' && 'serviceWorker' in navigator
+    ? navigator.serviceWorker.controller
+    : null
+  if (!worker || urls.length === 0) {
+    return Promise.resolve(null)
+  }
+
+  return new Promise(resolve => {
+    const channel = new MessageChannel()
+    channel.port1.onmessage = (event) => resolve(event.data)
+    worker.postMessage({ type: 'PREFETCH_FLAGS', urls }, [channel.port2])
+  })
+}
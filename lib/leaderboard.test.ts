@@ -0,0 +1,86 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { mkdtempSync } from 'fs'
+import { tmpdir } from 'os'
+import path from 'path'
+import { TopK } from './topK'
+
+process.env.LEADERBOARD_DB = path.join(mkdtempSync(path.join(tmpdir(), 'leaderboard-')), 'test.db')
+
+// Deterministic PRNG (mulberry32)
+function random(seed: number) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) >>> 0
+    let t = Math.imul(seed ^ (seed >>> 15), seed | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+test('top-k matches a full sort of every key\'s best item', () => {
+  const next = random(42)
+  interface Item { key: string, value: number, seq: number }
+  const better = (a: Item, b: Item) => a.value !== b.value ? a.value > b.value : a.seq < b.seq
+  for (let run = 0; run < 200; run++) {
+    const k = 1 + Math.floor(next() * 12)
+    const keys = 1 + Math.floor(next() * 40)
+    const top = new TopK<Item>(k, item => item.key, better)
+    const best = new Map<string, Item>()
+    for (let seq = 0; seq < 300; seq++) {
+      const item = { key: `p${Math.floor(next() * keys)}`, value: Math.floor(next() * 50), seq }
+      top.offer(item)
+      const held = best.get(item.key)
+      if (!held || better(item, held)) best.set(item.key, item)
+
+      if (seq % 25 === 0) {
+        const expected = [...best.values()].sort((a, b) => (better(a, b) ? -1 : 1)).slice(0, k)
+        assert.deepEqual(top.items(), expected)
+      }
+    }
+  }
+})
+
+test('results faster than the feedback delay allows are rejected', async () => {
+  const { MIN_MS_PER_QUESTION, ResultError, parseResult } = await import('./leaderboard')
+  const result = { player: 'Ada', mode: 'flags', score: 10, total: 10, streak: 10 }
+
+  assert.throws(() => parseResult({ ...result, ms: 0 }), ResultError)
+  assert.throws(() => parseResult({ ...result, ms: 10 * MIN_MS_PER_QUESTION - 1 }), ResultError)
+  assert.equal(parseResult({ ...result, ms: 10 * MIN_MS_PER_QUESTION }, 5).time, 5)
+  assert.throws(() => parseResult({ ...result, score: 11, ms: 60000 }), ResultError)
+  assert.throws(() => parseResult({ ...result, player: ' ', ms: 60000 }), ResultError)
+})
+
+test('each client gets a burst of submissions, then one per interval', async () => {
+  const { SUBMIT_INTERVAL_MS, allowSubmission } = await import('./leaderboard')
+  const now = 1_000_000
+  const allowed = (client: string, at: number) => allowSubmission(client, at)
+
+  for (let i = 0; i < 5; i++) assert.equal(allowed('10.0.0.1', now), true)
+  assert.equal(allowed('10.0.0.1', now), false)
+  assert.equal(allowed('10.0.0.2', now), true)
+  assert.equal(allowed('10.0.0.1', now + SUBMIT_INTERVAL_MS / 2), false)
+  // Rejected attempts do not push the next token back
+  assert.equal(allowed('10.0.0.1', now + SUBMIT_INTERVAL_MS), true)
+  assert.equal(allowed('10.0.0.1', now + SUBMIT_INTERVAL_MS), false)
+})
+
+test('boards keep each player\'s best result in rank order', async () => {
+  const { flush, getLeaderboard, parseResult, submitResult } = await import('./leaderboard')
+  const now = Date.now()
+  const submit = (player: string, score: number, ms: number) =>
+    submitResult(parseResult({ player, mode: 'capitals', score, total: 10, ms }, now))
+
+  assert.deepEqual(submit('Ada', 7, 40000), ['daily', 'weekly', 'all'])
+  submit('Bob', 9, 90000)
+  submit('Cy', 9, 30000)
+  assert.deepEqual(submit('Ada', 6, 20000), [])
+  submit('Ada', 9, 60000)
+  flush()
+
+  const board = JSON.parse(getLeaderboard('capitals', 'daily', 10))
+  assert.deepEqual(board.entries.map((e: any) => [e.rank, e.player, e.ms]),
+    [[1, 'Cy', 30000], [2, 'Ada', 60000], [3, 'Bob', 90000]])
+})
@@ -0,0 +1,276 @@
+// Global leaderboard behind /api/leaderboard.
+// Submitted results are queued and written to SQLite (WAL mode) in batched
+// transactions. Reads never touch the database: every mode keeps in-memory
+// top-k boards for today, this week and all time, each holding a player's
+// best result. A submission is offered to each board in O(log k), and a board
+// whose day or week has ended is replaced by an empty one for the new
+// window. The database is read once, to rebuild the boards on start.
+//
+// SQLite comes from Node's built-in node:sqlite (Node 22.5+). Without it the
+// leaderboard still works, kept in memory only.
+
+import { mkdirSync } from 'fs'
+import path from 'path'
+import { GameResult, LeaderboardEntry, LeaderboardMode, LeaderboardWindow } from '@/types/leaderboard'
+import { TopK } from '@/lib/topK'
+
+export const LEADERBOARD_DB = process.env.LEADERBOARD_DB
+  || path.join(process.cwd(), '.cache', 'leaderboard.db')
+
+export const LEADERBOARD_MODES: LeaderboardMode[] = ['flags', 'capitals', 'population']
+export const LEADERBOARD_WINDOWS: LeaderboardWindow[] = ['daily', 'weekly', 'all']
+
+// Entries kept per board, and the most a read returns
+export const TOP_K = 100
+export const MAX_PLAYER_LENGTH = 24
+const MAX_QUESTIONS = 50
+const MAX_GAME_MS = 3600000
+// The quiz shows feedback for 1.5 s after every answer, so no game played
+// in the app takes less than this per question
+export const MIN_MS_PER_QUESTION = 1500
+
+// Submissions per client: a burst of SUBMIT_BURST, then one per
+// SUBMIT_INTERVAL_MS. Past MAX_CLIENTS the least recently seen are forgotten.
+const SUBMIT_BURST = 5
+export const SUBMIT_INTERVAL_MS = 60000
+const MAX_CLIENTS = 10000
+
+// A batch is written when this many results are queued or after FLUSH_MS
+const FLUSH_SIZE = 200
+const FLUSH_MS = 250
+// Queued results kept while the database is failing
+const MAX_PENDING = 10000
+
+const DAY_MS = 86400000
+
+export class ResultError extends Error {}
+
+// Higher accuracy, then more questions, then faster, then earlier
+export function ranksAbove(a: GameResult, b: GameResult): boolean {
+  const accuracy = a.score * b.total - b.score * a.total
+  if (accuracy !== 0) return accuracy > 0
+  if (a.total !== b.total) return a.total > b.total
+  if (a.ms !== b.ms) return a.ms < b.ms
+  return a.time < b.time
+}
+
+// Start of the window containing `now` (UTC days, weeks from Monday)
+export function windowStart(window: LeaderboardWindow, now: number = Date.now()): number {
+  if (window === 'all') return 0
+  const day = Math.floor(now / DAY_MS) * DAY_MS
+  if (window === 'daily') return day
+  const sinceMonday = (new Date(day).getUTCDay() + 6) % 7
+  return day - sinceMonday * DAY_MS
+}
+
+interface Board {
+  since: number
+  top: TopK<GameResult>
+  // Serialized reads by limit, dropped whenever the board changes
+  bodies: Map<number, string>
+}
+
+function newBoard(since: number): Board {
+  return { since, top: new TopK<GameResult>(TOP_K, result => result.player, ranksAbove), bodies: new Map() }
+}
+
+const boards = new Map<string, Board>()
+
+function board(mode: LeaderboardMode, window: LeaderboardWindow, now: number): Board {
+  const key = `${mode}:${window}`
+  const since = windowStart(window, now)
+  let current = boards.get(key)
+  if (!current || current.since !== since) {
+    // A new day or week starts empty; results only ever enter the current one
+    current = newBoard(since)
+    boards.set(key, current)
+  }
+  return current
+}
+
+function offer(result: GameResult, now: number): LeaderboardWindow[] {
+  const placed: LeaderboardWindow[] = []
+  for (const window of LEADERBOARD_WINDOWS) {
+    const target = board(result.mode, window, now)
+    if (result.time < target.since) continue
+    if (target.top.offer(result)) target.bodies.clear()
+    if (target.top.get(result.player) === result) placed.push(window)
+  }
+  return placed
+}
+
+// --- Storage ---
+
+let db: any = null
+let insert: any = null
+let loaded = false
+let pending: GameResult[] = []
+let flushTimer: ReturnType<typeof setTimeout> | null = null
+
+function openDb() {
+  const sqlite = (process as any).getBuiltinModule?.('node:sqlite')
+  if (!sqlite) {
+    console.error('Error opening leaderboard database: node:sqlite is unavailable, keeping scores in memory')
+    return
+  }
+  try {
+    mkdirSync(path.dirname(LEADERBOARD_DB), { recursive: true })
+    db = new sqlite.DatabaseSync(LEADERBOARD_DB)
+    db.exec(`
+      PRAGMA journal_mode = WAL;
+      PRAGMA synchronous = NORMAL;
+      CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY,
+        player TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        streak INTEGER NOT NULL,
+        ms INTEGER NOT NULL,
+        time INTEGER NOT NULL
+      );
+      CREATE INDEX IF NOT EXISTS results_mode_time ON results (mode, time);
+    `)
+    insert = db.prepare(
+      'INSERT INTO results (player, mode, score, total, streak, ms, time) VALUES (?, ?, ?, ?, ?, ?, ?)'
+    )
+  } catch (error) {
+    console.error('Error opening leaderboard database:', error)
+    db = null
+  }
+}
+
+// Rebuild the boards from the stored results, one pass per mode
+function load() {
+  loaded = true
+  openDb()
+  if (!db) return
+
+  const now = Date.now()
+  const select = db.prepare('SELECT player, mode, score, total, streak, ms, time FROM results WHERE mode = ?')
+  for (const mode of LEADERBOARD_MODES) {
+    for (const row of select.iterate(mode)) {
+      // Stored before the time floor existed
+      if (row.ms < row.total * MIN_MS_PER_QUESTION) continue
+      offer({ ...row } as GameResult, now)
+    }
+  }
+
+  // Queued results are written synchronously if the process exits first
+  process.once('exit', flush)
+}
+
+function scheduleFlush() {
+  if (pending.length >= FLUSH_SIZE) {
+    flush()
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flush, FLUSH_MS)
+  }
+}
+
+// Write every queued result in one transaction
+export function flush() {
+  if (flushTimer) {
+    clearTimeout(flushTimer)
+    flushTimer = null
+  }
+  if (!db || pending.length === 0) {
+    pending = []
+    return
+  }
+
+  const batch = pending
+  pending = []
+  try {
+    db.exec('BEGIN')
+    for (const r of batch) {
+      insert.run(r.player, r.mode, r.score, r.total, r.streak, r.ms, r.time)
+    }
+    db.exec('COMMIT')
+  } catch (error) {
+    console.error('Error writing leaderboard results:', error)
+    try {
+      db.exec('ROLLBACK')
+    } catch {}
+    // Retry with the next batch, dropping the oldest past the bound
+    pending = batch.concat(pending).slice(-MAX_PENDING)
+    flushTimer = setTimeout(flush, FLUSH_MS * 4)
+  }
+}
+
+// --- API ---
+
+function integer(value: unknown, name: string, min: number, max: number): number {
+  if (typeof value !== 'number' || !Number.isInteger(value) || value < min || value > max) {
+    throw new ResultError(`${name} must be an integer between ${min} and ${max}`)
+  }
+  return value
+}
+
+export function parseResult(input: any, now: number = Date.now()): GameResult {
+  if (!input || typeof input !== 'object') {
+    throw new ResultError('Expected a JSON object')
+  }
+  const player = typeof input.player === 'string' ? input.player.trim().replace(/\s+/g, ' ') : ''
+  if (!player || player.length > MAX_PLAYER_LENGTH || /[\u0000-\u001f\u007f]/.test(player)) {
+    throw new ResultError(`player must be 1 to ${MAX_PLAYER_LENGTH} printable characters`)
+  }
+  if (!LEADERBOARD_MODES.includes(input.mode)) {
+    throw new ResultError(`mode must be one of ${LEADERBOARD_MODES.join(', ')}`)
+  }
+  const total = integer(input.total, 'total', 1, MAX_QUESTIONS)
+  return {
+    player,
+    mode: input.mode,
+    score: integer(input.score, 'score', 0, total),
+    total,
+    streak: integer(input.streak ?? 0, 'streak', 0, total),
+    ms: integer(input.ms, 'ms', total * MIN_MS_PER_QUESTION, MAX_GAME_MS),
+    // Results are dated by the server
+    time: now
+  }
+}
+
+const submitters = new Map<string, { tokens: number, at: number }>()
+
+// Take a submission token for `client` (a token bucket per client); false
+// when it has none left
+export function allowSubmission(client: string, now: number = Date.now()): boolean {
+  const bucket = submitters.get(client)
+  const tokens = bucket
+    ? Math.min(SUBMIT_BURST, bucket.tokens + (now - bucket.at) / SUBMIT_INTERVAL_MS)
+    : SUBMIT_BURST
+  // Re-inserted so the map stays ordered from least to most recently seen
+  submitters.delete(client)
+  submitters.set(client, { tokens: tokens >= 1 ? tokens - 1 : tokens, at: now })
+  if (submitters.size > MAX_CLIENTS) {
+    submitters.delete(submitters.keys().next().value as string)
+  }
+  return tokens >= 1
+}
+
+// Record a result; returns the windows whose board it placed on
+export function submitResult(result: GameResult): LeaderboardWindow[] {
+  if (!loaded) load()
+  const placed = offer(result, result.time)
+  if (db) {
+    pending.push(result)
+    scheduleFlush()
+  }
+  return placed
+}
+
+// Serialized board for (mode, window), straight from memory
+export function getLeaderboard(mode: LeaderboardMode, window: LeaderboardWindow, limit: number = 10): string {
+  if (!loaded) load()
+  const current = board(mode, window, Date.now())
+  let body = current.bodies.get(limit)
+  if (body === undefined) {
+    const entries: LeaderboardEntry[] = current.top.items()
+      .slice(0, limit)
+      .map((result, i) => ({ rank: i + 1, ...result }))
+    body = JSON.stringify({ mode, window, since: current.since, entries })
+    current.bodies.set(limit, body)
+  }
+  return body
+}
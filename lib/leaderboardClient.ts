@@ -0,0 +1,71 @@
+// Browser side of the leaderboard: the player's chosen name, submitting a
+// finished game and reading a board from /api/leaderboard.
+
+import { Leaderboard, LeaderboardMode, LeaderboardWindow } from '@/types/leaderboard'
+
+const LEADERBOARD_API = '/api/leaderboard'
+const PLAYER_KEY = 'country-quiz-player'
+
+export function getPlayerName(): string {
+  if (typeof window === 'undefined') return ''
+  try {
+    return localStorage.getItem(PLAYER_KEY) || ''
+  } catch {
+    return ''
+  }
+}
+
+export function setPlayerName(name: string): void {
+  if (typeof window === 'undefined') return
+  try {
+    const trimmed = name.trim()
+    if (trimmed) localStorage.setItem(PLAYER_KEY, trimmed)
+    else localStorage.removeItem(PLAYER_KEY)
+  } catch (error) {
+    console.error('Error saving player name:', error)
+  }
+}
+
+// Submit a finished game under the player's name; games are only submitted
+// once the player has chosen one
+export async function submitScore(result: {
+  mode: LeaderboardMode
+  score: number
+  total: number
+  streak: number
+  ms: number
+}): Promise<LeaderboardWindow[]> {
+  const player = getPlayerName()
+  if (!player) return []
+  try {
+    const response = await fetch(LEADERBOARD_API, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ player, ...result })
+    })
+    if (!response.ok) {
+      throw new Error(`API returned ${response.status}`)
+    }
+    return (await response.json()).placed
+  } catch (error) {
+    console.error('Error submitting score:', error)
+    return []
+  }
+}
+
+export async function fetchLeaderboard(
+  mode: LeaderboardMode,
+  window: LeaderboardWindow,
+  limit: number = 10
+): Promise<Leaderboard | null> {
+  try {
+    const response = await fetch(`${LEADERBOARD_API}?mode=${mode}&window=${window}&limit=${limit}`)
+    if (!response.ok) {
+      throw new Error(`API returned ${response.status}`)
+    }
+    return await response.json()
+  } catch (error) {
+    console.error('Error fetching leaderboard:', error)
+    return null
+  }
+}
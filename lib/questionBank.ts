@@ -0,0 +1,132 @@
+// Reader for the precomputed question pools written by tools/question_bank.py.
+// Server-only: a quiz is a single read of quizSize fixed-size records at a
+// random offset into one shard, mapped onto countries from the snapshot.
+
+import { createHash } from 'crypto'
+import { closeSync, openSync, readFileSync, readSync } from 'fs'
+import path from 'path'
+import { Country, QuizQuestion } from '@/types/country'
+import { CountrySnapshot, DEFAULT_SNAPSHOT_PATH } from '@/lib/countrySnapshot'
+
+export type QuizMode = QuizQuestion['type']
+
+interface Shard {
+  file: string
+  quizzes: number
+  sha256: string
+}
+
+interface Manifest {
+  version: number
+  snapshot: { sha256: string, count: number }
+  record: { bytes: number, options: number, no_option: number }
+  quiz_size: number
+  modes: { [mode: string]: { quizzes: number, shards: Shard[] } }
+}
+
+const MANIFEST_VERSION = 1
+
+export const DEFAULT_BANK_DIR = process.env.QUESTION_BANK_DIR
+  || path.join(process.cwd(), 'data', 'question-bank')
+
+export class QuestionBank {
+  readonly quizSize: number
+  private countryCache = new Map<number, Country>()
+
+  constructor(
+    private dir: string,
+    private manifest: Manifest,
+    private snapshot: CountrySnapshot
+  ) {
+    this.quizSize = manifest.quiz_size
+  }
+
+  static open(dir: string = DEFAULT_BANK_DIR, snapshotFile: string = DEFAULT_SNAPSHOT_PATH): QuestionBank {
+    const manifest: Manifest = JSON.parse(readFileSync(path.join(dir, 'manifest.json'), 'utf8'))
+    if (manifest.version !== MANIFEST_VERSION) {
+      throw new Error(`Unsupported question bank version ${manifest.version}`)
+    }
+
+    // Pool rows index the snapshot they were generated from
+    const snapshotBytes = readFileSync(snapshotFile)
+    const digest = createHash('sha256').update(snapshotBytes).digest('hex')
+    if (digest !== manifest.snapshot.sha256) {
+      throw new Error('Question bank was generated from a different country snapshot')
+    }
+    return new QuestionBank(dir, manifest, new CountrySnapshot(snapshotBytes))
+  }
+
+  hasMode(mode: QuizMode): boolean {
+    return Boolean(this.manifest.modes[mode]?.quizzes)
+  }
+
+  quizCount(mode: QuizMode): number {
+    return this.manifest.modes[mode]?.quizzes ?? 0
+  }
+
+  // Quiz number `index` (0 <= index < quizCount) of a mode
+  quiz(mode: QuizMode, index: number): QuizQuestion[] {
+    const pool = this.manifest.modes[mode]
+    if (!pool || index < 0 || index >= pool.quizzes) {
+      throw new RangeError(`No quiz ${index} for mode ${mode}`)
+    }
+
+    let shard = 0
+    while (index >= pool.shards[shard].quizzes) {
+      index -= pool.shards[shard].quizzes
+      shard++
+    }
+
+    const { bytes, options: width, no_option: noOption } = this.manifest.record
+    const buffer = Buffer.alloc(bytes * this.quizSize)
+    const fd = openSync(path.join(this.dir, pool.shards[shard].file), 'r')
+    try {
+      readSync(fd, buffer, 0, buffer.length, index * buffer.length)
+    } finally {
+      closeSync(fd)
+    }
+
+    const questions: QuizQuestion[] = []
+    for (let q = 0; q < this.quizSize; q++) {
+      const base = q * bytes
+      const options: Country[] = []
+      for (let o = 0; o < width; o++) {
+        const row = buffer.readUInt16LE(base + o * 2)
+        if (row !== noOption) options.push(this.country(row))
+      }
+      const answer = buffer.readUInt8(base + width * 2)
+      questions.push({ correct: options[answer], options, type: mode })
+    }
+    return questions
+  }
+
+  randomQuiz(mode: QuizMode, random: () => number = Math.random): QuizQuestion[] {
+    return this.quiz(mode, Math.floor(random() * this.quizCount(mode)))
+  }
+
+  private country(row: number): Country {
+    let country = this.countryCache.get(row)
+    if (!country) {
+      country = this.snapshot.country(row)
+      this.countryCache.set(row, country)
+    }
+    return country
+  }
+}
+
+let bank: QuestionBank | null | undefined
+
+// The question bank on disk, or null when none has been generated
+export function loadQuestionBank(): QuestionBank | null {
+  if (bank === undefined) {
+    try {
+      bank = QuestionBank.open()
+    } catch (error: any) {
+      if (error?.code !== 'ENOENT') {
+        console.error('Error opening question bank:', error?.message || error)
+      }
+      bank = null
+    }
+  }
+  return bank
+}
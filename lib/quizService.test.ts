@@ -0,0 +1,86 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { mkdtempSync, writeFileSync } from 'fs'
+import { tmpdir } from 'os'
+import path from 'path'
+
+// A fresh country cache on disk and no question bank, so quizzes are
+// generated from these countries without reaching upstream
+const dir = mkdtempSync(path.join(tmpdir(), 'quiz-service-'))
+process.env.COUNTRIES_CACHE_FILE = path.join(dir, 'countries.json')
+process.env.QUESTION_BANK_DIR = path.join(dir, 'question-bank')
+writeFileSync(process.env.COUNTRIES_CACHE_FILE, JSON.stringify({
+  time: Date.now(),
+  data: Array.from({ length: 40 }, (_, i) => ({
+    name: { common: `Country ${i}`, official: `Republic of Country ${i}` },
+    capital: [`Capital ${i}`],
+    population: 1000 + i * 100_000,
+    flags: { png: `${i}.png`, svg: `${i}.svg` },
+    region: ['Africa', 'Asia', 'Europe'][i % 3],
+    cca2: `${i}`,
+    cca3: `C${i}`
+  }))
+}))
+
+// Quizzes are serialized only when generated, so this counts cache misses
+let generated = 0
+const stringify = JSON.stringify
+JSON.stringify = ((value: any, ...rest: any[]) => {
+  if (value?.questions) generated++
+  return stringify(value, ...rest)
+}) as typeof JSON.stringify
+
+test('a (mode, n, seed) triple always yields the same quiz', async () => {
+  const { getQuiz } = await import('./quizService')
+  for (const mode of ['flag', 'capital', 'population'] as const) {
+    const quiz = await getQuiz(mode, 10, 1234, false)
+    const parsed = JSON.parse(quiz)
+    assert.equal(parsed.questions.length, 10)
+    assert.equal(parsed.seed, 1234)
+    assert.equal(await getQuiz(mode, 10, 1234, false), quiz)
+    assert.equal(await getQuiz(mode, 10, 1234), quiz)
+    assert.notEqual(await getQuiz(mode, 10, 4321, false), quiz)
+  }
+})
+
+test('client-seeded quizzes are kept in an LRU of 1000', async () => {
+  const { getQuiz } = await import('./quizService')
+  const seeds = Array.from({ length: 1000 }, (_, i) => 10_000 + i)
+  for (const seed of seeds) await getQuiz('capital', 1, seed)
+
+  generated = 0
+  for (const seed of seeds) await getQuiz('capital', 1, seed)
+  assert.equal(generated, 0)
+
+  // Random-seed quizzes are never stored
+  await getQuiz('capital', 1, 5, false)
+  await getQuiz('capital', 1, 5, false)
+  assert.equal(generated, 2)
+
+  // Reading the oldest entry again moves it to the end; the next insert
+  // evicts the one after it instead
+  await getQuiz('capital', 1, seeds[0])
+  await getQuiz('capital', 1, 99)
+  generated = 0
+  await getQuiz('capital', 1, seeds[0])
+  assert.equal(generated, 0)
+  await getQuiz('capital', 1, seeds[1])
+  assert.equal(generated, 1)
+})
+
+test('seeds are validated and the daily seed is fixed per UTC day', async () => {
+  const { QuizRequestError, dailySeed, parseSeed } = await import('./quizService')
+  assert.equal(parseSeed(null), null)
+  assert.equal(parseSeed(''), null)
+  assert.deepEqual(parseSeed('4294967295'), { seed: 4294967295, daily: false })
+  for (const raw of ['-1', '1.5', 'abc', '4294967296', '12345678901']) {
+    assert.throws(() => parseSeed(raw), QuizRequestError)
+  }
+  assert.deepEqual(parseSeed('daily'), { seed: dailySeed(), daily: true })
+
+  const morning = dailySeed(new Date('2026-01-02T00:00:00Z'))
+  assert.equal(dailySeed(new Date('2026-01-02T23:59:59Z')), morning)
+  assert.notEqual(dailySeed(new Date('2026-01-03T00:00:00Z')), morning)
+})
@@ -0,0 +1,169 @@
+// Server-side quiz generation behind /api/quiz.
+// Quizzes are drawn with a seeded PRNG (or read from the question bank when
+// one has been generated), so a (mode, n, seed) triple always yields the same
+// questions for the same country data. Serialized quizzes for client-supplied
+// seeds are kept in an LRU; random-seed quizzes are never asked for again, so
+// they are not cached.
+
+import { readFileSync } from 'fs'
+import path from 'path'
+import { Country, QuizQuestion } from '@/types/country'
+import { CacheEntry, getCountryEntry } from '@/lib/countryCache'
+import { buildCapitalQuestions, buildFlagQuestions, buildPopulationQuestions } from '@/lib/countries'
+import { DistractorIndex } from '@/lib/distractors'
+import { QuizMode, loadQuestionBank } from '@/lib/questionBank'
+import { getSamplingEngine, seededRandom } from '@/lib/sampling'
+
+export const QUIZ_MODES: QuizMode[] = ['flag', 'capital', 'population']
+export const MAX_QUESTIONS = 50
+
+const DISTRACTORS_FILE = path.join(process.cwd(), 'public', 'distractors.json')
+const MAX_CACHED_QUIZZES = 1000
+
+export class QuizRequestError extends Error {}
+
+// Only the fields each quiz page renders or compares
+type QuizCountry = Partial<Country> & { cca3: string }
+
+function slim(country: Country, mode: QuizMode, correct: boolean): QuizCountry {
+  const name = { common: country.name.common } as Country['name']
+  if (mode === 'flag') {
+    return correct
+      ? { cca3: country.cca3, cca2: country.cca2, name, flags: { png: country.flags.png } as Country['flags'] }
+      : { cca3: country.cca3, name }
+  }
+  if (mode === 'capital') {
+    return correct ? { cca3: country.cca3, name } : { cca3: country.cca3, capital: country.capital }
+  }
+  return { cca3: country.cca3, name }
+}
+
+function slimQuestion(question: QuizQuestion) {
+  return {
+    type: question.type,
+    correct: slim(question.correct, question.type, true),
+    options: question.options.map(option => slim(option, question.type, false))
+  }
+}
+
+// FNV-1a, for turning date strings into 32-bit seeds
+function hashSeed(text: string): number {
+  let hash = 0x811c9dc5
+  for (let i = 0; i < text.length; i++) {
+    hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193)
+  }
+  return hash >>> 0
+}
+
+let daily: { day: string, seed: number } | null = null
+
+// Seed of today's challenge (UTC), the same for every player
+export function dailySeed(now: Date = new Date()): number {
+  const day = now.toISOString().slice(0, 10)
+  if (!daily || daily.day !== day) {
+    daily = { day, seed: hashSeed(`daily:${day}`) }
+  }
+  return daily.seed
+}
+
+export function parseSeed(raw: string | null): { seed: number, daily: boolean } | null {
+  if (raw === null || raw === '') return null
+  if (raw === 'daily') return { seed: dailySeed(), daily: true }
+  if (!/^\d{1,10}$/.test(raw) || Number(raw) > 0xffffffff) {
+    throw new QuizRequestError(`Invalid seed ${raw}`)
+  }
+  return { seed: Number(raw), daily: false }
+}
+
+let distractors: DistractorIndex | null | undefined
+
+function loadDistractors(): DistractorIndex | null {
+  if (distractors === undefined) {
+    try {
+      distractors = new DistractorIndex(JSON.parse(readFileSync(DISTRACTORS_FILE, 'utf8')))
+    } catch (error: any) {
+      if (error?.code !== 'ENOENT') {
+        console.error('Error loading distractor index:', error?.message || error)
+      }
+      distractors = null
+    }
+  }
+  return distractors
+}
+
+let playable: { version: number, countries: Country[] } | null = null
+
+// Same filter as fetchCountries, memoized per cache fill so the sampling
+// engine is built once per country list
+function playableCountries(entry: CacheEntry): Country[] {
+  if (!playable || playable.version !== entry.version) {
+    const data: Country[] = Array.isArray(entry.data) ? entry.data : []
+    playable = {
+      version: entry.version,
+      countries: data.filter(country =>
+        country.name?.common &&
+        country.flags?.png &&
+        country.population > 0
+      )
+    }
+  }
+  return playable.countries
+}
+
+function generate(entry: CacheEntry, mode: QuizMode, n: number, seed: number): QuizQuestion[] {
+  // The bank's flag options are drawn uniformly at random, not from the
+  // nearest-neighbour tiers, so with a distractor index flag quizzes are
+  // generated here instead, keeping their difficulty the same on both paths
+  const knn = mode === 'flag' ? loadDistractors() : null
+
+  // Pooled quizzes are already deterministic by index
+  const bank = loadQuestionBank()
+  if (!knn && bank && bank.hasMode(mode) && bank.quizSize === n) {
+    return bank.quiz(mode, seed % bank.quizCount(mode))
+  }
+
+  const engine = getSamplingEngine(playableCountries(entry))
+  engine.reset()
+  const random = seededRandom(seed)
+  if (mode === 'flag') {
+    return buildFlagQuestions(engine, n, { random, distractors: knn })
+  }
+  if (mode === 'capital') {
+    return buildCapitalQuestions(engine, n, { random })
+  }
+  return buildPopulationQuestions(engine, n, { random })
+}
+
+const quizzes = new Map<string, string>()
+let quizzesVersion = -1
+
+// Serialized quiz for (mode, n, seed), newest-used last in the Map. Only
+// quizzes with `cache` set (a seed the client chose) are kept.
+export async function getQuiz(mode: QuizMode, n: number, seed: number, cache: boolean = true): Promise<string> {
+  const entry = await getCountryEntry()
+  if (entry.version !== quizzesVersion) {
+    quizzes.clear()
+    quizzesVersion = entry.version
+  }
+
+  const key = `${mode}:${n}:${seed}`
+  const cached = quizzes.get(key)
+  if (cached !== undefined) {
+    quizzes.delete(key)
+    quizzes.set(key, cached)
+    return cached
+  }
+
+  const questions = generate(entry, mode, n, seed)
+  if (questions.length === 0) {
+    throw new Error('No countries available')
+  }
+  const body = JSON.stringify({ mode, n, seed, questions: questions.map(slimQuestion) })
+  if (!cache) return body
+
+  quizzes.set(key, body)
+  if (quizzes.size > MAX_CACHED_QUIZZES) {
+    quizzes.delete(quizzes.keys().next().value as string)
+  }
+  return body
+}
@@ -0,0 +1,81 @@
+// Run with: npm test
+
+import test from 'node:test'
+import assert from 'node:assert/strict'
+import { Country } from '../types/country'
+import { buildFlagQuestions } from './countries'
+import { SamplePool, SamplingEngine, sampleIndices, seededRandom } from './sampling'
+
+const REGIONS = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania']
+
+function makeCountries(n: number): Country[] {
+  return Array.from({ length: n }, (_, i) => ({
+    name: { common: `Country ${i}`, official: `Republic of Country ${i}` },
+    capital: i % 4 === 0 ? [] : [`Capital ${i}`],
+    population: 1_000 + i * 100_000,
+    flags: { png: `${i}.png`, svg: `${i}.svg` },
+    region: REGIONS[i % REGIONS.length],
+    area: 100 + i,
+    cca2: `${i}`,
+    cca3: `C${i}`
+  }))
+}
+
+test('pool samples are distinct, skip excluded items and replay after reset', () => {
+  const pool = new SamplePool(Array.from({ length: 50 }, (_, i) => i))
+  const random = seededRandom(7)
+  for (let round = 0; round < 200; round++) {
+    const sample = pool.sample(10, random, item => item % 5 === 0)
+    assert.equal(sample.length, 10)
+    assert.equal(new Set(sample).size, 10)
+    assert.ok(sample.every(item => item % 5 !== 0))
+  }
+  assert.equal(pool.sample(100, random).length, 50)
+
+  pool.reset()
+  const first = pool.sample(5, seededRandom(3))
+  pool.sample(20, random)
+  pool.reset()
+  assert.deepEqual(pool.sample(5, seededRandom(3)), first)
+})
+
+test('sampleIndices draws distinct indices, uniformly', () => {
+  const random = seededRandom(11)
+  const counts = new Array(10).fill(0)
+  for (let round = 0; round < 20_000; round++) {
+    const picked = sampleIndices(10, 3, random)
+    assert.equal(new Set(picked).size, 3)
+    picked.forEach(i => counts[i]++)
+  }
+  // Each index expects 6000 picks
+  assert.ok(counts.every(count => Math.abs(count - 6000) < 300), String(counts))
+  assert.equal(sampleIndices(2, 5, random).length, 2)
+})
+
+test('flag questions favour wrong answers from the correct region', () => {
+  const engine = new SamplingEngine(makeCountries(250))
+  const random = seededRandom(5)
+  let sameRegion = 0
+  let wrong = 0
+  for (let round = 0; round < 400; round++) {
+    for (const question of buildFlagQuestions(engine, 10, { random })) {
+      const codes = question.options.map(c => c.cca3)
+      assert.equal(new Set(codes).size, 4)
+      assert.ok(codes.includes(question.correct.cca3))
+      for (const option of question.options) {
+        if (option === question.correct) continue
+        wrong++
+        if (option.region === question.correct.region) sameRegion++
+      }
+    }
+  }
+  // 49 region-mates and 200 others, accepted half of the time: 49 / 149
+  assert.ok(Math.abs(sameRegion / wrong - 49 / 149) < 0.02, String(sameRegion / wrong))
+})
+
+test('flag questions work when every country shares one region', () => {
+  const countries = makeCountries(8).map(c => ({ ...c, region: 'Europe' }))
+  const questions = buildFlagQuestions(new SamplingEngine(countries), 5, { random: seededRandom(1) })
+  assert.equal(questions.length, 5)
+  assert.ok(questions.every(q => new Set(q.options.map(c => c.cca3)).size === 4))
+})
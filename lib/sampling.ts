@@ -0,0 +1,125 @@
+// Sampling engine for question generation.
+// Views over the country list (per region, capitals only, well-known
+// countries) are built once, and samples are drawn with a partial
+// Fisher-Yates pass over a persistent index permutation, so drawing k items
+// costs O(k) instead of copying and shuffling the whole list.
+
+import { Country } from '@/types/country'
+
+export type Random = () => number
+
+// Deterministic PRNG (mulberry32) for reproducible quizzes
+export function seededRandom(seed: number): Random {
+  let state = seed >>> 0
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0
+    let t = state
+    t = Math.imul(t ^ (t >>> 15), t | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+export class SamplePool<T> {
+  readonly items: readonly T[]
+  private order: Uint32Array
+
+  constructor(items: readonly T[]) {
+    this.items = items
+    this.order = new Uint32Array(items.length)
+    this.reset()
+  }
+
+  // Restore the identity permutation, so a seeded PRNG draws the same
+  // samples no matter what was drawn before
+  reset() {
+    for (let i = 0; i < this.order.length; i++) this.order[i] = i
+  }
+
+  get size(): number {
+    return this.items.length
+  }
+
+  // Up to `count` distinct items in random order, skipping excluded ones.
+  // The permutation is left partially shuffled, which keeps later samples
+  // uniform since Fisher-Yates is uniform from any starting order.
+  sample(count: number, random: Random = Math.random, exclude?: (item: T) => boolean): T[] {
+    const result: T[] = []
+    const order = this.order
+    const n = order.length
+    for (let i = 0; i < n && result.length < count; i++) {
+      const j = i + Math.floor(random() * (n - i))
+      const picked = order[j]
+      order[j] = order[i]
+      order[i] = picked
+      const item = this.items[picked]
+      if (!exclude || !exclude(item)) result.push(item)
+    }
+    return result
+  }
+}
+
+// k distinct items of an arbitrary array without copying it (Floyd's
+// algorithm), returned in random order
+export function sampleIndices(n: number, count: number, random: Random = Math.random): number[] {
+  const k = Math.min(count, n)
+  const chosen = new Set<number>()
+  const result: number[] = []
+  for (let j = n - k; j < n; j++) {
+    const t = Math.floor(random() * (j + 1))
+    const pick = chosen.has(t) ? j : t
+    chosen.add(pick)
+    // Insert at a random position so the output order is uniform too
+    const at = Math.floor(random() * (result.length + 1))
+    result.push(pick)
+    ;[result[at], result[result.length - 1]] = [result[result.length - 1], result[at]]
+  }
+  return result
+}
+
+export class SamplingEngine {
+  readonly source: readonly Country[]
+  readonly all: SamplePool<Country>
+  readonly popular: SamplePool<Country>
+  readonly withCapitals: SamplePool<Country>
+  readonly byRegion: Map<string, SamplePool<Country>>
+
+  constructor(countries: readonly Country[]) {
+    this.source = countries
+    this.all = new SamplePool(countries)
+    // Well-known countries make for better flag questions
+    this.popular = new SamplePool(countries.filter(c =>
+      c.population > 5_000_000 || c.name.common.length <= 12
+    ))
+    this.withCapitals = new SamplePool(countries.filter(c => c.capital && c.capital.length > 0))
+
+    const regions = new Map<string, Country[]>()
+    for (const country of countries) {
+      const bucket = regions.get(country.region)
+      if (bucket) bucket.push(country)
+      else regions.set(country.region, [country])
+    }
+    this.byRegion = new Map(Array.from(regions, ([region, members]) => [region, new SamplePool(members)]))
+  }
+
+  reset() {
+    this.all.reset()
+    this.popular.reset()
+    this.withCapitals.reset()
+    this.byRegion.forEach(pool => pool.reset())
+  }
+
+  region(region: string): SamplePool<Country> | undefined {
+    return this.byRegion.get(region)
+  }
+}
+
+let cachedEngine: SamplingEngine | null = null
+
+// Engine for a country list, rebuilt only when the list itself changes
+export function getSamplingEngine(countries: readonly Country[]): SamplingEngine {
+  if (!cachedEngine || cachedEngine.source !== countries) {
+    cachedEngine = new SamplingEngine(countries)
+  }
+  return cachedEngine
+}
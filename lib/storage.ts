@@ -1,4 +1,9 @@
-// Local storage utilities for game state
+// Local storage utilities for game state.
+// The summary below is parsed once into memory and written back after each
+// game; per-question history and per-country/per-mode aggregates live in
+// the IndexedDB event log (see lib/eventLog.ts).
+
+import { StatsMode, appendEvent } from '@/lib/eventLog'
 
 export interface GameStats {
   totalGames: number
@@ -16,26 +21,43 @@ export interface GameStats {
 
 const STORAGE_KEY = 'country-quiz-stats'
 
+let cachedStats: GameStats | null = null
+let achievementSet = new Set<string>()
+
+// Another tab saved its stats; re-read them on next access
+if (typeof window !== 'undefined') {
+  window.addEventListener('storage', (event) => {
+    if (event.key === STORAGE_KEY) cachedStats = null
+  })
+}
+
 export function getGameStats(): GameStats {
   if (typeof window === 'undefined') {
     return getDefaultStats()
   }
+  if (cachedStats) {
+    return cachedStats
+  }
 
+  cachedStats = getDefaultStats()
   try {
     const stored = localStorage.getItem(STORAGE_KEY)
     if (stored) {
-      return JSON.parse(stored)
+      cachedStats = JSON.parse(stored)
     }
   } catch (error) {
     console.error('Error loading game stats:', error)
   }
 
-  return getDefaultStats()
+  achievementSet = new Set(cachedStats!.achievements)
+  return cachedStats!
 }
 
 export function saveGameStats(stats: GameStats): void {
   if (typeof window === 'undefined') return
 
+  cachedStats = stats
+  achievementSet = new Set(stats.achievements)
   try {
     localStorage.setItem(STORAGE_KEY, JSON.stringify(stats))
   } catch (error) {
@@ -43,8 +65,20 @@ export function saveGameStats(stats: GameStats): void {
   }
 }
 
+// Log one answered question for per-country and per-mode accuracy;
+// `chosen` is the option picked and `ms` the time taken to answer
+export function recordAnswer(
+  mode: StatsMode,
+  cca3: string,
+  correct: boolean,
+  { chosen, ms }: { chosen?: string, ms?: number } = {}
+): void {
+  if (typeof window === 'undefined') return
+  appendEvent({ type: 'answer', mode, cca3, correct, chosen, ms, time: Date.now() })
+}
+
 export function updateGameStats(
-  mode: 'flags' | 'capitals' | 'population',
+  mode: StatsMode,
   score: number,
   totalQuestions: number,
   correctAnswersInRow: number
@@ -74,14 +108,21 @@ export function updateGameStats(
   }
 
   // Check for new achievements
+  const unlocked: string[] = []
   const newAchievements = checkAchievements(stats, score, totalQuestions)
   newAchievements.forEach(achievement => {
-    if (!stats.achievements.includes(achievement)) {
+    if (!achievementSet.has(achievement)) {
+      achievementSet.add(achievement)
       stats.achievements.push(achievement)
+      unlocked.push(achievement)
     }
   })
 
   saveGameStats(stats)
+  if (typeof window !== 'undefined') {
+    const achievements = unlocked.length > 0 ? unlocked : undefined
+    appendEvent({ type: 'game', mode, score, total: totalQuestions, achievements, time: Date.now() })
+  }
   return stats
 }
 
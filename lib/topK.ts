@@ -0,0 +1,103 @@
+// Bounded top-k keyed by id, for leaderboards.
+// A min-heap holds the k best items with the worst at the root, plus a map
+// from key to heap slot, so offering an item or replacing a key's item is
+// O(log k). Items pushed out of the heap never return: the weakest kept
+// item only gets better, so anything below it stays below it.
+
+export type Better<T> = (a: T, b: T) => boolean
+
+export class TopK<T> {
+  private heap: T[] = []
+  private slots = new Map<string, number>()
+  private sorted: T[] | null = []
+
+  constructor(
+    readonly k: number,
+    private keyOf: (item: T) => string,
+    // True when a ranks above b
+    private better: Better<T>
+  ) {}
+
+  get size(): number {
+    return this.heap.length
+  }
+
+  // The weakest kept item once full; anything not better is rejected
+  get threshold(): T | undefined {
+    return this.heap.length === this.k ? this.heap[0] : undefined
+  }
+
+  get(key: string): T | undefined {
+    const slot = this.slots.get(key)
+    return slot === undefined ? undefined : this.heap[slot]
+  }
+
+  // Keep `item` if it makes the top k and beats the item already held for
+  // its key. Returns true when the ranking changed.
+  offer(item: T): boolean {
+    const key = this.keyOf(item)
+    const slot = this.slots.get(key)
+    if (slot !== undefined) {
+      if (!this.better(item, this.heap[slot])) return false
+      // Improving an item moves it away from the root
+      this.heap[slot] = item
+      this.sink(slot)
+    } else if (this.heap.length < this.k) {
+      this.heap.push(item)
+      this.slots.set(key, this.heap.length - 1)
+      this.rise(this.heap.length - 1)
+    } else {
+      if (this.k === 0 || !this.better(item, this.heap[0])) return false
+      this.slots.delete(this.keyOf(this.heap[0]))
+      this.heap[0] = item
+      this.slots.set(key, 0)
+      this.sink(0)
+    }
+    this.sorted = null
+    return true
+  }
+
+  // Best first; cached until the next change
+  items(): T[] {
+    if (!this.sorted) {
+      this.sorted = [...this.heap].sort((a, b) => (this.better(a, b) ? -1 : this.better(b, a) ? 1 : 0))
+    }
+    return this.sorted
+  }
+
+  clear() {
+    this.heap = []
+    this.slots.clear()
+    this.sorted = []
+  }
+
+  private swap(i: number, j: number) {
+    const heap = this.heap
+    ;[heap[i], heap[j]] = [heap[j], heap[i]]
+    this.slots.set(this.keyOf(heap[i]), i)
+    this.slots.set(this.keyOf(heap[j]), j)
+  }
+
+  private rise(i: number) {
+    while (i > 0) {
+      const parent = (i - 1) >> 1
+      if (!this.better(this.heap[parent], this.heap[i])) break
+      this.swap(i, parent)
+      i = parent
+    }
+  }
+
+  private sink(i: number) {
+    const n = this.heap.length
+    for (;;) {
+      let worst = i
+      const left = 2 * i + 1
+      const right = left + 1
+      if (left < n && this.better(this.heap[worst], this.heap[left])) worst = left
+      if (right < n && this.better(this.heap[worst], this.heap[right])) worst = right
+      if (worst === i) return
+      this.swap(i, worst)
+      i = worst
+    }
+  }
+}
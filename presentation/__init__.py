@@ -0,0 +1,3 @@
+"""
+Supporting modules for create_presentation.py.
+"""
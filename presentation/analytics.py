@@ -0,0 +1,71 @@
+"""
+Gameplay analytics section built from a summary written by tools/analytics.py.
+"""
+
+import json
+
+# Must match ANALYTICS_VERSION in tools/analytics.py, which is not imported
+# here so that rendering does not need NumPy
+ANALYTICS_VERSION = 1
+ANALYTICS_TITLE = 'Gameplay Analytics'
+MODE_COLUMNS = ('Mode', 'Games', 'Answers', 'Accuracy', 'Median time', 'p90 time', 'p99 time')
+COUNTRY_COLUMNS = ('Country', 'Answers', 'Accuracy')
+CONFUSION_COLUMNS = ('Mode', 'Correct answer', 'Mistaken for', 'Times', 'Share')
+
+
+def load_summary(path):
+    """Load an analytics summary JSON."""
+    with open(path, encoding='utf-8') as f:
+        summary = json.load(f)
+    if summary.get('version') != ANALYTICS_VERSION:
+        raise ValueError(f'{path} is not a version {ANALYTICS_VERSION} analytics summary')
+    return summary
+
+
+def _percent(value):
+    return f'{value:.1%}' if value is not None else '–'
+
+
+def _seconds(ms):
+    return f'{ms / 1000:.1f} s' if ms is not None else '–'
+
+
+def mode_rows(summary):
+    for m in summary['modes']:
+        yield (m['mode'].capitalize(), f'{m["games"]:,}', f'{m["answers"]:,}',
+               _percent(m['accuracy']), _seconds(m['p50_ms']),
+               _seconds(m['p90_ms']), _seconds(m['p99_ms']))
+
+
+def country_rows(entries):
+    for c in entries:
+        yield c['cca3'], f'{c["answers"]:,}', _percent(c['accuracy'])
+
+
+def confusion_rows(summary):
+    for c in summary['confusions']:
+        yield (c['mode'].capitalize(), c['correct'], c['chosen'],
+               f'{c["count"]:,}', _percent(c['share']))
+
+
+def analytics_section(summary):
+    """Return an IR section (name, ops) holding the analytics tables."""
+    intro = (f'Aggregated from {summary["events"]:,} logged events across '
+             f'{summary["countries"]:,} countries.')
+    ops = [
+        ('page_break',),
+        ('heading', ANALYTICS_TITLE, 1, None),
+        ('paragraph', intro, None, None, None, None, None, None, None),
+        ('heading', 'Quiz Modes', 2, None),
+        ('data_table', MODE_COLUMNS, mode_rows(summary)),
+    ]
+    if summary['hardest']:
+        ops += [('heading', 'Hardest Countries', 2, None),
+                ('data_table', COUNTRY_COLUMNS, country_rows(summary['hardest']))]
+    if summary['easiest']:
+        ops += [('heading', 'Easiest Countries', 2, None),
+                ('data_table', COUNTRY_COLUMNS, country_rows(summary['easiest']))]
+    if summary['confusions']:
+        ops += [('heading', 'Most Confused Answers', 2, None),
+                ('data_table', CONFUSION_COLUMNS, confusion_rows(summary))]
+    return (ANALYTICS_TITLE, tuple(ops))
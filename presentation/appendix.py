@@ -0,0 +1,55 @@
+"""
+Country reference appendix built from a REST Countries JSON snapshot.
+
+The snapshot is either the JSON payload /api/countries serves, i.e. a
+list of objects shaped like the Country interface in types/country.ts, or
+a binary snapshot written by tools/country_snapshot.py.
+"""
+
+import json
+
+from tools.country_snapshot import CountrySnapshot, is_snapshot
+
+APPENDIX_TITLE = 'Appendix: Country Reference'
+COUNTRY_COLUMNS = ('Country', 'Capital', 'Region', 'Subregion',
+                   'Population', 'Area (km²)', 'CCA2', 'CCA3')
+
+
+def load_countries(path):
+    """Load a REST Countries JSON or binary snapshot, keeping entries with a common name."""
+    if is_snapshot(path):
+        with CountrySnapshot(path) as snapshot:
+            data = snapshot.records()
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f'{path} does not contain a list of countries')
+    countries = [c for c in data if (c.get('name') or {}).get('common')]
+    countries.sort(key=lambda c: c['name']['common'])
+    return countries
+
+
+def country_rows(countries):
+    """Yield one appendix row per country, in COUNTRY_COLUMNS order."""
+    for c in countries:
+        yield (
+            c['name']['common'],
+            ', '.join(c.get('capital') or ()),
+            c.get('region') or '',
+            c.get('subregion') or '',
+            f'{c.get("population") or 0:,}',
+            f'{c.get("area") or 0:,.0f}',
+            c.get('cca2') or '',
+            c.get('cca3') or '',
+        )
+
+
+def appendix_section(countries):
+    """Return an IR section (name, ops) holding the country table."""
+    ops = (
+        ('page_break',),
+        ('heading', APPENDIX_TITLE, 1, None),
+        ('data_table', COUNTRY_COLUMNS, country_rows(countries)),
+    )
+    return (APPENDIX_TITLE, ops)
@@ -0,0 +1,193 @@
+"""
+Batch rendering of presentation variants across a process pool.
+
+A manifest is a JSON file of the form::
+
+    {
+        "template": "optional/base.docx",
+        "variants": [
+            {"output": "out/acme-en.docx", "overrides": {"title": "..."}},
+            ...
+        ],
+        "countries": "optional/countries.json",
+        "analytics": "optional/analytics.json",
+        "charts": false
+    }
+
+or just the list of variants. Relative paths are resolved against the
+directory containing the manifest. With "charts", the charts are rendered
+once (see presentation.charts) before the variants are handed out.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from presentation.analytics import load_summary
+from presentation.appendix import load_countries
+from presentation.build_cache import input_hasher, variant_digest
+from presentation.charts import chart_specs, render_charts
+from presentation.source_stats import collect_facts
+from presentation.spec import DEFAULT_SPEC, compile_spec
+
+# Per-worker state, filled in once by _init_worker
+_template = None
+_parts = None
+_ir = None
+_countries = None
+_analytics = None
+_charts = None
+_facts = None
+
+
+def load_manifest(path):
+    """Load and normalise a batch manifest."""
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {'variants': manifest}
+
+    base = os.path.dirname(os.path.abspath(path))
+    variants = []
+    for i, variant in enumerate(manifest.get('variants', [])):
+        if 'output' not in variant:
+            raise ValueError(f'Variant {i} in {path} has no "output"')
+        variants.append({
+            'output': os.path.join(base, variant['output']),
+            'overrides': variant.get('overrides') or {},
+        })
+    if not variants:
+        raise ValueError(f'No variants in {path}')
+
+    template = manifest.get('template')
+    countries = manifest.get('countries')
+    analytics = manifest.get('analytics')
+    return {
+        'template': os.path.join(base, template) if template else None,
+        'countries': os.path.join(base, countries) if countries else None,
+        'analytics': os.path.join(base, analytics) if analytics else None,
+        'charts': bool(manifest.get('charts')),
+        'variants': variants,
+    }
+
+
+def _init_worker(template_path, spec, countries_path, analytics_path, charts, facts):
+    """Import python-docx, parse the base template and compile the spec once per worker."""
+    global _template, _parts, _ir, _countries, _analytics, _charts, _facts
+    from create_presentation import load_template
+    from presentation.docx_writer import BaseTemplate, PartCache
+    _template = BaseTemplate(load_template(template_path))
+    _parts = PartCache()
+    _ir = compile_spec(spec)
+    if countries_path:
+        _countries = load_countries(countries_path)
+    if analytics_path:
+        _analytics = load_summary(analytics_path)
+    _charts = charts
+    _facts = facts
+
+
+def _render_variant(variant):
+    from create_presentation import build_document, render_docx
+
+    start = time.perf_counter()
+    directory = os.path.dirname(variant['output'])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    document = build_document(variant['overrides'], ir=_ir, countries=_countries,
+                              facts=_facts, analytics=_analytics, charts=_charts)
+    # Template parts and charts are the same in every variant, so they are
+    # compressed once per worker
+    render_docx(document, variant['output'], _template, parts=_parts)
+    return {
+        'output': variant['output'],
+        'seconds': time.perf_counter() - start,
+        'bytes': os.path.getsize(variant['output']),
+        'pid': os.getpid(),
+        'cached': False,
+    }
+
+
+def render_batch(variants, template=None, spec=None, countries=None, workers=None,
+                 cache=None, force=False, analytics=None, charts=False):
+    """Render all `variants` in a process pool and return a timing report.
+
+    With `charts`, charts of the countries and analytics data are rendered
+    (or taken from the chart cache) first and embedded in every variant.
+
+    With an ArtifactCache as `cache`, variants whose inputs are unchanged
+    are copied from it instead of rendered, unless `force` is set.
+    """
+    spec = spec or DEFAULT_SPEC
+    compile_spec(spec)  # Fail fast on a bad spec and warm the IR cache for the workers
+    facts = collect_facts()
+    workers = workers or os.cpu_count() or 1
+    results = []
+    failed = []
+
+    start = time.perf_counter()
+    rendered_charts = None
+    extra = facts
+    if charts:
+        specs = chart_specs(load_countries(countries) if countries else None,
+                            load_summary(analytics) if analytics else None)
+        rendered_charts = render_charts(specs, workers=workers) if specs else None
+        if rendered_charts:
+            extra = [facts, [chart['digest'] for chart in rendered_charts]]
+    pending = list(variants)
+    digests = {}
+    if cache is not None:
+        base = input_hasher(spec, template, [countries, analytics])
+        pending = []
+        for variant in variants:
+            digest = variant_digest(base, variant['overrides'], extra)
+            digests[variant['output']] = digest
+            if not force and cache.fetch(digest, variant['output']):
+                results.append({'output': variant['output'], 'seconds': 0.0, 'cached': True,
+                                'bytes': os.path.getsize(variant['output'])})
+                print(f'= {variant["output"]} (cached)')
+            else:
+                pending.append(variant)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                 initializer=_init_worker,
+                                 initargs=(template, spec, countries, analytics,
+                                           rendered_charts, facts)) as pool:
+            futures = {pool.submit(_render_variant, v): v for v in pending}
+            for future in as_completed(futures):
+                variant = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    failed.append({'output': variant['output'], 'error': repr(error)})
+                    print(f'✗ {variant["output"]}: {error}')
+                    continue
+                results.append(result)
+                if cache is not None:
+                    cache.store(digests[result['output']], result['output'])
+                print(f'✓ {result["output"]} ({result["seconds"] * 1000:.0f} ms)')
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['output'])
+    return {
+        'workers': workers,
+        'variants': results,
+        'rendered': sum(1 for r in results if not r['cached']),
+        'failed': failed,
+        'total_seconds': elapsed,
+        'throughput_per_second': len(results) / elapsed if elapsed else 0.0,
+    }
+
+
+def write_report(report, path=None):
+    """Print a summary line and optionally save the full report as JSON."""
+    cached = len(report['variants']) - report['rendered']
+    print(f'Rendered {report["rendered"]} variant(s) with {report["workers"]} worker(s) '
+          f'in {report["total_seconds"]:.2f}s '
+          f'({report["throughput_per_second"]:.1f} docs/s, {cached} cached, '
+          f'{len(report["failed"])} failed)')
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
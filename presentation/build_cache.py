@@ -0,0 +1,182 @@
+"""
+Content-addressed cache of rendered presentation artifacts.
+
+input_digest() hashes everything a build depends on: the section spec,
+the base template, the installed python-docx version, the generator's own
+source files, any data files read during the build and the variant's
+content overrides. When an artifact with that digest is already cached it
+is copied to the output instead of being rendered again.
+
+The cache directory is bounded by total size and entry age; eviction
+removes the least recently used artifacts first, whatever their format.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from importlib import metadata
+
+from presentation.spec import DEFAULT_CACHE_DIR
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Bump to invalidate every cached artifact at once
+BUILD_CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+TEMP_SUFFIX = '.tmp'
+
+
+def source_files():
+    """The generator's own source files, which affect the rendered output."""
+    files = [os.path.join(ROOT, 'create_presentation.py')]
+    files += sorted(glob.glob(os.path.join(HERE, '*.py')))
+    return files
+
+
+def _docx_version():
+    try:
+        return metadata.version('python-docx')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def input_hasher(spec, template=None, data_files=()):
+    """Return a hash object fed with every input shared by a set of variants.
+
+    `template` is a template path or None for python-docx's default and
+    `data_files` are extra paths read by the build.
+    """
+    if template is None:
+        from docx.api import _default_docx_path
+        template = _default_docx_path()
+
+    h = hashlib.sha256()
+    h.update(f'v{BUILD_CACHE_VERSION}\0python-docx {_docx_version()}\0'.encode())
+    for label, path in ([('spec', spec), ('template', template)]
+                        + [('source', p) for p in source_files()]
+                        + [('data', p) for p in data_files if p]):
+        h.update(f'{label}:{os.path.basename(path)}\0'.encode())
+        h.update(_file_digest(path))
+    return h
+
+
+def variant_digest(base, overrides=None, extra=None):
+    """Digest of one variant given the shared `base` hasher from input_hasher().
+
+    `extra` is any JSON-serialisable value that also affects the output.
+    """
+    h = base.copy()
+    h.update(json.dumps([overrides or {}, extra], sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def input_digest(spec, template=None, data_files=(), overrides=None, extra=None):
+    """Return the hex digest identifying a single build's inputs."""
+    return variant_digest(input_hasher(spec, template, data_files), overrides, extra)
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+class ArtifactCache:
+    """Directory of rendered artifacts named by input digest."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS, suffix='.docx'):
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIR, 'artifacts')
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self.suffix = suffix
+
+    def path_for(self, digest):
+        return os.path.join(self.directory, digest + self.suffix)
+
+    def fetch(self, digest, output_path):
+        """Copy the cached artifact to `output_path`; return False on a miss."""
+        cached = self.path_for(digest)
+        try:
+            _copy_atomic(cached, output_path)
+        except FileNotFoundError:
+            return False
+        os.utime(cached)  # Mark as recently used for eviction
+        return True
+
+    def store(self, digest, artifact_path):
+        """Add a freshly rendered artifact to the cache and enforce the bounds."""
+        os.makedirs(self.directory, exist_ok=True)
+        _copy_atomic(artifact_path, self.path_for(digest))
+        self.evict()
+
+    def evict(self):
+        """Drop entries older than max_age, then the oldest until under max_bytes.
+
+        Every artifact in the directory counts, not only those with this
+        cache's suffix: caches for several formats share one directory and
+        one bound.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            if path.endswith(TEMP_SUFFIX):
+                continue  # A copy still being written
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+def output_tempfile(directory):
+    """Like mkstemp() in `directory`, but with the mode open() would create the file with.
+
+    mkstemp() makes files readable by their owner only, and os.replace()
+    keeps that mode on the final output. Here the file is created with 0o666
+    and the kernel applies the umask, which cannot be read without setting it.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(100):
+        tmp = os.path.join(directory, f'tmp{os.urandom(6).hex()}{TEMP_SUFFIX}')
+        try:
+            return os.open(tmp, flags, 0o666), tmp
+        except FileExistsError:
+            continue
+    raise FileExistsError(f'No unused temporary file name in {directory}')
+
+
+def _copy_atomic(src, dst):
+    directory = os.path.dirname(os.path.abspath(dst))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = output_tempfile(directory)
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,230 @@
+"""
+Data charts for the presentation, rendered with matplotlib.
+
+A chart spec is a small JSON-serialisable dict (title, axis labels, bar
+labels and values) built from the country list and the analytics summary.
+Each chart is drawn with the headless Agg backend in a process pool and
+saved as PNG (embedded in the .docx) and SVG next to it, under
+.cache/presentation/charts/ named by a digest of the spec, STYLE and the
+matplotlib version, so an unchanged chart is never drawn twice.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+
+from presentation.build_cache import ArtifactCache
+from presentation.spec import DEFAULT_CACHE_DIR
+
+# Bump to re-render every cached chart at once
+CHART_VERSION = 1
+CHARTS_TITLE = 'Data Charts'
+CHART_DIR = os.path.join(DEFAULT_CACHE_DIR, 'charts')
+CHART_FORMATS = ('png', 'svg')
+CHART_MAX_AGE_DAYS = 30
+
+# Page width of an embedded chart
+PICTURE_WIDTH_INCHES = 6.0
+
+STYLE = {
+    'figsize': [8.0, 4.0],
+    'dpi': 200,
+    'font_size': 10,
+    'color': '#2563eb',
+    'edge_color': '#1e40af',
+    'grid_color': '#e5e7eb',
+}
+
+REGION_ORDER = ('Africa', 'Americas', 'Asia', 'Europe', 'Oceania', 'Antarctic')
+MODE_NAMES = {'flags': 'Flags', 'capitals': 'Capitals', 'population': 'Population'}
+
+
+def _population_label(exponent):
+    for limit, suffix in ((9, 'B'), (6, 'M'), (3, 'k')):
+        if exponent >= limit:
+            return f'{10 ** (exponent - limit):g}{suffix}'
+    return f'{10 ** exponent:g}'
+
+
+def population_chart(countries):
+    """Countries per population decade (log scale)."""
+    decades = Counter(int(math.log10(c['population']))
+                      for c in countries if (c.get('population') or 0) > 0)
+    if not decades:
+        return None
+    exponents = range(min(decades), max(decades) + 1)
+    return {
+        'name': 'population',
+        'title': 'Population Distribution',
+        'kind': 'bar',
+        'xlabel': 'Population',
+        'ylabel': 'Countries',
+        'labels': [f'{_population_label(e)}–{_population_label(e + 1)}' for e in exponents],
+        'values': [decades[e] for e in exponents],
+    }
+
+
+def region_chart(countries):
+    """Countries per region."""
+    regions = Counter(c.get('region') or 'Other' for c in countries)
+    if not regions:
+        return None
+    order = [r for r in REGION_ORDER if r in regions]
+    order += sorted(r for r in regions if r not in REGION_ORDER)
+    return {
+        'name': 'regions',
+        'title': 'Countries by Region',
+        'kind': 'bar',
+        'xlabel': 'Region',
+        'ylabel': 'Countries',
+        'labels': order,
+        'values': [regions[r] for r in order],
+    }
+
+
+def mode_chart(summary):
+    """Games played per quiz mode."""
+    modes = [m for m in summary['modes'] if m['games'] or m['answers']]
+    if not modes:
+        return None
+    return {
+        'name': 'modes',
+        'title': 'Games per Quiz Mode',
+        'kind': 'bar',
+        'xlabel': 'Mode',
+        'ylabel': 'Games',
+        'labels': [MODE_NAMES.get(m['mode'], m['mode']) for m in modes],
+        'values': [m['games'] for m in modes],
+    }
+
+
+def achievement_chart(summary):
+    """Achievement unlocks per 100 games, most common first."""
+    achievements = [a for a in summary.get('achievements') or ()
+                    if a['per_100_games'] is not None]
+    if not achievements:
+        return None
+    return {
+        'name': 'achievements',
+        'title': 'Achievement Unlock Rates',
+        'kind': 'barh',
+        'xlabel': 'Unlocks per 100 games',
+        'ylabel': None,
+        'labels': [a['id'] for a in achievements],
+        'values': [a['per_100_games'] for a in achievements],
+    }
+
+
+def chart_specs(countries=None, summary=None):
+    """Specs of every chart the given data supports."""
+    specs = []
+    if countries:
+        specs += [population_chart(countries), region_chart(countries)]
+    if summary:
+        specs += [mode_chart(summary), achievement_chart(summary)]
+    return [spec for spec in specs if spec]
+
+
+def _matplotlib_version():
+    try:
+        return metadata.version('matplotlib')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def chart_digest(spec, style=STYLE):
+    """Hex digest of everything that affects a chart's pixels."""
+    payload = json.dumps([CHART_VERSION, _matplotlib_version(), style, spec], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _paths(directory, digest):
+    return {fmt: os.path.join(directory, f'{digest}.{fmt}') for fmt in CHART_FORMATS}
+
+
+def _draw(spec, style, paths):
+    """Render one chart to every format in `paths` (runs in a pool worker)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+
+    with plt.rc_context({'font.size': style['font_size'], 'svg.hashsalt': 'chart',
+                         'svg.fonttype': 'none'}):
+        fig, ax = plt.subplots(figsize=style['figsize'])
+        try:
+            bar = ax.barh if spec['kind'] == 'barh' else ax.bar
+            bar(spec['labels'], spec['values'], color=style['color'],
+                edgecolor=style['edge_color'], linewidth=0.6, zorder=2)
+            value_axis = ax.xaxis if spec['kind'] == 'barh' else ax.yaxis
+            value_axis.grid(True, color=style['grid_color'], zorder=0)
+            if spec['kind'] == 'barh':
+                ax.invert_yaxis()
+            elif len(spec['labels']) > 6:
+                ax.tick_params(axis='x', labelrotation=30)
+            ax.set_title(spec['title'])
+            ax.set_xlabel(spec['xlabel'] or '')
+            ax.set_ylabel(spec['ylabel'] or '')
+            ax.spines[['top', 'right']].set_visible(False)
+            fig.tight_layout()
+            for fmt, path in paths.items():
+                # Write beside the target and rename, so readers never see half a file
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.' + fmt)
+                os.close(fd)
+                try:
+                    fig.savefig(tmp, format=fmt, dpi=style['dpi'],
+                                metadata={'Software': None} if fmt == 'png' else {'Date': None})
+                    os.replace(tmp, path)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+        finally:
+            plt.close(fig)
+    return paths
+
+
+def render_charts(specs, directory=CHART_DIR, style=STYLE, workers=None):
+    """Render the charts missing from the cache and return one record per spec.
+
+    A record is {'name', 'title', 'digest', 'png', 'svg', 'cached'}. Misses
+    are drawn in a process pool of `workers` (default: CPU count) when
+    there is more than one.
+    """
+    os.makedirs(directory, exist_ok=True)
+    records = []
+    pending = []
+    for spec in specs:
+        digest = chart_digest(spec, style)
+        paths = _paths(directory, digest)
+        cached = all(os.path.exists(p) for p in paths.values())
+        if cached:
+            for path in paths.values():
+                os.utime(path)  # Mark as recently used for eviction
+        else:
+            pending.append((spec, paths))
+        records.append({'name': spec['name'], 'title': spec['title'], 'digest': digest,
+                        'cached': cached, **paths})
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_draw, spec, style, paths) for spec, paths in pending]:
+                future.result()
+    else:
+        for spec, paths in pending:
+            _draw(spec, style, paths)
+
+    ArtifactCache(directory, max_bytes=None, max_age_days=CHART_MAX_AGE_DAYS).evict()
+    return records
+
+
+def charts_section(charts):
+    """Return an IR section (name, ops) embedding rendered chart PNGs."""
+    ops = [('page_break',), ('heading', CHARTS_TITLE, 1, None)]
+    for chart in charts:
+        ops.append(('picture', chart['png'], PICTURE_WIDTH_INCHES))
+    return (CHARTS_TITLE, tuple(ops))
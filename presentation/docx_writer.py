@@ -0,0 +1,190 @@
+"""
+Streaming .docx output for repeated renders from one template.
+
+python-docx re-parses the template for every document, resolves a style
+name by scanning every style it defines (most of the render time with a
+full Word template) and deflates every part again on save. For a process
+that renders many decks (a batch worker, the report service) this module
+keeps instead:
+
+- BaseTemplate: the template parsed once; each document is a copy of it,
+  with style names resolved to ids once per template.
+- PartCache: compressed parts by content hash. The template's styles,
+  theme and settings and the embedded charts come out identical in every
+  deck, so they are deflated once and the bytes reused.
+
+write_docx writes the package to a path or to any writable binary stream
+(BytesIO, a socket file), one part at a time and without seeking. Members
+carry a fixed timestamp, so identical inputs give identical bytes.
+"""
+
+import copy
+import hashlib
+import io
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from docx import Document
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+
+# zlib level for XML parts and for images (PNG/JPEG are already compressed,
+# so a low level or 0, stored, costs little size and saves time)
+DEFAULT_LEVEL = 6
+DEFAULT_IMAGE_LEVEL = 6
+DEFAULT_PART_CACHE_BYTES = 32 * 2**20
+
+# 1980-01-01 00:00, the earliest DOS timestamp
+_DOS_DATE = (0 << 9) | (1 << 5) | 1
+_DOS_TIME = 0
+_MAX_SIZE = 0xFFFFFFFF
+
+
+def open_document(data=None, style_ids=None):
+    """Parse .docx bytes (python-docx's default template when None)."""
+    doc = Document(io.BytesIO(data)) if data is not None else Document()
+    _memoize_style_ids(doc.part, {} if style_ids is None else style_ids)
+    return doc
+
+
+def _memoize_style_ids(part, style_ids):
+    lookup = part.get_style_id
+
+    def get_style_id(style_or_name, style_type):
+        if not isinstance(style_or_name, str):
+            return lookup(style_or_name, style_type)
+        key = (style_or_name, style_type)
+        if key not in style_ids:
+            style_ids[key] = lookup(style_or_name, style_type)
+        return style_ids[key]
+
+    part.get_style_id = get_style_id
+
+
+class BaseTemplate:
+    """A template parsed once; document() hands out independent copies."""
+
+    def __init__(self, data=None):
+        self._doc = Document(io.BytesIO(data)) if data is not None else Document()
+        # Shared by every copy; rendering never adds or renames styles
+        self.style_ids = {}
+
+    def document(self):
+        doc = copy.deepcopy(self._doc)
+        _memoize_style_ids(doc.part, self.style_ids)
+        return doc
+
+
+class PartCache:
+    """Compressed package members by (content hash, level), least recently used out."""
+
+    def __init__(self, max_bytes=DEFAULT_PART_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, blob, level):
+        """Return (crc32, compressed bytes) for `blob`, reusing an earlier result."""
+        key = (hashlib.sha1(blob).digest(), level)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = _compress(blob, level)
+        if len(entry[1]) > self.max_bytes:
+            return entry
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self.size += len(entry[1])
+                while self.size > self.max_bytes:
+                    _, (_, dropped) = self._entries.popitem(last=False)
+                    self.size -= len(dropped)
+        return entry
+
+    def stats(self):
+        return {'entries': len(self._entries), 'bytes': self.size,
+                'hits': self.hits, 'misses': self.misses}
+
+
+def _compress(blob, level):
+    crc = zlib.crc32(blob)
+    if level == 0:
+        return crc, blob
+    deflate = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return crc, deflate.compress(blob) + deflate.flush()
+
+
+def _members(doc):
+    """(member name, bytes, is image) for every item of the package, in save order."""
+    package = doc.part.package
+    parts = list(package.iter_parts())
+    for part in parts:
+        part.before_marshal()
+    yield CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob, False
+    yield PACKAGE_URI.rels_uri.membername, _encode(package.rels.xml), False
+    for part in parts:
+        yield part.partname.membername, part.blob, part.content_type.startswith('image/')
+        if len(part.rels):
+            yield part.partname.rels_uri.membername, _encode(part.rels.xml), False
+
+
+def _encode(xml):
+    return xml.encode('utf-8') if isinstance(xml, str) else xml
+
+
+def iter_docx(doc, level=DEFAULT_LEVEL, image_level=DEFAULT_IMAGE_LEVEL, parts=None):
+    """Yield the bytes of `doc` as a .docx (zip) file, one member at a time.
+
+    `level` is the zlib level (0 stores) of XML parts and `image_level` that
+    of image parts. With a PartCache as `parts`, members already compressed
+    at the same level are not compressed again.
+    """
+    compress = parts.compress if parts is not None else _compress
+    directory = []
+    offset = 0
+    for name, blob, image in _members(doc):
+        member_level = image_level if image else level
+        crc, data = compress(blob, member_level)
+        if len(blob) > _MAX_SIZE or offset > _MAX_SIZE:
+            raise ValueError(f'{name} is too large for a .docx without ZIP64')
+        name = name.encode('utf-8')
+        method = 8 if member_level else 0
+        sizes = (crc, len(data), len(blob), len(name))
+        yield struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, 0x800, method, _DOS_TIME,
+                          _DOS_DATE, *sizes, 0) + name
+        yield data
+        directory.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 20, 20, 0x800,
+                                     method, _DOS_TIME, _DOS_DATE, *sizes, 0, 0, 0, 0,
+                                     0, offset) + name)
+        offset += 30 + len(name) + len(data)
+
+    central = b''.join(directory)
+    yield central + struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(directory),
+                                len(directory), len(central), offset, 0)
+
+
+def write_docx(doc, output, level=DEFAULT_LEVEL, image_level=DEFAULT_IMAGE_LEVEL, parts=None):
+    """Write `doc` to `output`, a path or a writable binary stream; returns `output`."""
+    chunks = iter_docx(doc, level, image_level, parts)
+    if hasattr(output, 'write'):
+        for chunk in chunks:
+            output.write(chunk)
+    else:
+        with open(output, 'wb') as f:
+            f.writelines(chunks)
+    return output
+
+
+def docx_bytes(doc, level=DEFAULT_LEVEL, image_level=DEFAULT_IMAGE_LEVEL, parts=None):
+    buffer = io.BytesIO()
+    write_docx(doc, buffer, level, image_level, parts)
+    return buffer.getvalue()
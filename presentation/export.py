@@ -0,0 +1,261 @@
+"""
+HTML and Markdown backends for the presentation.
+
+Both render a resolved document (see create_presentation.build_document):
+the IR sections with placeholders filled and table rows materialised, which
+is never modified, so several backends can walk it at the same time.
+Writers are generators of text chunks that are written to the output as
+they are produced, so a deck with large tables is never held in memory as
+one string. Images are embedded (SVG inline when a chart has one, PNG as a
+data URI otherwise) so every output is a single self-contained file.
+
+The HTML carries a print stylesheet (A4 pages, page breaks where the deck
+has them), so printing it from a browser gives the PDF version.
+"""
+
+import base64
+import os
+from html import escape
+
+from presentation.build_cache import output_tempfile
+
+MONOSPACE_FONTS = ('Courier New', 'Courier', 'Consolas', 'Menlo', 'monospace')
+# Bytes read at a time when streaming an embedded image
+IMAGE_CHUNK = 1 << 16
+
+HTML_STYLE = """
+body { font-family: Calibri, 'Segoe UI', Arial, sans-serif; font-size: 11pt;
+       line-height: 1.4; max-width: 48rem; margin: 2rem auto; padding: 0 1rem; color: #111827; }
+h1.title { font-size: 26pt; }
+table { border-collapse: collapse; width: 100%; margin: 0.75rem 0; }
+th, td { border: 1px solid #9ca3af; padding: 0.25rem 0.5rem; text-align: left; vertical-align: top; }
+th { font-weight: bold; }
+pre { font-family: 'Courier New', monospace; font-size: 9pt; white-space: pre-wrap; }
+figure { margin: 1rem 0; }
+figure img, figure svg { width: 100%; height: auto; }
+.page-break { break-after: page; border: 0; }
+@media screen { .page-break { border-top: 1px dashed #d1d5db; margin: 2rem 0; } }
+@page { size: A4; margin: 2cm; }
+@media print {
+  body { margin: 0; max-width: none; }
+  tr, figure { break-inside: avoid; }
+  h1, h2, h3 { break-after: avoid; }
+}
+"""
+
+
+def write_streamed(path, chunks):
+    """Write an iterable of text chunks to `path` atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = output_tempfile(directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(chunks)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def _svg_sibling(path):
+    svg = os.path.splitext(path)[0] + '.svg'
+    return svg if os.path.exists(svg) else None
+
+
+def _data_uri_chunks(path):
+    """Yield a file as base64 in chunks (multiples of 3 bytes keep them joinable)."""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(IMAGE_CHUNK - IMAGE_CHUNK % 3), b''):
+            yield base64.b64encode(chunk).decode('ascii')
+
+
+def _mime(path):
+    ext = os.path.splitext(path)[1].lower()
+    return {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.gif': 'image/gif',
+            '.svg': 'image/svg+xml'}.get(ext, 'image/png')
+
+
+# --- HTML ---
+
+def _paragraph_style(bold, italic, size, font, align):
+    style = []
+    if bold:
+        style.append('font-weight:bold')
+    if italic:
+        style.append('font-style:italic')
+    if size:
+        style.append(f'font-size:{size:g}pt')
+    if font:
+        style.append(f'font-family:{escape(font)}')
+    if align:
+        style.append(f'text-align:{align}')
+    return f' style="{";".join(style)}"' if style else ''
+
+
+def _html_table(header, rows):
+    yield '<table>\n<thead><tr>'
+    yield ''.join(f'<th>{escape(cell)}</th>' for cell in header)
+    yield '</tr></thead>\n<tbody>\n'
+    for row in rows:
+        yield '<tr>' + ''.join(f'<td>{escape(str(cell))}</td>' for cell in row) + '</tr>\n'
+    yield '</tbody>\n</table>\n'
+
+
+def _html_picture(path, width):
+    yield f'<figure style="max-width:{width:g}in">'
+    svg = _svg_sibling(path)
+    if svg:
+        # Inline SVG without its XML prolog; text stays selectable and sharp in print
+        with open(svg, encoding='utf-8') as f:
+            text = f.read()
+        start = text.find('<svg')
+        yield text[start if start >= 0 else 0:]
+    else:
+        yield f'<img alt="" src="data:{_mime(path)};base64,'
+        yield from _data_uri_chunks(path)
+        yield '">'
+    yield '</figure>\n'
+
+
+def iter_html(document):
+    """Yield the HTML of a resolved document chunk by chunk."""
+    title = document['meta'].get('title', 'Presentation')
+    yield ('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+           '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+           f'<title>{escape(title)}</title>\n<style>{HTML_STYLE}</style>\n</head>\n<body>\n')
+    for name, ops in document['sections']:
+        yield f'<section data-name="{escape(name)}">\n'
+        in_list = False
+        for op in ops:
+            kind = op[0]
+            bullet = kind == 'paragraph' and op[7] == 'List Bullet'
+            if in_list and not bullet:
+                yield '</ul>\n'
+                in_list = False
+            if bullet:
+                if not in_list:
+                    yield '<ul>\n'
+                    in_list = True
+                yield f'<li>{escape(op[1])}</li>\n'
+            elif kind == 'paragraph':
+                _, text, bold, italic, size, font, align, _style, _space = op
+                if font in MONOSPACE_FONTS:
+                    yield f'<pre>{escape(text.strip(chr(10)))}</pre>\n'
+                else:
+                    style = _paragraph_style(bold, italic, size, font, align)
+                    yield f'<p{style}>{escape(text).replace(chr(10), "<br>")}</p>\n'
+            elif kind == 'heading':
+                level = op[2]
+                tag = f'h{min(max(level, 1), 6)}'
+                cls = ' class="title"' if level == 0 else ''
+                style = f' style="text-align:{op[3]}"' if op[3] else ''
+                yield f'<{tag}{cls}{style}>{escape(op[1])}</{tag}>\n'
+            elif kind == 'definition':
+                yield f'<p><strong>{escape(op[1])}:</strong> {escape(op[2])}</p>\n'
+            elif kind in ('table', 'data_table'):
+                yield from _html_table(op[1], op[2])
+            elif kind == 'picture':
+                yield from _html_picture(op[1], op[2])
+            elif kind == 'spacer':
+                yield '<br>\n' * op[1]
+            elif kind == 'page_break':
+                yield '<hr class="page-break">\n'
+            else:
+                raise ValueError(f'Unknown render op {kind!r}')
+        if in_list:
+            yield '</ul>\n'
+        yield '</section>\n'
+    yield '</body>\n</html>\n'
+
+
+def write_html(document, path):
+    return write_streamed(path, iter_html(document))
+
+
+# --- Markdown ---
+
+def _md_escape(text):
+    for char in '\\`*_[]<>|':
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def _md_cell(text):
+    return _md_escape(str(text)).replace('\n', '<br>')
+
+
+def _md_inline(text, bold, italic):
+    text = _md_escape(text).replace('\n', '  \n')
+    if not text.strip():
+        return text
+    if bold and italic:
+        return f'***{text}***'
+    if bold:
+        return f'**{text}**'
+    if italic:
+        return f'*{text}*'
+    return text
+
+
+def _md_table(header, rows):
+    yield '| ' + ' | '.join(_md_cell(cell) for cell in header) + ' |\n'
+    yield '|' + ' --- |' * len(header) + '\n'
+    for row in rows:
+        cells = [_md_cell(cell) for cell in row]
+        cells += [''] * (len(header) - len(cells))
+        yield '| ' + ' | '.join(cells) + ' |\n'
+    yield '\n'
+
+
+def iter_markdown(document):
+    """Yield the Markdown of a resolved document chunk by chunk."""
+    for _name, ops in document['sections']:
+        in_list = False
+        for op in ops:
+            kind = op[0]
+            bullet = kind == 'paragraph' and op[7] == 'List Bullet'
+            if in_list and not bullet:
+                yield '\n'
+                in_list = False
+            if bullet:
+                in_list = True
+                yield f'- {_md_escape(op[1])}\n'
+            elif kind == 'paragraph':
+                _, text, bold, italic, _size, font, _align, _style, _space = op
+                if font in MONOSPACE_FONTS:
+                    yield f'```\n{text.strip(chr(10))}\n```\n\n'
+                elif text.strip():
+                    yield _md_inline(text, bold, italic) + '\n\n'
+            elif kind == 'heading':
+                yield '#' * max(op[2], 1) + ' ' + _md_escape(op[1]) + '\n\n'
+            elif kind == 'definition':
+                yield f'**{_md_escape(op[1])}:** {_md_escape(op[2])}\n\n'
+            elif kind in ('table', 'data_table'):
+                yield from _md_table(op[1], op[2])
+            elif kind == 'picture':
+                yield f'![](data:{_mime(op[1])};base64,'
+                yield from _data_uri_chunks(op[1])
+                yield ')\n\n'
+            elif kind == 'spacer':
+                continue
+            elif kind == 'page_break':
+                yield '---\n\n'
+            else:
+                raise ValueError(f'Unknown render op {kind!r}')
+        if in_list:
+            yield '\n'
+
+
+def write_markdown(document, path):
+    return write_streamed(path, iter_markdown(document))
+
+
+# Output extension -> writer; .docx is handled by create_presentation
+WRITERS = {
+    '.html': write_html,
+    '.htm': write_html,
+    '.md': write_markdown,
+    '.markdown': write_markdown,
+}
@@ -0,0 +1,127 @@
+"""
+Opt-in per-section profiling for presentation builds.
+
+SectionProfiler times named stages (each spec section plus setup and
+save) with wall clock, CPU time and tracemalloc allocation counters, and
+writes the result as a JSON report or as folded stacks that flamegraph.pl,
+speedscope and inferno read directly.
+
+Per-stage peaks need tracemalloc's peak reset at the start of each stage,
+which only happens when the profiler started tracemalloc itself; under a
+tracer the caller started, stages report allocations but no peak, and the
+caller's peak is left alone.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+ROOT_FRAME = 'create_presentation'
+
+
+class SectionProfiler:
+    """Collects timing and allocation counters for named build stages."""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._started = None
+        self._owns_tracemalloc = False
+        # Highest traced memory seen at any stage; stage peaks reset tracemalloc's
+        self._max_peak = 0
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._max_peak = 0
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        wall, cpu = self._started
+        self.total_seconds = time.perf_counter() - wall
+        self.total_cpu_seconds = time.process_time() - cpu
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak_bytes = max(self._max_peak, peak)
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def section(self, name):
+        """Measure the enclosed block as stage `name`."""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        owned = tracing and self._owns_tracemalloc
+        if tracing:
+            before, peak = tracemalloc.get_traced_memory()
+        if owned:
+            self._max_peak = max(self._max_peak, peak)
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            stage = {
+                'name': name,
+                'seconds': time.perf_counter() - wall,
+                'cpu_seconds': time.process_time() - cpu,
+            }
+            if tracing:
+                after, peak = tracemalloc.get_traced_memory()
+                stage['allocated_bytes'] = after - before
+                if owned:
+                    self._max_peak = max(self._max_peak, peak)
+                    stage['peak_bytes'] = peak - before
+            self.stages.append(stage)
+
+    def report(self):
+        """Return the collected measurements as a JSON-serialisable dict."""
+        report = {
+            'total_seconds': getattr(self, 'total_seconds', None),
+            'total_cpu_seconds': getattr(self, 'total_cpu_seconds', None),
+            'stages': self.stages,
+        }
+        if self.trace_memory:
+            report['peak_bytes'] = getattr(self, 'peak_bytes', None)
+        return report
+
+    def folded(self):
+        """Return folded stacks ("frame;frame value" per line), in microseconds."""
+        lines = []
+        accounted = 0.0
+        for stage in self.stages:
+            name = stage['name'].replace(';', ',')
+            lines.append(f'{ROOT_FRAME};{name} {round(stage["seconds"] * 1e6)}')
+            accounted += stage['seconds']
+        total = getattr(self, 'total_seconds', None)
+        if total is not None and total > accounted:
+            lines.append(f'{ROOT_FRAME} {round((total - accounted) * 1e6)}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the report, as folded stacks for *.folded paths and JSON otherwise."""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.folded'):
+                f.write(self.folded())
+            else:
+                json.dump(self.report(), f, indent=2)
+
+    def summary(self):
+        """Human-readable table of the stages, slowest first."""
+        rows = sorted(self.stages, key=lambda s: s['seconds'], reverse=True)
+        lines = [f'{"stage":<40} {"wall ms":>10} {"cpu ms":>10} {"alloc KiB":>10}']
+        for s in rows:
+            alloc = f'{s["allocated_bytes"] / 1024:.1f}' if 'allocated_bytes' in s else '-'
+            lines.append(f'{s["name"]:<40} {s["seconds"] * 1000:>10.2f} '
+                         f'{s["cpu_seconds"] * 1000:>10.2f} {alloc:>10}')
+        return '\n'.join(lines)
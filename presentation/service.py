@@ -0,0 +1,423 @@
+"""
+Local HTTP service that renders the deck on request.
+
+  python create_presentation.py --serve 8000 --countries countries.json --charts
+  curl -o deck.docx 'http://127.0.0.1:8000/report?title=Acme%20Quiz'
+  curl -o deck.html 'http://127.0.0.1:8000/report?format=html&subtitle=For%20Acme'
+  curl -d '{"format": "md", "overrides": {"title": "Acme"}}' http://127.0.0.1:8000/report
+  curl http://127.0.0.1:8000/_stats
+
+Query parameters other than `format` (docx, html or md) replace entries of
+the spec's "meta" block, like a batch variant's overrides. .docx decks are
+rendered into memory by a pool of worker processes, each holding the
+parsed template, the compiled spec, the data and a PartCache (see
+presentation.docx_writer), so a request parses nothing and deflates only
+what differs from earlier decks. HTML and Markdown are rendered in the
+request's thread and sent as they are produced (chunked), so the response
+starts before the whole deck exists. At most `workers + queue` decks are
+in progress at once; beyond that the answer is 503 with Retry-After.
+
+A response's ETag is the digest of its inputs (presentation.build_cache),
+so If-None-Match is answered without rendering, and recent responses are
+kept in a bounded in-memory cache.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from presentation.analytics import load_summary
+from presentation.appendix import load_countries
+from presentation.build_cache import input_hasher, variant_digest
+from presentation.charts import chart_specs, render_charts
+from presentation.docx_writer import DEFAULT_IMAGE_LEVEL, DEFAULT_LEVEL
+from presentation.source_stats import collect_facts
+from presentation.spec import DEFAULT_SPEC, compile_spec
+
+FORMATS = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'html': 'text/html; charset=utf-8',
+    'md': 'text/markdown; charset=utf-8',
+}
+FILENAME = 'Country_Quiz_Game_Presentation'
+
+DEFAULT_QUEUE = 16
+DEFAULT_CACHE_BYTES = 64 * 2**20
+# Bytes written to the socket at a time
+CHUNK = 1 << 16
+MAX_BODY = 1 << 20
+
+# Per-worker state, filled in once by _init_worker
+_template = None
+_parts = None
+_ir = None
+_countries = None
+_analytics = None
+_charts = None
+_facts = None
+_levels = None
+
+
+class ServiceBusy(Exception):
+    """Every worker is rendering and the queue is full."""
+
+
+def _init_worker(template_path, spec, countries_path, analytics_path, charts, facts, levels):
+    """Parse the template, compile the spec and load the data once per worker."""
+    global _template, _parts, _ir, _countries, _analytics, _charts, _facts, _levels
+    from create_presentation import load_template
+    from presentation.docx_writer import BaseTemplate, PartCache
+    _template = BaseTemplate(load_template(template_path))
+    _parts = PartCache()
+    _ir = compile_spec(spec)
+    if countries_path:
+        _countries = load_countries(countries_path)
+    if analytics_path:
+        _analytics = load_summary(analytics_path)
+    _charts = charts
+    _facts = facts
+    _levels = levels
+
+
+def _render_docx(overrides):
+    from create_presentation import build_document, render_docx
+
+    start = time.perf_counter()
+    document = build_document(overrides, ir=_ir, countries=_countries, facts=_facts,
+                              analytics=_analytics, charts=_charts)
+    buffer = io.BytesIO()
+    level, image_level = _levels
+    render_docx(document, buffer, _template, level=level, image_level=image_level,
+                parts=_parts)
+    return buffer.getvalue(), time.perf_counter() - start, os.getpid(), _parts.stats()
+
+
+def _encoded(chunks, size=CHUNK):
+    """Encode text chunks as UTF-8, joined into pieces of about `size` bytes."""
+    pending = []
+    pending_size = 0
+    for text in chunks:
+        data = text.encode('utf-8')
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= size:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def _etag_matches(header, etag):
+    """Whether an If-None-Match header matches `etag` (weak comparison, as for GET)."""
+    if not header:
+        return False
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ReportService:
+    """Renders reports in a bounded process pool and caches the results."""
+
+    def __init__(self, template=None, spec=DEFAULT_SPEC, countries=None, analytics=None,
+                 charts=False, workers=None, queue=DEFAULT_QUEUE, level=DEFAULT_LEVEL,
+                 image_level=DEFAULT_IMAGE_LEVEL, cache_bytes=DEFAULT_CACHE_BYTES):
+        ir = compile_spec(spec)  # Fail fast on a bad spec
+        self.fields = set(ir['meta'])
+        facts = collect_facts()
+        self.workers = workers or os.cpu_count() or 1
+
+        country_data = load_countries(countries) if countries else None
+        analytics_data = load_summary(analytics) if analytics else None
+        rendered_charts = None
+        extra = [facts, [level, image_level]]
+        if charts:
+            specs = chart_specs(country_data, analytics_data)
+            if not specs:
+                raise ValueError('Charts need countries and/or analytics data to plot')
+            rendered_charts = render_charts(specs, workers=self.workers)
+            extra.append([chart['digest'] for chart in rendered_charts])
+        self._base = input_hasher(spec, template, [countries, analytics])
+        self._extra = extra
+        # build_document() arguments for the decks rendered in this process
+        self._inputs = {'ir': ir, 'countries': country_data, 'facts': facts,
+                        'analytics': analytics_data, 'charts': rendered_charts}
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(template, spec, countries, analytics, rendered_charts, facts,
+                      (level, image_level)))
+        self._slots = threading.BoundedSemaphore(self.workers + queue)
+        self._lock = threading.Lock()
+        self._responses = OrderedDict()
+        self._cache_size = 0
+        self.cache_bytes = cache_bytes
+        self._parts = {}
+        self.counters = {'requests': 0, 'rendered': 0, 'cached': 0, 'not_modified': 0,
+                         'rejected': 0, 'errors': 0, 'render_seconds': 0.0}
+        self.started = time.time()
+
+    def digest(self, fmt, overrides):
+        """Validate a request and return the digest of its inputs."""
+        if not isinstance(fmt, str) or fmt not in FORMATS:
+            raise ValueError(f'format must be one of {", ".join(FORMATS)}')
+        if not isinstance(overrides, dict):
+            raise ValueError('overrides must be an object')
+        if not all(isinstance(k, str) and isinstance(v, str) for k, v in overrides.items()):
+            raise ValueError('overrides must map field names to strings')
+        unknown = set(overrides) - self.fields
+        if unknown:
+            raise ValueError(f'Unknown content overrides: {", ".join(sorted(unknown))}')
+        return variant_digest(self._base, overrides, self._extra + [fmt])
+
+    def report(self, digest, fmt, overrides):
+        """Return the body for a request checked by digest().
+
+        That is bytes for a cached response or a .docx, and otherwise a
+        generator of byte chunks rendered as they are consumed; close it to
+        give up on a response before the end.
+        """
+        with self._lock:
+            body = self._responses.get(digest)
+            if body is not None:
+                self._responses.move_to_end(digest)
+                self.counters['cached'] += 1
+                return body
+        if not self._slots.acquire(blocking=False):
+            self.count('rejected')
+            raise ServiceBusy()
+        if fmt != 'docx':
+            stream = self._stream(digest, fmt, overrides)
+            next(stream)
+            return stream
+        try:
+            future = self._pool.submit(_render_docx, overrides)
+            body, seconds, pid, parts = future.result()
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._parts[pid] = parts
+        self._rendered(digest, body, seconds)
+        return body
+
+    def _stream(self, digest, fmt, overrides):
+        from create_presentation import build_document
+        from presentation.export import iter_html, iter_markdown
+
+        try:
+            start = time.perf_counter()
+            document = build_document(overrides, **self._inputs)
+            chunks = _encoded(iter_html(document) if fmt == 'html' else iter_markdown(document))
+            seconds = time.perf_counter() - start
+            # report() runs the generator to here, so a failure to build the
+            # document is raised before any of the response is sent
+            yield
+            body = []
+            size = 0
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                seconds += time.perf_counter() - start
+                if chunk is None:
+                    break
+                size += len(chunk)
+                if size <= self.cache_bytes:
+                    body.append(chunk)
+                yield chunk
+        finally:
+            self._slots.release()
+        self._rendered(digest, b''.join(body) if size <= self.cache_bytes else None, seconds)
+
+    def _rendered(self, digest, body, seconds):
+        """Count a finished render and keep its body (None: too large) in the cache."""
+        with self._lock:
+            self.counters['rendered'] += 1
+            self.counters['render_seconds'] += seconds
+            if body is not None and len(body) <= self.cache_bytes and digest not in self._responses:
+                self._responses[digest] = body
+                self._cache_size += len(body)
+                while self._cache_size > self.cache_bytes:
+                    _, dropped = self._responses.popitem(last=False)
+                    self._cache_size -= len(dropped)
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            parts = list(self._parts.values())
+            responses = len(self._responses)
+            cache_size = self._cache_size
+        rendered = counters['rendered']
+        return {
+            **counters,
+            'mean_render_ms': counters['render_seconds'] * 1000 / rendered if rendered else 0.0,
+            'workers': self.workers,
+            'uptime_seconds': time.time() - self.started,
+            'response_cache': {'entries': responses, 'bytes': cache_size},
+            'part_cache': {key: sum(p[key] for p in parts)
+                           for key in ('entries', 'bytes', 'hits', 'misses')},
+        }
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CountryQuizReports/1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/_stats':
+            self._send_json(200, self.server.service.stats())
+        elif url.path == '/report':
+            overrides = dict(parse_qsl(url.query))
+            self._report(overrides.pop('format', 'docx'), overrides)
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/report':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        length = (self.headers.get('Content-Length') or '0').strip()
+        if not (length.isascii() and length.isdigit()):  # int() allows '-1', '+1', '1_0'
+            self.close_connection = True
+            self._send_json(400, {'error': 'Invalid Content-Length'})
+            return
+        length = int(length)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._send_json(413, {'error': 'Request body too large'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as error:
+            self._send_json(400, {'error': f'Invalid JSON: {error}'})
+            return
+        self._report(payload.get('format', 'docx'), payload.get('overrides') or {})
+
+    def _report(self, fmt, overrides):
+        service = self.server.service
+        service.count('requests')
+        try:
+            digest = service.digest(fmt, overrides)
+        except ValueError as error:
+            self._send_json(400, {'error': str(error)})
+            return
+        etag = f'"{digest}"'
+        if _etag_matches(self.headers.get('If-None-Match'), etag):
+            service.count('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        try:
+            body = service.report(digest, fmt, overrides)
+        except ServiceBusy:
+            self._send_json(503, {'error': 'All workers are busy'}, {'Retry-After': '1'})
+            return
+        except Exception as error:
+            service.count('errors')
+            print(f'Error rendering report: {error!r}')
+            self._send_json(500, {'error': 'Rendering failed'})
+            return
+
+        if isinstance(body, bytes):
+            self._send_body(fmt, etag, body)
+        else:
+            try:
+                self._send_stream(fmt, etag, body)
+            finally:
+                body.close()
+
+    def _send_headers(self, fmt, etag, headers):
+        self.send_response(200)
+        self.send_header('Content-Type', FORMATS[fmt])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Disposition', f'attachment; filename="{FILENAME}.{fmt}"')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+    def _send_body(self, fmt, etag, body):
+        self._send_headers(fmt, etag, {'Content-Length': str(len(body))})
+        view = memoryview(body)
+        for start in range(0, len(view), CHUNK):
+            self.wfile.write(view[start:start + CHUNK])
+
+    def _send_stream(self, fmt, etag, chunks):
+        # An HTTP/1.0 client cannot take chunked encoding; the end of its
+        # response is marked by closing the connection instead
+        chunked = self.request_version != 'HTTP/1.0'
+        if chunked:
+            self._send_headers(fmt, etag, {'Transfer-Encoding': 'chunked'})
+        else:
+            self.close_connection = True
+            self._send_headers(fmt, etag, {'Connection': 'close'})
+        try:
+            for chunk in chunks:
+                self.wfile.write(b'%x\r\n%b\r\n' % (len(chunk), chunk) if chunked else chunk)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except ConnectionError:
+            self.close_connection = True
+        except Exception as error:
+            # Too late for a 500: closing without the last chunk tells the
+            # client the response is incomplete
+            self.server.service.count('errors')
+            print(f'Error rendering report: {error!r}')
+            self.close_connection = True
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(address, **options):
+    """Serve reports on `address` ((host, port)) until interrupted.
+
+    `options` are the arguments of ReportService.
+    """
+    service = ReportService(**options)
+    server = ThreadingHTTPServer(address, _Handler)
+    server.daemon_threads = True
+    server.service = service
+    host, port = server.server_address[:2]
+    print(f'Serving reports on http://{host}:{port}/report with {service.workers} worker(s)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def parse_address(value):
+    """'[HOST:]PORT' -> (host, port); the host defaults to 127.0.0.1."""
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
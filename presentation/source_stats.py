@@ -0,0 +1,147 @@
+"""
+Facts for the deck derived from the application source.
+
+Values such as the number of achievements or quiz modes are read from the
+TypeScript sources rather than duplicated in sections.json, and the country
+count from data/countries.snap when a snapshot has been built. Extraction
+results are kept in an on-disk index keyed by each file's mtime, size and
+content hash: unchanged files are not re-read, files that were touched but
+not modified are not re-parsed, so a lookup on an unchanged tree costs a
+handful of stat() calls.
+
+collect_facts() returns strings that fill the matching ${placeholders} in
+the spec's meta block.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from presentation.spec import DEFAULT_CACHE_DIR, write_atomic
+from tools.country_snapshot import snapshot_count
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX = os.path.join(DEFAULT_CACHE_DIR, 'source-index.json')
+
+# Bump when an extractor changes so indexed facts are recomputed
+INDEX_VERSION = 1
+
+QUIZ_DIR = os.path.join('app', 'quiz')
+
+NUMBER_WORDS = ('Zero', 'One', 'Two', 'Three', 'Four', 'Five',
+                'Six', 'Seven', 'Eight', 'Nine', 'Ten')
+
+
+def _extract_storage(text):
+    """Count the entries of `export const ACHIEVEMENTS = { ... }`."""
+    match = re.search(r'export const ACHIEVEMENTS\b[^=]*=\s*\{(.*?)\n\}', text, re.S)
+    if not match:
+        return {}
+    keys = re.findall(r"^\s{2}['\"]?([\w-]+)['\"]?\s*:\s*\{", match.group(1), re.M)
+    return {'achievements': len(keys)}
+
+
+def _extract_countries(text):
+    """The (most common) numberOfQuestions default of the question generators."""
+    defaults = re.findall(r'numberOfQuestions\s*:\s*number\s*=\s*(\d+)', text)
+    if not defaults:
+        return {}
+    value, _ = Counter(int(d) for d in defaults).most_common(1)[0]
+    return {'questions_per_quiz': value}
+
+
+EXTRACTORS = {
+    os.path.join('lib', 'storage.ts'): _extract_storage,
+    os.path.join('lib', 'countries.ts'): _extract_countries,
+}
+
+
+class SourceIndex:
+    """On-disk map of relative path -> (mtime, size, sha256, extracted facts).
+
+    With `path` None the index lives in memory only: nothing is loaded or saved.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX):
+        self.path = path
+        self.dirty = False
+        self.entries = {}
+        if path is None:
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.entries = data['files']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def facts(self, root, relpath, extract):
+        """Return the facts for one file, re-reading it only when it changed."""
+        full = os.path.join(root, relpath)
+        try:
+            st = os.stat(full)
+        except FileNotFoundError:
+            if self.entries.pop(relpath, None) is not None:
+                self.dirty = True
+            return {}
+
+        entry = self.entries.get(relpath)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry['facts']
+
+        with open(full, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry['sha256'] == digest:
+            facts = entry['facts']
+        else:
+            facts = extract(data.decode('utf-8'))
+        self.entries[relpath] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                                 'sha256': digest, 'facts': facts}
+        self.dirty = True
+        return facts
+
+    def save(self):
+        if self.dirty and self.path:
+            payload = {'version': INDEX_VERSION, 'files': self.entries}
+            write_atomic(self.path, json.dumps(payload, indent=1).encode('utf-8'))
+            self.dirty = False
+
+
+def quiz_modes(root=ROOT):
+    """Names of the routes under app/quiz that have a page."""
+    try:
+        entries = os.scandir(os.path.join(root, QUIZ_DIR))
+    except FileNotFoundError:
+        return []
+    with entries:
+        return sorted(e.name for e in entries
+                      if e.is_dir() and os.path.exists(os.path.join(e.path, 'page.tsx')))
+
+
+def collect_facts(root=ROOT, index_path=DEFAULT_INDEX):
+    """Return the derived facts as strings keyed by spec placeholder name.
+
+    Facts whose source cannot be found are left out, so the spec's meta
+    defaults apply. With `index_path` None every source file is read and no
+    index is kept.
+    """
+    index = SourceIndex(index_path)
+    facts = {}
+    for relpath, extract in EXTRACTORS.items():
+        facts.update(index.facts(root, relpath, extract))
+    index.save()
+
+    snapshot = os.path.join(root, 'data', 'countries.snap')
+    if os.path.exists(snapshot):
+        facts['country_count'] = snapshot_count(snapshot)
+
+    modes = quiz_modes(root)
+    if modes:
+        facts['quiz_modes'] = len(modes)
+        if len(modes) < len(NUMBER_WORDS):
+            facts['quiz_modes_word'] = NUMBER_WORDS[len(modes)]
+    return {name: str(value) for name, value in facts.items()}
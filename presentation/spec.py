@@ -0,0 +1,173 @@
+"""
+Declarative section spec for the presentation and its compiled form.
+
+The spec (sections.json) describes the deck as a list of named sections,
+each a list of blocks. compile_spec() validates it and lowers it into a
+flat intermediate representation: per section, a tuple of render ops that
+create_presentation.render_ir() maps straight onto python-docx calls.
+
+Compiled IRs are pickled under the cache directory keyed by a hash of the
+spec bytes, so repeat renders skip JSON parsing and validation entirely.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPEC = os.path.join(HERE, 'sections.json')
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(HERE), '.cache', 'presentation')
+
+# Bump whenever the op layout below changes so stale pickles are ignored
+IR_VERSION = 1
+
+ALIGNMENTS = ('left', 'center', 'right', 'justify')
+PLACEHOLDER = re.compile(r'\$\{(\w+)\}')
+
+
+class SpecError(ValueError):
+    """Raised when the section spec is malformed."""
+
+
+def spec_digest(data):
+    """Content hash of raw spec bytes, including the IR version."""
+    return hashlib.sha256(b'ir%d\0' % IR_VERSION + data).hexdigest()
+
+
+def compile_spec(path=DEFAULT_SPEC, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the IR for the spec at `path`, compiling it on a cache miss."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = spec_digest(data)
+
+    cached = os.path.join(cache_dir, 'ir', f'{digest}.pickle') if cache_dir else None
+    if cached and os.path.exists(cached):
+        try:
+            with open(cached, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass  # Corrupt entry, fall through and rebuild it
+
+    try:
+        spec = json.loads(data)
+    except ValueError as error:
+        raise SpecError(f'{path}: {error}') from error
+    ir = lower(spec)
+    ir['digest'] = digest
+
+    if cached:
+        write_atomic(cached, pickle.dumps(ir, protocol=pickle.HIGHEST_PROTOCOL))
+    return ir
+
+
+def lower(spec):
+    """Validate a parsed spec and lower it into the IR."""
+    if not isinstance(spec, dict) or not isinstance(spec.get('sections'), list):
+        raise SpecError('spec must be an object with a "sections" list')
+    meta = spec.get('meta', {})
+    if not isinstance(meta, dict) or not all(isinstance(v, str) for v in meta.values()):
+        raise SpecError('"meta" must map names to strings')
+
+    sections = []
+    for s, section in enumerate(spec['sections']):
+        name = section.get('name')
+        if not isinstance(name, str):
+            raise SpecError(f'section {s} has no name')
+        ops = []
+        for b, block in enumerate(section.get('blocks', [])):
+            where = f'{name!r} block {b}'
+            try:
+                ops.extend(_lower_block(block))
+            except (KeyError, TypeError) as error:
+                raise SpecError(f'{where}: missing or invalid field {error}') from error
+            except SpecError as error:
+                raise SpecError(f'{where}: {error}') from error
+        _check_placeholders(ops, meta, name)
+        sections.append((name, tuple(ops)))
+
+    return {'version': IR_VERSION, 'meta': dict(meta), 'sections': tuple(sections)}
+
+
+def _lower_block(block):
+    kind = block['type']
+    if kind == 'spacer':
+        return [('spacer', int(block.get('count', 1)))]
+    if kind == 'page_break':
+        return [('page_break',)]
+    if kind == 'heading':
+        level = int(block.get('level', 1))
+        if not 0 <= level <= 9:
+            raise SpecError(f'heading level {level} out of range')
+        return [('heading', _text(block['text']), level, _align(block))]
+    if kind == 'paragraph':
+        return [_paragraph(block['text'], block)]
+    if kind == 'code':
+        return [_paragraph('\n'.join(_text(line) for line in block['lines']), block)]
+    if kind == 'paragraphs':
+        return [_paragraph(item, block) for item in block['items']]
+    if kind == 'bullets':
+        return [_paragraph(item, block, style='List Bullet') for item in block['items']]
+    if kind == 'numbered':
+        return [_paragraph(f'{i}. {_text(item)}', block)
+                for i, item in enumerate(block['items'], 1)]
+    if kind == 'definitions':
+        return [('definition', _text(term), _text(desc)) for term, desc in block['items']]
+    if kind == 'table':
+        header = tuple(_text(cell) for cell in block['header'])
+        rows = tuple(tuple(_text(cell) for cell in row) for row in block['rows'])
+        for row in rows:
+            if len(row) != len(header):
+                raise SpecError(f'table row {row!r} does not match header width {len(header)}')
+        return [('table', header, rows)]
+    raise SpecError(f'unknown block type {kind!r}')
+
+
+def _paragraph(text, block, style=None):
+    size = block.get('size')
+    space_after = block.get('space_after')
+    return ('paragraph', _text(text),
+            block.get('bold'), block.get('italic'),
+            float(size) if size is not None else None,
+            block.get('font'), _align(block), block.get('style', style),
+            float(space_after) if space_after is not None else None)
+
+
+def _text(value):
+    if not isinstance(value, str):
+        raise SpecError(f'expected text, got {value!r}')
+    return value
+
+
+def _align(block):
+    align = block.get('align')
+    if align is not None and align not in ALIGNMENTS:
+        raise SpecError(f'unknown alignment {align!r}')
+    return align
+
+
+def _check_placeholders(ops, meta, section):
+    for op in ops:
+        for value in op[1:]:
+            cells = value if isinstance(value, tuple) else (value,)
+            for cell in cells:
+                for text in (cell if isinstance(cell, tuple) else (cell,)):
+                    if not isinstance(text, str):
+                        continue
+                    for name in PLACEHOLDER.findall(text):
+                        if name not in meta:
+                            raise SpecError(f'{section!r}: placeholder ${{{name}}} has no meta entry')
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
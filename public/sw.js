@@ -1,4 +1,8 @@
-const CACHE_NAME = 'country-quiz-v1';
+// v1 also held flag images without bound; bumping the name drops it on activate
+const CACHE_NAME = 'country-quiz-v2';
+const FLAG_CACHE_NAME = 'country-quiz-flags-v1';
+const API_CACHE_NAME = 'country-quiz-api-v1';
+const CACHE_NAMES = [CACHE_NAME, FLAG_CACHE_NAME, API_CACHE_NAME];
 const urlsToCache = [
   '/',
   '/quiz/flags',
@@ -6,6 +10,22 @@ const urlsToCache = [
   '/quiz/population',
 ];
 
+// Flag images live in their own cache, bounded by entry count and bytes and
+// evicted least recently used first. Sizes and last-use times are tracked in
+// IndexedDB, since the Cache API keeps neither.
+const FLAG_HOSTS = ['flagcdn.com', 'upload.wikimedia.org'];
+const FLAG_MAX_ENTRIES = 400;
+const FLAG_MAX_BYTES = 20 * 1024 * 1024;
+// Opaque (no-cors) responses hide their size
+const OPAQUE_SIZE_ESTIMATE = 32 * 1024;
+
+// Offline copies of API and JSON responses live in their own cache, capped by
+// entry count; the least recently written are dropped first
+const API_MAX_ENTRIES = 20;
+
+const META_DB = 'country-quiz-sw';
+const FLAG_STORE = 'flags';
+
 // Install event - cache resources
 self.addEventListener('install', (event) => {
   event.waitUntil(
@@ -21,7 +41,7 @@ self.addEventListener('activate', (event) => {
     caches.keys().then((cacheNames) => {
       return Promise.all(
         cacheNames.map((cacheName) => {
-          if (cacheName !== CACHE_NAME) {
+          if (!CACHE_NAMES.includes(cacheName)) {
             return caches.delete(cacheName);
           }
         })
@@ -31,8 +51,35 @@ self.addEventListener('activate', (event) => {
   self.clients.claim();
 });
 
-// Fetch event - serve from cache, fallback to network
+// Fetch event - flags from the bounded flag cache, API responses from the
+// network when possible, everything else from cache with network fallback
 self.addEventListener('fetch', (event) => {
+  const url = new URL(event.request.url);
+  const key = event.request.method === 'GET' ? flagKey(url) : null;
+  if (key) {
+    event.respondWith(serveFlag(event, key));
+    return;
+  }
+
+  // Quizzes are random per request and JSON indexes (flag atlas, distractors)
+  // change on rebuild, so the cached copy is only an offline fallback
+  if (url.origin === self.location.origin &&
+      (url.pathname.startsWith('/api/') || url.pathname.endsWith('.json'))) {
+    event.respondWith(
+      fetch(event.request)
+        .then((response) => {
+          if (event.request.method === 'GET' && response.status === 200 && keepOffline(url)) {
+            event.waitUntil(storeApiResponse(event.request, response.clone()));
+          }
+          return response;
+        })
+        .catch(() => caches.open(API_CACHE_NAME)
+          .then((cache) => cache.match(event.request))
+          .then((response) => response || Response.error()))
+    );
+    return;
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then((response) => {
@@ -54,3 +101,191 @@ self.addEventListener('fetch', (event) => {
       })
   );
 });
+
+// A seeded quiz URL is unique per replay and never requested again, so it
+// is not kept; the page falls back to generating a quiz itself offline
+function keepOffline(url) {
+  return !(url.pathname === '/api/quiz' && url.searchParams.has('seed'));
+}
+
+async function storeApiResponse(request, response) {
+  const cache = await caches.open(API_CACHE_NAME);
+  // put() replaces an existing entry at the end of the key order
+  await cache.put(request, response);
+  const keys = await cache.keys();
+  const excess = keys.length - API_MAX_ENTRIES;
+  if (excess > 0) {
+    await Promise.all(keys.slice(0, excess).map((key) => cache.delete(key)));
+  }
+}
+
+// Message channel - the page asks for upcoming flags to be cached while the
+// current question is on screen:
+//   { type: 'PREFETCH_FLAGS', urls: [...] }, replied to on the transferred port
+self.addEventListener('message', (event) => {
+  const data = event.data || {};
+  if (data.type !== 'PREFETCH_FLAGS' || !Array.isArray(data.urls)) {
+    return;
+  }
+  const work = prefetchFlags(data.urls);
+  event.waitUntil(work);
+  const port = event.ports && event.ports[0];
+  if (port) {
+    work.then((result) => port.postMessage(result));
+  }
+});
+
+// Cache key of a flag image: the original flag URL, including when it is
+// requested through the Next.js image optimizer
+function flagKey(url) {
+  if (url.origin === self.location.origin && url.pathname === '/_next/image') {
+    const source = url.searchParams.get('url');
+    if (!source) {
+      return null;
+    }
+    url = new URL(source, self.location.origin);
+  }
+  return FLAG_HOSTS.includes(url.hostname) ? url.href : null;
+}
+
+async function serveFlag(event, key) {
+  const cache = await caches.open(FLAG_CACHE_NAME);
+  const cached = await cache.match(key);
+  if (cached) {
+    event.waitUntil(touchFlag(key));
+    return cached;
+  }
+
+  const response = await fetch(event.request);
+  if (response.status === 200 || response.type === 'opaque') {
+    event.waitUntil(storeFlag(cache, key, response.clone()));
+  }
+  return response;
+}
+
+async function prefetchFlags(urls) {
+  const cache = await caches.open(FLAG_CACHE_NAME);
+  const result = { cached: 0, fetched: 0, failed: 0 };
+
+  await Promise.all(urls.map(async (raw) => {
+    const key = flagKey(new URL(raw, self.location.origin));
+    if (!key) {
+      result.failed++;
+      return;
+    }
+    if (await cache.match(key)) {
+      await touchFlag(key);
+      result.cached++;
+      return;
+    }
+    try {
+      // Flag CDNs usually allow CORS; fall back to an opaque response,
+      // which <img> can still display
+      const response = await fetch(key, { mode: 'cors' })
+        .catch(() => fetch(key, { mode: 'no-cors' }));
+      if (response.status !== 200 && response.type !== 'opaque') {
+        throw new Error(`Flag request returned ${response.status}`);
+      }
+      await storeFlag(cache, key, response);
+      result.fetched++;
+    } catch (error) {
+      console.error('Error prefetching flag:', error);
+      result.failed++;
+    }
+  }));
+  return result;
+}
+
+async function storeFlag(cache, key, response) {
+  const size = response.type === 'opaque'
+    ? OPAQUE_SIZE_ESTIMATE
+    : (await response.clone().blob()).size;
+  await cache.put(key, response);
+  await updateFlagMeta((store) => store.put({ key, size, lastUsed: Date.now() }));
+  await evictFlags();
+}
+
+function touchFlag(key) {
+  return updateFlagMeta((store) => {
+    const request = store.get(key);
+    request.onsuccess = () => {
+      // Entries cached before the metadata existed get an estimated size
+      const meta = request.result || { key, size: OPAQUE_SIZE_ESTIMATE };
+      store.put({ ...meta, lastUsed: Date.now() });
+    };
+  });
+}
+
+// --- IndexedDB metadata ---
+
+let metaDb = null;
+
+function openMetaDb() {
+  if (!metaDb) {
+    metaDb = new Promise((resolve, reject) => {
+      const request = indexedDB.open(META_DB, 1);
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(FLAG_STORE, { keyPath: 'key' });
+        store.createIndex('lastUsed', 'lastUsed');
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        metaDb = null;
+        reject(request.error);
+      };
+    });
+  }
+  return metaDb;
+}
+
+async function updateFlagMeta(update) {
+  const db = await openMetaDb();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(FLAG_STORE, 'readwrite');
+    update(tx.objectStore(FLAG_STORE));
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+// Evictions run one at a time so concurrent stores do not double-count
+let eviction = Promise.resolve();
+
+function evictFlags() {
+  eviction = eviction.then(runEviction, runEviction);
+  return eviction;
+}
+
+async function runEviction() {
+  const victims = [];
+  await updateFlagMeta((store) => {
+    const countRequest = store.count();
+    const entries = [];
+    // Walk oldest first, then drop from the front until within budget
+    const cursorRequest = store.index('lastUsed').openCursor();
+    cursorRequest.onsuccess = () => {
+      const cursor = cursorRequest.result;
+      if (cursor) {
+        entries.push(cursor.value);
+        cursor.continue();
+        return;
+      }
+      let count = countRequest.result;
+      let bytes = entries.reduce((total, entry) => total + entry.size, 0);
+      for (const entry of entries) {
+        if (count <= FLAG_MAX_ENTRIES && bytes <= FLAG_MAX_BYTES) {
+          break;
+        }
+        store.delete(entry.key);
+        victims.push(entry.key);
+        count--;
+        bytes -= entry.size;
+      }
+    };
+  });
+
+  if (victims.length > 0) {
+    const cache = await caches.open(FLAG_CACHE_NAME);
+    await Promise.all(victims.map((key) => cache.delete(key)));
+  }
+}
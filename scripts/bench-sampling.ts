@@ -0,0 +1,91 @@
+// Micro-benchmark: question generation with the sampling engine versus the
+// previous copy-and-shuffle approach, at growing country list sizes.
+// Run with: npm run bench:sampling
+
+import { Country, QuizQuestion } from '../types/country'
+import { buildCapitalQuestions, buildFlagQuestions } from '../lib/countries'
+import { SamplingEngine } from '../lib/sampling'
+
+const REGIONS = ['Africa', 'Americas', 'Asia', 'Europe', 'Oceania']
+const SIZES = [250, 2_500, 25_000]
+const QUESTIONS = 10
+
+function makeCountries(n: number): Country[] {
+  return Array.from({ length: n }, (_, i) => ({
+    name: { common: `Country ${i}`, official: `Republic of Country ${i}` },
+    capital: i % 40 === 0 ? [] : [`Capital ${i}`],
+    population: 1_000 + ((i * 7_919) % 50_000_000),
+    flags: { png: `https://flagcdn.com/w320/${i}.png`, svg: `https://flagcdn.com/${i}.svg` },
+    region: REGIONS[i % REGIONS.length],
+    area: 100 + i,
+    cca2: `${i}`,
+    cca3: `C${i}`
+  }))
+}
+
+// The generators as they were before the sampling engine
+function legacyShuffle<T>(array: T[]): T[] {
+  const newArray = [...array]
+  for (let i = newArray.length - 1; i > 0; i--) {
+    const j = Math.floor(Math.random() * (i + 1));
+    [newArray[i], newArray[j]] = [newArray[j], newArray[i]]
+  }
+  return newArray
+}
+
+function legacyRandom(countries: Country[], count: number): Country[] {
+  return legacyShuffle(countries).slice(0, count)
+}
+
+function legacyFlag(countries: Country[]): QuizQuestion[] {
+  const popular = countries.filter(c => c.population > 5_000_000 || c.name.common.length <= 12)
+  const source = popular.length >= QUESTIONS ? popular : countries
+  return legacyRandom(source, QUESTIONS).map(correct => ({
+    correct,
+    options: legacyShuffle([correct, ...legacyRandom(
+      countries.filter(c => c.cca3 !== correct.cca3 && (c.region === correct.region || Math.random() > 0.5)),
+      3
+    )]),
+    type: 'flag' as const
+  }))
+}
+
+function legacyCapital(countries: Country[]): QuizQuestion[] {
+  const withCapitals = countries.filter(c => c.capital && c.capital.length > 0)
+  return legacyRandom(withCapitals, QUESTIONS).map(correct => ({
+    correct,
+    options: legacyShuffle([correct, ...legacyRandom(withCapitals.filter(c => c.cca3 !== correct.cca3), 3)]),
+    type: 'capital' as const
+  }))
+}
+
+function timePerCall(fn: () => unknown, minMs: number = 200): number {
+  for (let i = 0; i < 20; i++) fn() // warm up
+  let calls = 0
+  const start = performance.now()
+  let elapsed = 0
+  while (elapsed < minMs) {
+    fn()
+    calls++
+    elapsed = performance.now() - start
+  }
+  return (elapsed * 1000) / calls
+}
+
+console.log('countries  mode      legacy µs/quiz  engine µs/quiz  speed-up')
+for (const size of SIZES) {
+  const countries = makeCountries(size)
+  const engine = new SamplingEngine(countries)
+  const cases: [string, () => unknown, () => unknown][] = [
+    ['flag', () => legacyFlag(countries), () => buildFlagQuestions(engine, QUESTIONS)],
+    ['capital', () => legacyCapital(countries), () => buildCapitalQuestions(engine, QUESTIONS)]
+  ]
+  for (const [mode, legacy, current] of cases) {
+    const before = timePerCall(legacy)
+    const after = timePerCall(current)
+    console.log(
+      `${String(size).padStart(9)}  ${mode.padEnd(8)}  ${before.toFixed(1).padStart(14)}  ` +
+      `${after.toFixed(1).padStart(14)}  ${(before / after).toFixed(1).padStart(7)}x`
+    )
+  }
+}
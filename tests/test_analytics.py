@@ -0,0 +1,52 @@
+import json
+from collections import Counter
+
+from tools.analytics import MODES, Partial, parse_events, summarize
+
+
+def _lines(*events):
+    return [(e if isinstance(e, str) else json.dumps(e)).encode() + b'\n' for e in events]
+
+
+def _consume(lines):
+    counts = Counter()
+    partial = Partial().consume(parse_events(lines, counts), chunk_size=2)
+    partial.errors += counts['errors']
+    return partial
+
+
+def test_malformed_answers_are_counted_as_errors():
+    good = {'type': 'answer', 'mode': 'flags', 'cca3': 'FRA', 'correct': False,
+            'chosen': 'BEL', 'ms': 1200}
+    partial = _consume(_lines(
+        good,
+        {**good, 'cca3': ['x']},
+        {**good, 'chosen': {'code': 'BEL'}},
+        {**good, 'correct': 'false'},
+        {**good, 'correct': 1},
+        {**good, 'mode': 'unknown'},
+        {'type': 'answer', 'mode': 'flags', 'correct': True},
+        '{not json',
+        '',
+        {'type': 'game', 'mode': 'flag', 'score': 1, 'total': 1, 'achievements': ['perfect']},
+    ))
+
+    assert partial.errors == 7
+    assert partial.events == 2
+    assert partial.codes == ['FRA', 'BEL']
+    flags = MODES.index('flags')
+    assert partial.answers[flags].tolist() == [1, 0]
+    assert partial.correct[flags].tolist() == [0, 0]
+    assert partial.games[flags] == 1
+    assert partial.achievements == Counter({'perfect': 1})
+
+
+def test_partials_merge_like_one_stream():
+    events = [{'type': 'answer', 'mode': mode, 'cca3': code, 'correct': i % 3 == 0,
+               'chosen': None if i % 3 == 0 else 'DEU', 'ms': 100 + 37 * i}
+              for i, (mode, code) in enumerate((m, c) for m in MODES for c in ('FRA', 'ITA', 'ESP'))]
+    whole = _consume(_lines(*events))
+    merged = _consume(_lines(*events[:4])).merge(_consume(_lines(*events[4:])))
+    merged = Partial.from_json(json.loads(json.dumps(merged.to_json())))
+
+    assert summarize(merged, min_answers=1) == summarize(whole, min_answers=1)
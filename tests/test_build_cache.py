@@ -0,0 +1,51 @@
+import os
+import stat
+
+from presentation.build_cache import ArtifactCache, output_tempfile
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_cache_hit_keeps_the_mode_of_a_fresh_build(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    built = tmp_path / 'built.docx'
+    built.write_bytes(b'deck')  # A cold build writes with open()
+
+    cache.store('abc', str(built))
+    restored = tmp_path / 'restored.docx'
+    assert cache.fetch('abc', str(restored))
+
+    assert restored.read_bytes() == b'deck'
+    assert _mode(restored) == _mode(built)
+    assert _mode(cache.path_for('abc')) == _mode(built)
+
+
+def test_caches_sharing_a_directory_share_the_size_bound(tmp_path):
+    directory = str(tmp_path / 'cache')
+    docx = ArtifactCache(directory, max_bytes=250, max_age_days=None, suffix='.docx')
+    html = ArtifactCache(directory, max_bytes=250, max_age_days=None, suffix='.html')
+    for i, cache in enumerate([docx, html, docx, html]):
+        built = tmp_path / f'built{i}'
+        built.write_bytes(b'x' * 100)
+        os.utime(built, (1000 + i, 1000 + i))
+        cache.store(f'd{i}', str(built))
+        os.utime(cache.path_for(f'd{i}'), (1000 + i, 1000 + i))
+
+    kept = sorted(os.listdir(directory))
+    assert kept == ['d2.docx', 'd3.html']
+
+
+def test_tempfiles_follow_the_umask_in_effect(tmp_path):
+    previous = os.umask(0o027)
+    try:
+        fd, tmp = output_tempfile(str(tmp_path))
+        os.close(fd)
+        assert _mode(tmp) == 0o640
+        os.umask(0o002)
+        fd, tmp = output_tempfile(str(tmp_path))
+        os.close(fd)
+        assert _mode(tmp) == 0o664
+    finally:
+        os.umask(previous)
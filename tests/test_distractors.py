@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pytest
+
+from tools.country_snapshot import CountrySnapshot, write_snapshot
+from tools.distractors import build_index, features, main, tier_bounds
+
+REGIONS = ('Africa', 'Americas', 'Asia', 'Europe', 'Oceania')
+LANGUAGES = ('eng', 'fra', 'spa', 'ara', 'por')
+
+
+def _country(i):
+    return {
+        'name': {'common': f'Country {i}'},
+        'cca2': f'{chr(65 + i // 26)}{chr(65 + i % 26)}',
+        'cca3': f'X{chr(65 + i // 26)}{chr(65 + i % 26)}',
+        # Every seventh country is uninhabited and never a distractor
+        'population': 0 if i % 7 == 3 else 1000 + (i * 7919) % 50_000_000,
+        'area': 10.0 + (i * 104_729) % 2_000_000,
+        'region': REGIONS[i % len(REGIONS)],
+        'subregion': f'{REGIONS[i % len(REGIONS)]} {i % 3}',
+        'languages': {code: code for code in LANGUAGES[i % 4:i % 4 + 1 + i % 2]},
+        'flags': {'png': f'{i}.png'},
+    }
+
+
+@pytest.fixture(scope='module')
+def snapshot_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('snapshot') / 'countries.snap')
+    write_snapshot([_country(i) for i in range(80)], path)
+    return path
+
+
+def test_neighbours_match_brute_force(snapshot_path):
+    index = build_index(snapshot_path, k=12)
+    with CountrySnapshot(snapshot_path) as snapshot:
+        x = features(snapshot)
+        playable = [snapshot.population[row] > 0 for row in range(len(snapshot))]
+
+    k = index['k']
+    assert k == 12
+    neighbours = np.array(index['neighbours']).reshape(len(index['codes']), k)
+    for row in range(len(x)):
+        dist = [(float(((x[row] - x[other]) ** 2).sum()), other)
+                for other in range(len(x)) if other != row and playable[other]]
+        expected = sorted(d for d, _ in dist)[:k]
+        got = [float(((x[row] - x[other]) ** 2).sum()) for other in neighbours[row]]
+        assert np.allclose(got, expected)
+        assert row not in neighbours[row]
+        assert all(playable[other] for other in neighbours[row])
+        assert len(set(neighbours[row])) == k
+
+
+def test_k_is_capped_by_playable_countries(tmp_path):
+    path = str(tmp_path / 'countries.snap')
+    write_snapshot([_country(i) for i in range(6)], path)
+    index = build_index(path, k=12)
+    # Country 3 is uninhabited, leaving five playable rows
+    assert index['k'] == 4
+    assert len(index['neighbours']) == 6 * 4
+
+
+def test_tiers_split_ranks_evenly():
+    assert tier_bounds(12, 3) == {'hard': [0, 4], 'medium': [4, 8], 'easy': [8, 12]}
+    assert tier_bounds(10, 4) == {'hard': [0, 2], 'medium': [2, 5], 'easy': [5, 8], 'tier3': [8, 10]}
+
+
+def test_main_writes_index(snapshot_path, tmp_path):
+    output = tmp_path / 'out' / 'distractors.json'
+    assert main([snapshot_path, '-o', str(output), '--k', '6', '--tiers', '2']) == 0
+    index = json.loads(output.read_text())
+    assert index['version'] == 1
+    assert index['k'] == 6
+    assert index['tiers'] == {'hard': [0, 3], 'medium': [3, 6]}
+    assert index['codes'][:2] == ['XAA', 'XAB']
+    assert index == build_index(snapshot_path, k=6, tiers=2)
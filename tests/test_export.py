@@ -0,0 +1,19 @@
+import os
+import stat
+
+from presentation.export import write_streamed
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_streamed_output_has_the_mode_of_open(tmp_path):
+    reference = tmp_path / 'reference.html'
+    reference.write_text('deck')
+    output = tmp_path / 'deck.html'
+
+    write_streamed(str(output), ['de', 'ck'])
+
+    assert output.read_text() == 'deck'
+    assert _mode(output) == _mode(reference)
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from tools.country_snapshot import CountrySnapshot, write_snapshot
+from tools.question_bank import NO_OPTION, RECORD_DTYPE, main, write_bank
+
+REGIONS = ('Africa', 'Americas', 'Asia', 'Europe', 'Oceania')
+
+
+def _country(i):
+    return {
+        'name': {'common': f'Country {i}' if i % 3 else f'The Republic of Country {i}'},
+        'cca2': f'{chr(65 + i // 26)}{chr(65 + i % 26)}',
+        'cca3': f'X{chr(65 + i // 26)}{chr(65 + i % 26)}',
+        'population': 1000 + i * 250_000,
+        'region': REGIONS[i % len(REGIONS)],
+        'capital': [f'Capital {i}'] if i % 4 else [],
+        'flags': {'png': f'{i}.png'},
+    }
+
+
+@pytest.fixture(scope='module')
+def snapshot_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('snapshot') / 'countries.snap')
+    write_snapshot([_country(i) for i in range(60)], path)
+    return path
+
+
+def _quizzes(output, manifest, mode):
+    records = []
+    for shard in manifest['modes'][mode]['shards']:
+        with open(os.path.join(output, shard['file']), 'rb') as f:
+            data = f.read()
+        assert hashlib.sha256(data).hexdigest() == shard['sha256']
+        assert len(data) == shard['quizzes'] * manifest['quiz_size'] * RECORD_DTYPE.itemsize
+        records.append(np.frombuffer(data, RECORD_DTYPE))
+    return np.concatenate(records).reshape(-1, manifest['quiz_size'])
+
+
+def test_bank_round_trip_follows_the_quiz_rules(snapshot_path, tmp_path):
+    output = str(tmp_path / 'bank')
+    manifest = write_bank(snapshot_path, output, quizzes=50, quiz_size=10, shard_quizzes=16,
+                          seed=1)
+    with open(os.path.join(output, 'manifest.json'), encoding='utf-8') as f:
+        assert json.load(f) == manifest
+    assert [s['quizzes'] for s in manifest['modes']['flag']['shards']] == [16, 16, 16, 2]
+
+    with CountrySnapshot(snapshot_path) as snapshot:
+        population = np.frombuffer(snapshot.population, dtype='<u8').copy()
+        has_capital = [bool(snapshot.capitals(i)) for i in range(len(snapshot))]
+
+    for mode, width in (('flag', 4), ('capital', 4), ('population', 2)):
+        quizzes = _quizzes(output, manifest, mode)
+        assert quizzes.shape == (50, 10)
+        options = quizzes['options']
+        assert (options[..., width:] == NO_OPTION).all()
+        options = options[..., :width].astype(np.int64)
+        correct = np.take_along_axis(options, quizzes['answer'][..., None].astype(np.int64),
+                                     axis=2)[..., 0]
+        assert all(len(set(row)) == width for row in options.reshape(-1, width).tolist())
+        assert all(len(set(quiz)) == 10 for quiz in correct.tolist())
+        if mode == 'capital':
+            assert all(has_capital[row] for row in options.reshape(-1).tolist())
+        if mode == 'population':
+            assert (population[correct] == population[options].max(axis=2)).all()
+
+    again = write_bank(snapshot_path, str(tmp_path / 'again'), quizzes=50, quiz_size=10,
+                       shard_quizzes=16, seed=1)
+    assert again['modes'] == manifest['modes']
+
+
+@pytest.mark.parametrize('option', ['--shard-quizzes=0', '--quiz-size=0', '--quizzes=-1'])
+def test_counts_below_the_minimum_are_rejected(snapshot_path, tmp_path, option):
+    with pytest.raises(SystemExit) as error:
+        main([snapshot_path, '-o', str(tmp_path / 'bank'), option])
+    assert error.value.code == 2
+    with pytest.raises(ValueError):
+        write_bank(snapshot_path, str(tmp_path / 'bank'), quizzes=-1)
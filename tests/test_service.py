@@ -0,0 +1,87 @@
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from presentation.service import ReportService, _Handler
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = ReportService(workers=1)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize('fmt, overrides', [
+    (['html'], {}),
+    ({'html': 1}, {}),
+    ('pdf', {}),
+    ('html', ['title']),
+    ('html', {'title': 1}),
+    ('html', {'title': ['Acme']}),
+    ('html', {1: 'Acme'}),
+])
+def test_digest_rejects_malformed_requests(service, fmt, overrides):
+    with pytest.raises(ValueError):
+        service.digest(fmt, overrides)
+
+
+def test_digest_depends_on_format_and_overrides(service):
+    field = sorted(service.fields)[0]
+    assert service.digest('html', {}) != service.digest('md', {})
+    assert service.digest('html', {field: 'a'}) != service.digest('html', {field: 'b'})
+    assert service.digest('html', {field: 'a'}) == service.digest('html', {field: 'a'})
+
+
+@pytest.fixture(scope='module')
+def server(service):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('length', ['-1', 'ten', '+2', '1_0', '2.0'])
+def test_post_rejects_an_invalid_content_length(server, length):
+    connection = HTTPConnection(*server, timeout=5)
+    connection.putrequest('POST', '/report')
+    connection.putheader('Content-Length', length)
+    connection.endheaders(b'{}')
+    response = connection.getresponse()
+    assert response.status == 400
+    assert b'Content-Length' in response.read()
+    connection.close()
+
+
+def test_html_is_streamed_then_served_from_the_cache(server):
+    bodies = []
+    for _ in range(2):
+        connection = HTTPConnection(*server, timeout=30)
+        connection.request('GET', '/report?format=html&title=Streamed')
+        response = connection.getresponse()
+        assert response.status == 200
+        bodies.append((response.getheader('Transfer-Encoding'),
+                       response.getheader('Content-Length'), response.read()))
+        connection.close()
+
+    (encoding, length, streamed), (_, cached_length, cached) = bodies
+    assert encoding == 'chunked' and length is None
+    assert streamed.startswith(b'<!DOCTYPE html>') and b'Streamed' in streamed
+    assert cached == streamed and int(cached_length) == len(cached)
+
+
+def test_if_none_match_accepts_lists_weak_tags_and_any(server, service):
+    etag = f'"{service.digest("md", {})}"'
+    for header, status in ((etag, 304), (f'"other", W/{etag}', 304), ('*', 304),
+                           ('"other"', 200), (f'W/"x{etag[1:]}', 200)):
+        connection = HTTPConnection(*server, timeout=30)
+        connection.request('GET', '/report?format=md', headers={'If-None-Match': header})
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        assert response.status == status, header
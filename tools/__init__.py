@@ -0,0 +1,3 @@
+"""
+Offline data tools for the Country Quiz Game.
+"""
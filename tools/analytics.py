@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Streaming analytics over exported gameplay logs.
+
+Reads JSONL event logs (plain or gzipped, any size) in constant memory and
+summarises them for the presentation (see presentation/analytics.py). Each
+line is one event as recorded by lib/eventLog.ts:
+
+  {"type": "answer", "mode": "flags", "cca3": "FRA", "correct": false,
+   "chosen": "BEL", "ms": 2310, "time": 1718000000000}
+  {"type": "game", "mode": "flags", "score": 7, "total": 10,
+   "achievements": ["perfect"], "time": ...}
+
+`chosen` (the option picked), `ms` (time to answer) and `achievements`
+(ids first unlocked by that game) are optional.
+
+Lines flow through generator stages (read -> parse -> columnar chunks) and
+each chunk is folded into a Partial with NumPy bincounts. A Partial holds
+per-mode and per-country answer counts, a log-bucketed histogram of answer
+times per mode (percentiles within about 3%), wrong-answer pair counts and
+achievement unlock counts.
+Partials merge exactly, so shards are processed in a process pool and
+saved partials can be combined later.
+
+Usage:
+  python -m tools.analytics logs/*.jsonl.gz -o analytics.json --workers 8
+  python -m tools.analytics day1.jsonl --save-partial day1.partial.json
+  python -m tools.analytics day1.partial.json day2.partial.json -o analytics.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ANALYTICS_VERSION = 1
+PARTIAL_SUFFIX = '.partial.json'
+MODES = ('flags', 'capitals', 'population')
+MODE_ALIASES = {'flag': 'flags', 'capital': 'capitals'}
+DEFAULT_CHUNK = 65536
+
+# Answer-time histogram: log-spaced buckets from 10 ms to 10 minutes
+TIME_BINS = 400
+TIME_EDGES = np.geomspace(10.0, 600_000.0, TIME_BINS + 1)
+
+# Bits per country id in a packed (mode, correct, chosen) pair key
+_ID_BITS = 20
+_NO_CHOICE = -1
+
+
+def read_lines(path):
+    """Yield the raw lines of a plain or gzipped log."""
+    with open(path, 'rb') as f:
+        gzipped = f.read(2) == b'\x1f\x8b'
+    opener = gzip.open if gzipped else open
+    with opener(path, 'rb') as f:
+        yield from f
+
+
+def parse_events(lines, counts):
+    """Yield (kind, mode, cca3, correct, chosen, ms) tuples, counting bad lines in `counts`.
+
+    A game is followed by one ('achievement', mode, id, ...) tuple per unlock.
+    """
+    modes = {m: i for i, m in enumerate(MODES)}
+    modes.update((alias, modes[m]) for alias, m in MODE_ALIASES.items())
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+            mode = modes[event['mode']]
+            if event['type'] == 'answer':
+                cca3, correct, chosen = event['cca3'], event['correct'], event.get('chosen')
+                if not (isinstance(cca3, str) and isinstance(correct, bool)
+                        and (chosen is None or isinstance(chosen, str))):
+                    raise TypeError('cca3/chosen must be strings and correct a boolean')
+                ms = event.get('ms')
+                yield ('answer', mode, cca3, correct, chosen,
+                       float(ms) if ms is not None else np.nan)
+            elif event['type'] == 'game':
+                unlocked = [str(a) for a in event.get('achievements') or ()]
+                yield ('game', mode, None, False, None, np.nan)
+                for achievement in unlocked:
+                    yield ('achievement', mode, achievement, False, None, np.nan)
+        except (ValueError, KeyError, TypeError):
+            counts['errors'] += 1
+
+
+class Partial:
+    """Mergeable aggregates over answer and game events."""
+
+    def __init__(self):
+        self.codes = []
+        self.ids = {}
+        self.events = 0
+        self.errors = 0
+        self.games = np.zeros(len(MODES), np.int64)
+        self.answers = np.zeros((len(MODES), 0), np.int64)
+        self.correct = np.zeros((len(MODES), 0), np.int64)
+        self.times = np.zeros((len(MODES), TIME_BINS), np.int64)
+        self.pairs = Counter()
+        self.achievements = Counter()
+
+    def country_id(self, code):
+        cid = self.ids.get(code)
+        if cid is None:
+            cid = self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        return cid
+
+    def _grow(self):
+        extra = len(self.codes) - self.answers.shape[1]
+        if extra > 0:
+            pad = np.zeros((len(MODES), extra), np.int64)
+            self.answers = np.hstack([self.answers, pad])
+            self.correct = np.hstack([self.correct, pad])
+
+    def consume(self, events, chunk_size=DEFAULT_CHUNK):
+        """Fold an event stream into the aggregates, chunk_size events at a time."""
+        for chunk in self._chunks(events, chunk_size):
+            self.add_chunk(*chunk)
+        return self
+
+    def _chunks(self, events, size):
+        mode = np.empty(size, np.int64)
+        country = np.empty(size, np.int64)
+        correct = np.empty(size, bool)
+        chosen = np.empty(size, np.int64)
+        ms = np.empty(size, np.float64)
+        n = 0
+        for kind, m, code, ok, pick, elapsed in events:
+            if kind == 'achievement':
+                self.achievements[code] += 1
+                continue
+            self.events += 1
+            if kind == 'game':
+                self.games[m] += 1
+                continue
+            mode[n] = m
+            country[n] = self.country_id(code)
+            correct[n] = ok
+            chosen[n] = self.country_id(pick) if pick else _NO_CHOICE
+            ms[n] = elapsed
+            n += 1
+            if n == size:
+                yield mode, country, correct, chosen, ms
+                n = 0
+        if n:
+            yield mode[:n], country[:n], correct[:n], chosen[:n], ms[:n]
+
+    def add_chunk(self, mode, country, correct, chosen, ms):
+        """Add one columnar chunk of answers (country/chosen are ids from country_id)."""
+        self._grow()
+        width = len(self.codes)
+        cells = len(MODES) * width
+        flat = mode * width + country
+        self.answers += np.bincount(flat, minlength=cells).reshape(len(MODES), width)
+        self.correct += np.bincount(flat[correct], minlength=cells).reshape(len(MODES), width)
+
+        timed = ~np.isnan(ms)
+        bins = np.clip(np.searchsorted(TIME_EDGES, ms[timed], side='right') - 1, 0, TIME_BINS - 1)
+        self.times += np.bincount(mode[timed] * TIME_BINS + bins,
+                                  minlength=len(MODES) * TIME_BINS).reshape(len(MODES), TIME_BINS)
+
+        wrong = ~correct & (chosen != _NO_CHOICE)
+        if wrong.any():
+            keys = (mode[wrong] << (2 * _ID_BITS)) | (country[wrong] << _ID_BITS) | chosen[wrong]
+            uniq, counts = np.unique(keys, return_counts=True)
+            self.pairs.update(dict(zip(uniq.tolist(), counts.tolist())))
+
+    def _pair(self, key):
+        mask = (1 << _ID_BITS) - 1
+        return key >> (2 * _ID_BITS), self.codes[(key >> _ID_BITS) & mask], self.codes[key & mask]
+
+    def merge(self, other):
+        """Add another Partial's aggregates into this one (country ids are remapped)."""
+        remap = np.array([self.country_id(code) for code in other.codes], np.int64)
+        self._grow()
+        self.events += other.events
+        self.errors += other.errors
+        self.games += other.games
+        np.add.at(self.answers, (slice(None), remap), other.answers)
+        np.add.at(self.correct, (slice(None), remap), other.correct)
+        self.times += other.times
+        for key, count in other.pairs.items():
+            mode, code, pick = other._pair(key)
+            new = (mode << (2 * _ID_BITS)) | (self.ids[code] << _ID_BITS) | self.ids[pick]
+            self.pairs[new] += count
+        self.achievements.update(other.achievements)
+        return self
+
+    def to_json(self):
+        return {
+            'version': ANALYTICS_VERSION,
+            'codes': self.codes,
+            'events': self.events,
+            'errors': self.errors,
+            'games': self.games.tolist(),
+            'answers': self.answers.tolist(),
+            'correct': self.correct.tolist(),
+            # Sparse: most buckets are empty
+            'times': [{str(b): int(c) for b, c in enumerate(row) if c} for row in self.times],
+            'pairs': [[*self._pair(key), count] for key, count in self.pairs.items()],
+            'achievements': dict(self.achievements),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('version') != ANALYTICS_VERSION:
+            raise ValueError(f'Unsupported partial version {data.get("version")}')
+        partial = cls()
+        for code in data['codes']:
+            partial.country_id(code)
+        partial.events = data['events']
+        partial.errors = data['errors']
+        partial.games = np.array(data['games'], np.int64)
+        partial.answers = np.array(data['answers'], np.int64).reshape(len(MODES), -1)
+        partial.correct = np.array(data['correct'], np.int64).reshape(len(MODES), -1)
+        for m, row in enumerate(data['times']):
+            for b, c in row.items():
+                partial.times[m, int(b)] = c
+        for mode, code, pick, count in data['pairs']:
+            key = (mode << (2 * _ID_BITS)) | (partial.ids[code] << _ID_BITS) | partial.ids[pick]
+            partial.pairs[key] = count
+        partial.achievements.update(data.get('achievements', {}))
+        return partial
+
+
+def process_file(path, chunk_size=DEFAULT_CHUNK):
+    """Aggregate one log (or load one saved partial) into a Partial."""
+    if path.endswith(PARTIAL_SUFFIX):
+        with open(path, encoding='utf-8') as f:
+            return Partial.from_json(json.load(f))
+    counts = Counter()
+    partial = Partial().consume(parse_events(read_lines(path), counts), chunk_size)
+    partial.errors += counts['errors']
+    return partial
+
+
+def _process_to_json(args):
+    return process_file(*args).to_json()
+
+
+def aggregate(paths, workers=None, chunk_size=DEFAULT_CHUNK):
+    """Aggregate many logs, one per pool task, and merge the partials."""
+    total = Partial()
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            total.merge(process_file(path, chunk_size))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Partials cross the process boundary in their JSON form
+        for data in pool.map(_process_to_json, [(p, chunk_size) for p in paths]):
+            total.merge(Partial.from_json(data))
+    return total
+
+
+def percentile(histogram, q):
+    """Approximate q-th percentile (0-100) of a TIME_EDGES histogram, or None if empty."""
+    total = histogram.sum()
+    if not total:
+        return None
+    target = q / 100 * total
+    cumulative = np.cumsum(histogram)
+    b = int(np.searchsorted(cumulative, target))
+    before = cumulative[b - 1] if b else 0
+    fraction = (target - before) / histogram[b] if histogram[b] else 0.0
+    lo, hi = TIME_EDGES[b], TIME_EDGES[b + 1]
+    return float(lo * (hi / lo) ** fraction)
+
+
+def _ratio(num, den):
+    return round(num / den, 4) if den else None
+
+
+def summarize(partial, top=15, min_answers=20):
+    """Compact summary of a Partial for presentation tables."""
+    modes = []
+    for m, name in enumerate(MODES):
+        answers = int(partial.answers[m].sum())
+        correct = int(partial.correct[m].sum())
+        p = {q: percentile(partial.times[m], q) for q in (50, 90, 99)}
+        modes.append({
+            'mode': name,
+            'games': int(partial.games[m]),
+            'answers': answers,
+            'accuracy': _ratio(correct, answers),
+            'p50_ms': p[50] and round(p[50]),
+            'p90_ms': p[90] and round(p[90]),
+            'p99_ms': p[99] and round(p[99]),
+        })
+
+    answers = partial.answers.sum(axis=0)
+    correct = partial.correct.sum(axis=0)
+    rated = np.flatnonzero(answers >= min_answers)
+    accuracy = correct[rated] / answers[rated]
+    order = rated[np.argsort(accuracy, kind='stable')]
+
+    def country(cid):
+        return {'cca3': partial.codes[cid], 'answers': int(answers[cid]),
+                'accuracy': _ratio(int(correct[cid]), int(answers[cid]))}
+
+    confusions = []
+    for key, count in partial.pairs.most_common(top):
+        mode, code, pick = partial._pair(key)
+        seen = int(partial.answers[mode, partial.ids[code]])
+        confusions.append({'mode': MODES[mode], 'correct': code, 'chosen': pick,
+                           'count': count, 'share': _ratio(count, seen)})
+
+    games = int(partial.games.sum())
+    achievements = [{'id': name, 'unlocks': count,
+                     'per_100_games': round(100 * count / games, 2) if games else None}
+                    for name, count in partial.achievements.most_common()]
+
+    return {
+        'version': ANALYTICS_VERSION,
+        'events': partial.events,
+        'errors': partial.errors,
+        'countries': len(partial.codes),
+        'modes': modes,
+        'hardest': [country(cid) for cid in order[:top]],
+        'easiest': [country(cid) for cid in order[::-1][:top]],
+        'confusions': confusions,
+        'achievements': achievements,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarise exported gameplay logs.')
+    parser.add_argument('inputs', nargs='+',
+                        help=f'JSONL logs (optionally .gz) or saved *{PARTIAL_SUFFIX} files')
+    parser.add_argument('-o', '--output', help='write the summary JSON here')
+    parser.add_argument('--save-partial', metavar='PATH',
+                        help='also write the mergeable partial aggregates')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='process pool size (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK)
+    parser.add_argument('--top', type=int, default=15, help='rows per ranking')
+    parser.add_argument('--min-answers', type=int, default=20,
+                        help='answers a country needs to be ranked')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    partial = aggregate(args.inputs, args.workers, args.chunk_size)
+    if args.save_partial:
+        with open(args.save_partial, 'w', encoding='utf-8') as f:
+            json.dump(partial.to_json(), f, separators=(',', ':'))
+
+    summary = summarize(partial, args.top, args.min_answers)
+    text = json.dumps(summary, indent=1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    seconds = time.perf_counter() - started
+    print(f'✓ {partial.events:,} events ({partial.errors} bad lines) from '
+          f'{len(args.inputs)} input(s) in {seconds:.2f}s '
+          f'({partial.events / max(seconds, 1e-9):,.0f} events/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Compact columnar snapshot of the REST Countries dataset.
+
+Converts a local REST Countries JSON dump (the payload /api/countries
+serves) into a single binary file that can be memory-mapped and read with
+zero copies:
+
+  - fixed-width numeric columns for population (u64) and area (f64)
+  - dictionary-encoded region and subregion (u8 codes)
+  - an interned string table for names, capitals, flags and languages
+  - cca2/cca3 code columns plus sorted indexes for binary-search lookup
+
+Layout (all little-endian):
+
+  header   magic "CQSNAP\\0\\1", u32 version, u32 row count, u32 section count
+  sections section count x (u64 offset, u64 length), see SECTIONS
+  data     each section 8-byte aligned
+
+String references are u32 ids into the string table; NONE marks a missing
+value. The same layout is read by lib/countrySnapshot.ts on the server.
+
+Usage:
+  python -m tools.country_snapshot build countries.json -o data/countries.snap
+  python -m tools.country_snapshot info data/countries.snap
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+
+MAGIC = b'CQSNAP\x00\x01'
+VERSION = 1
+NONE = 0xFFFFFFFF
+NO_CODE = 0xFF
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SNAPSHOT = os.path.join(ROOT, 'data', 'countries.snap')
+
+# Section order is part of the format; append only
+SECTIONS = (
+    'population',       # u64[n]
+    'area',             # f64[n]
+    'region',           # u8[n], index into region_dict
+    'subregion',        # u8[n], index into subregion_dict or NO_CODE
+    'name',             # u32[n] string ids
+    'official',         # u32[n]
+    'flag_png',         # u32[n]
+    'flag_svg',         # u32[n]
+    'flag_alt',         # u32[n] or NONE
+    'cca2',             # 2 ASCII bytes per row
+    'cca3',             # 3 ASCII bytes per row
+    'capital_offsets',  # u32[n + 1] ranges into capital_ids
+    'capital_ids',      # u32[] string ids
+    'language_offsets', # u32[n + 1] ranges into language_ids
+    'language_ids',     # u16[] indexes into language_dict
+    'region_dict',      # u32[] string ids
+    'subregion_dict',   # u32[] string ids
+    'language_dict',    # u32[2 * k] (code id, name id) pairs
+    'cca3_index',       # u16[n] rows ordered by cca3
+    'cca2_index',       # u16[n] rows ordered by cca2
+    'string_offsets',   # u32[s + 1] byte ranges into string_data
+    'string_data',      # UTF-8
+)
+
+_HEADER = struct.Struct('<8sIII')
+_SECTION = struct.Struct('<QQ')
+
+
+class _Strings:
+    """Interning string table builder."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def id(self, value):
+        if value is None:
+            return NONE
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+    def encode(self):
+        offsets = [0]
+        chunks = []
+        for value in self.values:
+            data = value.encode('utf-8')
+            chunks.append(data)
+            offsets.append(offsets[-1] + len(data))
+        return _pack('I', offsets), b''.join(chunks)
+
+
+def _pack(fmt, values):
+    return struct.pack(f'<{len(values)}{fmt}', *values)
+
+
+def _code(value, width, country):
+    data = (value or '').encode('ascii')
+    if len(data) != width:
+        raise ValueError(f'{country}: expected a {width}-letter code, got {value!r}')
+    return data
+
+
+def build_snapshot(countries):
+    """Encode REST Countries records into snapshot bytes."""
+    countries = [c for c in countries if (c.get('name') or {}).get('common')]
+    countries.sort(key=lambda c: c['cca3'])
+    if len(countries) > 0xFFFF:
+        raise ValueError('too many countries for u16 row indexes')
+
+    strings = _Strings()
+    regions, subregions, languages = {}, {}, {}
+    cols = {name: [] for name in SECTIONS}
+    cols['capital_offsets'].append(0)
+    cols['language_offsets'].append(0)
+
+    for c in countries:
+        name = c['name']['common']
+        flags = c.get('flags') or {}
+        cols['population'].append(int(c.get('population') or 0))
+        cols['area'].append(float(c.get('area') or 0.0))
+        cols['region'].append(regions.setdefault(c.get('region') or '', len(regions)))
+        subregion = c.get('subregion')
+        cols['subregion'].append(subregions.setdefault(subregion, len(subregions))
+                                 if subregion else NO_CODE)
+        cols['name'].append(strings.id(name))
+        cols['official'].append(strings.id(c['name'].get('official') or name))
+        cols['flag_png'].append(strings.id(flags.get('png') or ''))
+        cols['flag_svg'].append(strings.id(flags.get('svg') or ''))
+        cols['flag_alt'].append(strings.id(flags.get('alt')))
+        cols['cca2'].append(_code(c.get('cca2'), 2, name))
+        cols['cca3'].append(_code(c.get('cca3'), 3, name))
+        for capital in c.get('capital') or ():
+            cols['capital_ids'].append(strings.id(capital))
+        cols['capital_offsets'].append(len(cols['capital_ids']))
+        for code, language in (c.get('languages') or {}).items():
+            cols['language_ids'].append(languages.setdefault((code, language), len(languages)))
+        cols['language_offsets'].append(len(cols['language_ids']))
+
+    if len(regions) >= NO_CODE or len(subregions) >= NO_CODE:
+        raise ValueError('too many regions for u8 codes')
+    cols['region_dict'] = [strings.id(r) for r in regions]
+    cols['subregion_dict'] = [strings.id(s) for s in subregions]
+    cols['language_dict'] = [sid for code, name in languages
+                             for sid in (strings.id(code), strings.id(name))]
+    cols['cca3_index'] = sorted(range(len(countries)), key=lambda i: cols['cca3'][i])
+    cols['cca2_index'] = sorted(range(len(countries)), key=lambda i: cols['cca2'][i])
+    string_offsets, string_data = strings.encode()
+
+    encoded = {
+        'population': _pack('Q', cols['population']),
+        'area': _pack('d', cols['area']),
+        'region': bytes(cols['region']),
+        'subregion': bytes(cols['subregion']),
+        'cca2': b''.join(cols['cca2']),
+        'cca3': b''.join(cols['cca3']),
+        'language_ids': _pack('H', cols['language_ids']),
+        'cca3_index': _pack('H', cols['cca3_index']),
+        'cca2_index': _pack('H', cols['cca2_index']),
+        'string_offsets': string_offsets,
+        'string_data': string_data,
+    }
+    for name in ('name', 'official', 'flag_png', 'flag_svg', 'flag_alt', 'capital_offsets',
+                 'capital_ids', 'language_offsets', 'region_dict', 'subregion_dict',
+                 'language_dict'):
+        encoded[name] = _pack('I', cols[name])
+
+    offset = _align(_HEADER.size + _SECTION.size * len(SECTIONS))
+    table = []
+    body = bytearray()
+    for name in SECTIONS:
+        data = encoded[name]
+        start = offset + len(body)
+        table.append(_SECTION.pack(start, len(data)))
+        body += data
+        body += b'\0' * (_align(len(body)) - len(body))
+
+    header = _HEADER.pack(MAGIC, VERSION, len(countries), len(SECTIONS)) + b''.join(table)
+    return header + b'\0' * (offset - len(header)) + bytes(body)
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def write_snapshot(countries, path):
+    """Encode `countries` and write the snapshot to `path` atomically."""
+    data = build_snapshot(countries)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class CountrySnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Numeric columns are exposed as memoryviews straight over the mapping
+    (numpy.frombuffer() accepts them without copying); strings are decoded
+    only when a row is accessed.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT):
+        if sys.byteorder != 'little':
+            raise RuntimeError('country snapshots can only be mapped on little-endian hosts')
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, self.count, nsections = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {VERSION} country snapshot')
+
+        self._sections = {}
+        for i, name in enumerate(SECTIONS[:nsections]):
+            start, length = _SECTION.unpack_from(self._view, _HEADER.size + i * _SECTION.size)
+            self._sections[name] = self._view[start:start + length]
+
+        self.population = self._column('population', 'Q')
+        self.area = self._column('area', 'd')
+        self.region_codes = self._sections['region']
+        self.subregion_codes = self._sections['subregion']
+        self._name = self._column('name', 'I')
+        self._official = self._column('official', 'I')
+        self._flag_png = self._column('flag_png', 'I')
+        self._flag_svg = self._column('flag_svg', 'I')
+        self._flag_alt = self._column('flag_alt', 'I')
+        self._cca2 = self._sections['cca2']
+        self._cca3 = self._sections['cca3']
+        self._capital_offsets = self._column('capital_offsets', 'I')
+        self._capital_ids = self._column('capital_ids', 'I')
+        self._language_offsets = self._column('language_offsets', 'I')
+        self._language_ids = self._column('language_ids', 'H')
+        self._language_dict = self._column('language_dict', 'I')
+        self._cca3_index = self._column('cca3_index', 'H')
+        self._cca2_index = self._column('cca2_index', 'H')
+        self._string_offsets = self._column('string_offsets', 'I')
+        self._string_data = self._sections['string_data']
+        self.regions = [self.string(i) for i in self._column('region_dict', 'I')]
+        self.subregions = [self.string(i) for i in self._column('subregion_dict', 'I')]
+
+    def _column(self, name, fmt):
+        return self._sections[name].cast(fmt)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release every view and unmap the file."""
+        for name in list(vars(self)):
+            value = getattr(self, name)
+            if isinstance(value, memoryview):
+                value.release()
+        for view in getattr(self, '_sections', {}).values():
+            view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def string(self, sid):
+        if sid == NONE:
+            return None
+        start = self._string_offsets[sid]
+        return str(self._string_data[start:self._string_offsets[sid + 1]], 'utf-8')
+
+    def name(self, row):
+        return self.string(self._name[row])
+
+    def cca2(self, row):
+        return str(self._cca2[row * 2:row * 2 + 2], 'ascii')
+
+    def cca3(self, row):
+        return str(self._cca3[row * 3:row * 3 + 3], 'ascii')
+
+    def region(self, row):
+        return self.regions[self.region_codes[row]]
+
+    def subregion(self, row):
+        code = self.subregion_codes[row]
+        return None if code == NO_CODE else self.subregions[code]
+
+    def capitals(self, row):
+        ids = self._capital_ids[self._capital_offsets[row]:self._capital_offsets[row + 1]]
+        return [self.string(i) for i in ids]
+
+    def languages(self, row):
+        ids = self._language_ids[self._language_offsets[row]:self._language_offsets[row + 1]]
+        pairs = self._language_dict
+        return {self.string(pairs[2 * i]): self.string(pairs[2 * i + 1]) for i in ids}
+
+    def find(self, code):
+        """Row of the country with the given cca3 or cca2 code, or None."""
+        code = code.upper()
+        if len(code) == 3:
+            index, key = self._cca3_index, self.cca3
+        elif len(code) == 2:
+            index, key = self._cca2_index, self.cca2
+        else:
+            return None
+        keys = _KeyView(index, key)
+        pos = bisect_left(keys, code)
+        if pos < len(index) and keys[pos] == code:
+            return index[pos]
+        return None
+
+    def record(self, row):
+        """Row `row` as a REST Countries style dict (see types/country.ts)."""
+        record = {
+            'name': {'common': self.name(row), 'official': self.string(self._official[row])},
+            'capital': self.capitals(row),
+            'population': self.population[row],
+            'flags': {'png': self.string(self._flag_png[row]),
+                      'svg': self.string(self._flag_svg[row])},
+            'region': self.region(row),
+            'languages': self.languages(row),
+            'area': self.area[row],
+            'cca2': self.cca2(row),
+            'cca3': self.cca3(row),
+        }
+        alt = self.string(self._flag_alt[row])
+        if alt is not None:
+            record['flags']['alt'] = alt
+        subregion = self.subregion(row)
+        if subregion is not None:
+            record['subregion'] = subregion
+        return record
+
+    def records(self):
+        return [self.record(row) for row in range(self.count)]
+
+
+class _KeyView:
+    """Sequence of index keys for bisect, decoding only the probed entries."""
+
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self.key(self.index[i])
+
+
+def snapshot_count(path=DEFAULT_SNAPSHOT):
+    """Number of countries in a snapshot, reading only its header."""
+    with open(path, 'rb') as f:
+        magic, version, count, _ = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} country snapshot')
+    return count
+
+
+def is_snapshot(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or inspect a country snapshot.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='convert a REST Countries JSON dump')
+    build.add_argument('source', help='REST Countries JSON file')
+    build.add_argument('-o', '--output', default=DEFAULT_SNAPSHOT,
+                       help='snapshot path (default: %(default)s)')
+    info = sub.add_parser('info', help='summarise a snapshot')
+    info.add_argument('snapshot', nargs='?', default=DEFAULT_SNAPSHOT)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        with open(args.source, encoding='utf-8') as f:
+            countries = json.load(f)
+        size = write_snapshot(countries, args.output)
+        source_size = os.path.getsize(args.source)
+        print(f'✓ Wrote {args.output} ({size:,} bytes, {size / source_size:.0%} of the JSON)')
+        return 0
+
+    with CountrySnapshot(args.snapshot) as snap:
+        print(f'{len(snap)} countries, {len(snap.regions)} regions, '
+              f'{len(snap.subregions)} subregions, '
+              f'{os.path.getsize(args.snapshot):,} bytes')
+        for region in snap.regions:
+            print(f'  {region or "(none)"}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Nearest-neighbour distractor index for "Smart Questions".
+
+For every country in a snapshot, finds the k most similar other countries
+over normalised features (see types/country.ts):
+
+  - region and subregion (one-hot)
+  - log population and log area (z-scored)
+  - spoken languages (multi-hot, scaled to unit length)
+
+Neighbours are ordered by distance and split into difficulty tiers of
+consecutive ranks, so the closest ones make the hardest wrong answers.
+The index is written as compact JSON holding a flat row-major neighbour
+array; lib/distractors.ts loads it into a Uint16Array and picks a
+country's distractors for a tier with an O(1) slice lookup.
+
+Usage:
+  python -m tools.distractors data/countries.snap -o public/distractors.json --k 12
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from tools.country_snapshot import DEFAULT_SNAPSHOT, ROOT, CountrySnapshot
+
+INDEX_VERSION = 1
+TIER_NAMES = ('hard', 'medium', 'easy')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'public', 'distractors.json')
+
+# Relative weight of each feature group in the distance
+WEIGHTS = {
+    'region': 1.0,
+    'subregion': 1.0,
+    'population': 0.75,
+    'area': 0.75,
+    'languages': 1.0,
+}
+
+
+def _one_hot(codes, size):
+    out = np.zeros((len(codes), size))
+    valid = codes < size
+    out[np.flatnonzero(valid), codes[valid]] = 1.0
+    return out
+
+
+def _zscore(values):
+    logs = np.log10(np.maximum(values, 1.0))
+    std = logs.std()
+    return ((logs - logs.mean()) / std if std else logs * 0.0)[:, None]
+
+
+def features(snapshot):
+    """Feature matrix (countries x features) with WEIGHTS applied."""
+    n = len(snapshot)
+    region = np.frombuffer(snapshot.region_codes, dtype=np.uint8).astype(np.int64)
+    subregion = np.frombuffer(snapshot.subregion_codes, dtype=np.uint8).astype(np.int64)
+    population = np.frombuffer(snapshot.population, dtype='<u8').astype(np.float64)
+    area = np.frombuffer(snapshot.area, dtype='<f8')
+
+    spoken = [snapshot.languages(row) for row in range(n)]
+    codes = sorted({code for langs in spoken for code in langs})
+    column = {code: i for i, code in enumerate(codes)}
+    languages = np.zeros((n, len(codes)))
+    for row, langs in enumerate(spoken):
+        for code in langs:
+            languages[row, column[code]] = 1.0
+    norms = np.linalg.norm(languages, axis=1, keepdims=True)
+    languages = np.divide(languages, norms, out=languages, where=norms > 0)
+
+    groups = {
+        'region': _one_hot(region, len(snapshot.regions)),
+        'subregion': _one_hot(subregion, len(snapshot.subregions)),
+        'population': _zscore(population),
+        'area': _zscore(area),
+        'languages': languages,
+    }
+    return np.hstack([groups[name] * WEIGHTS[name] for name in WEIGHTS])
+
+
+def nearest_neighbours(x, k, candidates):
+    """(n, k) indexes of each row's nearest `candidates` rows, closest first."""
+    sq = (x * x).sum(axis=1)
+    dist = sq[:, None] + sq[None, :] - 2.0 * (x @ x.T)
+    dist[:, ~candidates] = np.inf
+    np.fill_diagonal(dist, np.inf)
+
+    k = min(k, int(candidates.sum()) - 1)
+    nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(dist, nearest, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(nearest, order, axis=1)
+
+
+def tier_bounds(k, tiers):
+    """Split ranks 0..k into `tiers` consecutive, nearly equal ranges."""
+    edges = np.linspace(0, k, tiers + 1).round().astype(int)
+    return {TIER_NAMES[i] if i < len(TIER_NAMES) else f'tier{i}': [int(edges[i]), int(edges[i + 1])]
+            for i in range(tiers)}
+
+
+def build_index(snapshot_path, k=12, tiers=3):
+    """Compute the index for a snapshot as a JSON-serialisable dict."""
+    with CountrySnapshot(snapshot_path) as snapshot:
+        x = features(snapshot)
+        playable = np.frombuffer(snapshot.population, dtype='<u8') > 0
+        codes = [snapshot.cca3(row) for row in range(len(snapshot))]
+    with open(snapshot_path, 'rb') as f:
+        snapshot_sha = hashlib.sha256(f.read()).hexdigest()
+
+    neighbours = nearest_neighbours(x, k, playable)
+    k = neighbours.shape[1]
+    return {
+        'version': INDEX_VERSION,
+        'snapshot': snapshot_sha,
+        'k': k,
+        'tiers': tier_bounds(k, tiers),
+        'codes': codes,
+        'neighbours': neighbours.astype(np.uint16).ravel().tolist(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the nearest-neighbour distractor index.')
+    parser.add_argument('snapshot', nargs='?', default=DEFAULT_SNAPSHOT,
+                        help='country snapshot (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT,
+                        help='index path (default: %(default)s)')
+    parser.add_argument('--k', type=int, default=12, help='neighbours per country')
+    parser.add_argument('--tiers', type=int, default=3, help='difficulty tiers')
+    args = parser.parse_args(argv)
+
+    index = build_index(args.snapshot, args.k, args.tiers)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    print(f'✓ Wrote {args.output}: {len(index["codes"])} countries x {index["k"]} neighbours, '
+          f'tiers {index["tiers"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Flag sprite-atlas builder.
+
+Packs a directory of flag images named by ISO 3166-1 alpha-2 code (e.g.
+`fr.png`, as downloaded from flagcdn.com) into one sprite atlas per cell
+width, encoded as WebP, AVIF and PNG, plus `atlas.json` giving each flag's
+rectangle by cca2. A quiz then loads one atlas file for a session instead
+of a PNG per option (see lib/flagAtlas.ts).
+
+Flags keep their aspect ratio and are centred in cells of 3:2. Resized
+tiles are cached under .cache/flag-atlas by the source file's sha256, so
+a rebuild only resizes flags that changed, and atlases whose tiles are
+all unchanged are not re-encoded. Resizing and encoding run in a process
+pool. Atlas file names carry a content hash, so they can be cached forever.
+
+Usage:
+  python -m tools.flag_atlas data/flags -o public/flags --widths 80 160 320
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+from tools.country_snapshot import ROOT
+
+ATLAS_VERSION = 1
+DEFAULT_SOURCE = os.path.join(ROOT, 'data', 'flags')
+DEFAULT_OUTPUT = os.path.join(ROOT, 'public', 'flags')
+DEFAULT_CACHE = os.path.join(ROOT, '.cache', 'flag-atlas')
+DEFAULT_WIDTHS = (80, 160, 320)
+FORMATS = ('avif', 'webp', 'png')
+IMAGE_EXTENSIONS = ('.png', '.webp', '.jpg', '.jpeg', '.gif')
+
+ENCODE_OPTIONS = {
+    'webp': {'quality': 85, 'method': 4},
+    'avif': {'quality': 60, 'speed': 6},
+    'png': {'optimize': True},
+}
+
+# Largest side WebP can encode
+MAX_ATLAS_SIDE = 16383
+
+
+def cell_size(width):
+    """Cell (width, height) for a flag width; cells are 3:2."""
+    return width, round(width * 2 / 3)
+
+
+def find_flags(source):
+    """Map of upper-case cca2 -> image path for the flags in `source`."""
+    flags = {}
+    with os.scandir(source) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if entry.is_file() and len(stem) == 2 and stem.isalpha() \
+                    and ext.lower() in IMAGE_EXTENSIONS:
+                flags[stem.upper()] = entry.path
+    return dict(sorted(flags.items()))
+
+
+class _State:
+    """Stat-keyed sha256 memo and the input digest of each written atlas."""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.atlases = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == ATLAS_VERSION:
+                self.files = data['files']
+                self.atlases = data['atlases']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def digest(self, path):
+        st = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return entry['sha256']
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.files[path] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'sha256': digest}
+        return digest
+
+    def save(self):
+        payload = {'version': ATLAS_VERSION, 'files': self.files, 'atlases': self.atlases}
+        _write_atomic(self.path, json.dumps(payload).encode('utf-8'))
+
+
+def _write_atomic(path, data):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _tile_path(tile_dir, digest, width):
+    return os.path.join(tile_dir, f'{digest[:24]}-{width}.png')
+
+
+def _render_tiles(task):
+    """Resize one flag to every cell width (runs in a worker)."""
+    path, digest, widths, tile_dir = task
+    with Image.open(path) as source:
+        image = source.convert('RGBA')
+    for width in widths:
+        tile = ImageOps.contain(image, cell_size(width), Image.LANCZOS)
+        tmp = _tile_path(tile_dir, digest, width) + f'.{os.getpid()}.tmp'
+        tile.save(tmp, 'PNG')
+        os.replace(tmp, _tile_path(tile_dir, digest, width))
+    return digest
+
+
+def grid_columns(count, width):
+    """Columns of a near-square grid that stays within MAX_ATLAS_SIDE."""
+    cell_w, cell_h = cell_size(width)
+    columns = max(1, math.ceil(math.sqrt(count * cell_h / cell_w)))
+    columns = min(columns, MAX_ATLAS_SIDE // cell_w)
+    if math.ceil(count / columns) * cell_h > MAX_ATLAS_SIDE:
+        raise ValueError(f'{count} flags at width {width} do not fit in one atlas')
+    return columns
+
+
+def _compose_atlas(task):
+    """Paste the tiles of one width into an atlas and encode one format (runs in a worker).
+
+    Returns (width, format, atlas size, flat [x, y, w, h] per flag, file name).
+    """
+    width, fmt, digests, tile_dir, output, tag = task
+    cell_w, cell_h = cell_size(width)
+    columns = grid_columns(len(digests), width)
+    rows = math.ceil(len(digests) / columns)
+    atlas = Image.new('RGBA', (columns * cell_w, rows * cell_h), (0, 0, 0, 0))
+
+    rects = []
+    for i, digest in enumerate(digests):
+        with Image.open(_tile_path(tile_dir, digest, width)) as tile:
+            x = (i % columns) * cell_w + (cell_w - tile.width) // 2
+            y = (i // columns) * cell_h + (cell_h - tile.height) // 2
+            atlas.paste(tile, (x, y))
+            rects.extend((x, y, tile.width, tile.height))
+
+    name = f'atlas-{width}.{tag}.{fmt}'
+    tmp = os.path.join(output, name + f'.{os.getpid()}.tmp')
+    atlas.save(tmp, fmt.upper(), **ENCODE_OPTIONS[fmt])
+    os.replace(tmp, os.path.join(output, name))
+    return width, fmt, atlas.size, rects, name
+
+
+def build_atlases(source=DEFAULT_SOURCE, output=DEFAULT_OUTPUT, widths=DEFAULT_WIDTHS,
+                  formats=FORMATS, cache_dir=DEFAULT_CACHE, workers=None, force=False):
+    """Build atlases for every flag in `source` and return the written index."""
+    flags = find_flags(source)
+    if not flags:
+        raise ValueError(f'No flag images named <cca2>.<ext> in {source}')
+
+    tile_dir = os.path.join(cache_dir, 'tiles')
+    os.makedirs(tile_dir, exist_ok=True)
+    os.makedirs(output, exist_ok=True)
+    state = _State(os.path.join(cache_dir, 'state.json'))
+
+    codes = list(flags)
+    digests = [state.digest(flags[code]) for code in codes]
+
+    # Only flags missing a tile at some width are resized again
+    stale = [(flags[code], digest, widths, tile_dir)
+             for code, digest in zip(codes, digests)
+             if force or not all(os.path.exists(_tile_path(tile_dir, digest, w)) for w in widths)]
+
+    index_path = os.path.join(output, 'atlas.json')
+    previous = {}
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    def atlas_key(width):
+        text = json.dumps([ATLAS_VERSION, width, {f: ENCODE_OPTIONS[f] for f in sorted(formats)},
+                           codes, digests])
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    # Atlases whose inputs are unchanged and whose files still exist are kept
+    sizes = {}
+    compose = []
+    for width in widths:
+        key = atlas_key(width)
+        entry = previous.get('sizes', {}).get(str(width))
+        if not force and entry and state.atlases.get(str(width)) == key \
+                and previous.get('codes') == codes \
+                and all(os.path.exists(os.path.join(output, name))
+                        for name in entry['files'].values()):
+            sizes[str(width)] = entry
+        else:
+            # Composing is cheap next to encoding, so each format is its own task
+            compose.extend((width, fmt, digests, tile_dir, output, key[:12]) for fmt in formats)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_render_tiles, stale, chunksize=8))
+        for width, fmt, (atlas_w, atlas_h), rects, name in pool.map(_compose_atlas, compose):
+            size = sizes.setdefault(str(width), {
+                'cell': list(cell_size(width)),
+                'width': atlas_w,
+                'height': atlas_h,
+                'files': {},
+                'rects': rects,
+            })
+            size['files'][fmt] = name
+            state.atlases[str(width)] = atlas_key(width)
+
+    index = {
+        'version': ATLAS_VERSION,
+        'codes': codes,
+        'sizes': {str(w): sizes[str(w)] for w in sorted(widths)},
+    }
+    _write_atomic(index_path, json.dumps(index, separators=(',', ':')).encode('utf-8'))
+    state.save()
+    _remove_stale_atlases(output, index)
+    return index, len(stale), len({task[0] for task in compose})
+
+
+def _remove_stale_atlases(output, index):
+    keep = {name for size in index['sizes'].values() for name in size['files'].values()}
+    with os.scandir(output) as entries:
+        for entry in entries:
+            if entry.name.startswith('atlas-') and entry.name not in keep:
+                os.unlink(entry.path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pack flag images into sprite atlases.')
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE,
+                        help='directory of <cca2>.png flags (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT,
+                        help='directory for atlases and atlas.json (default: %(default)s)')
+    parser.add_argument('--widths', type=int, nargs='+', default=list(DEFAULT_WIDTHS),
+                        help='cell widths to build an atlas for')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--workers', type=int, default=None,
+                        help='process pool size (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='resize and encode everything, ignoring the tile cache')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index, resized, encoded = build_atlases(args.source, args.output, args.widths,
+                                            args.formats, workers=args.workers,
+                                            force=args.force)
+    for width, size in index['sizes'].items():
+        files = ', '.join(
+            f'{name} ({os.path.getsize(os.path.join(args.output, name)) // 1024} KiB)'
+            for name in size['files'].values())
+        print(f'  {width}px: {size["width"]}x{size["height"]} -> {files}')
+    print(f'✓ {len(index["codes"])} flags, {resized} resized, {encoded} atlases encoded '
+          f'in {time.perf_counter() - started:.2f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
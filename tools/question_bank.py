@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offline question-bank generator.
+
+Precomputes large pools of quizzes from a country snapshot (see
+tools/country_snapshot.py) with NumPy, following the same rules as the
+generators in lib/countries.ts:
+
+  flag        correct answers drawn from well-known countries (population
+              over 5M or a short name); each wrong option is eligible when
+              it shares the correct country's region, or with probability
+              1/2 otherwise
+  capital     only countries with a capital; wrong options drawn uniformly
+  population  two countries with different populations; the larger wins
+
+Every quiz has distinct correct answers. Quizzes are written as fixed-size
+records into sharded binary files plus a manifest.json, so a server can
+hand out a quiz by reading one record range at a random offset instead of
+generating it per request (see lib/questionBank.ts).
+
+Record layout (little-endian, RECORD_DTYPE): four u16 snapshot rows (unused
+options are NO_OPTION), the u8 position of the correct option and a u8 pad.
+
+Usage:
+  python -m tools.question_bank data/countries.snap -o data/question-bank \\
+      --quizzes 100000 --shard-quizzes 16384 --seed 1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from tools.country_snapshot import DEFAULT_SNAPSHOT, ROOT, CountrySnapshot
+
+MANIFEST_VERSION = 1
+MODES = ('flag', 'capital', 'population')
+OPTIONS = 4
+NO_OPTION = 0xFFFF
+RECORD_DTYPE = np.dtype([('options', '<u2', (OPTIONS,)), ('answer', 'u1'), ('pad', 'u1')])
+
+DEFAULT_OUTPUT = os.path.join(ROOT, 'data', 'question-bank')
+
+# Quizzes generated per vectorised batch; bounds the (batch x countries) work arrays
+BATCH_QUIZZES = 2048
+
+
+class CountryColumns:
+    """The snapshot columns the generators need, as NumPy arrays."""
+
+    def __init__(self, snapshot):
+        self.count = len(snapshot)
+        self.population = np.frombuffer(snapshot.population, dtype='<u8').astype(np.int64)
+        self.region = np.frombuffer(snapshot.region_codes, dtype=np.uint8).copy()
+        self.name_length = np.array([len(snapshot.name(i)) for i in range(self.count)])
+        self.has_capital = np.array([bool(snapshot.capitals(i)) for i in range(self.count)])
+
+        valid = self.population > 0
+        self.playable = np.flatnonzero(valid)
+        popular = np.flatnonzero(valid & ((self.population > 5_000_000) | (self.name_length <= 12)))
+        self.popular = popular
+        self.capitals = np.flatnonzero(valid & self.has_capital)
+
+
+def _distinct_rows(rng, pool, quizzes, per_quiz):
+    """(quizzes, per_quiz) rows drawn from `pool` without replacement within a quiz."""
+    if len(pool) < per_quiz:
+        raise ValueError(f'need at least {per_quiz} countries, have {len(pool)}')
+    keys = rng.random((quizzes, len(pool)))
+    picks = np.argpartition(keys, per_quiz - 1, axis=1)[:, :per_quiz]
+    return pool[picks]
+
+
+def _pick_wrong(rng, eligible, wrong):
+    """Pick `wrong` columns per row uniformly among the True entries of `eligible`."""
+    keys = np.where(eligible, rng.random(eligible.shape), np.inf)
+    picks = np.argpartition(keys, wrong - 1, axis=1)[:, :wrong]
+    if not np.isfinite(np.take_along_axis(keys, picks, axis=1)).all():
+        raise ValueError('not enough eligible wrong options')
+    return picks
+
+
+def _shuffle_options(rng, options):
+    """Shuffle each row's options; the correct one starts in column 0."""
+    order = np.argsort(rng.random(options.shape), axis=1)
+    shuffled = np.take_along_axis(options, order, axis=1)
+    answer = np.argmax(order == 0, axis=1)
+    return shuffled, answer
+
+
+def generate_flag(rng, cols, quizzes, quiz_size):
+    source = cols.popular if len(cols.popular) >= quiz_size else cols.playable
+    correct = _distinct_rows(rng, source, quizzes, quiz_size).reshape(-1)
+
+    pool = cols.playable
+    same_region = cols.region[pool][None, :] == cols.region[correct][:, None]
+    eligible = (same_region | (rng.random(same_region.shape) > 0.5)) \
+        & (pool[None, :] != correct[:, None])
+    wrong = pool[_pick_wrong(rng, eligible, OPTIONS - 1)]
+
+    return _shuffle_options(rng, np.column_stack([correct, wrong]))
+
+
+def generate_capital(rng, cols, quizzes, quiz_size):
+    pool = cols.capitals
+    correct = _distinct_rows(rng, pool, quizzes, quiz_size).reshape(-1)
+    eligible = pool[None, :] != correct[:, None]
+    wrong = pool[_pick_wrong(rng, eligible, OPTIONS - 1)]
+
+    return _shuffle_options(rng, np.column_stack([correct, wrong]))
+
+
+def generate_population(rng, cols, quizzes, quiz_size):
+    pairs = _distinct_rows(rng, cols.playable, quizzes, quiz_size * 2)
+    pairs = pairs.reshape(quizzes, quiz_size, 2)
+
+    # Redraw quizzes containing a pair of equal populations
+    while True:
+        pop = cols.population[pairs]
+        tied = (pop[..., 0] == pop[..., 1]).any(axis=1)
+        if not tied.any():
+            break
+        pairs[tied] = _distinct_rows(rng, cols.playable, int(tied.sum()),
+                                     quiz_size * 2).reshape(-1, quiz_size, 2)
+
+    pairs = pairs.reshape(-1, 2)
+    pop = cols.population[pairs]
+    answer = (pop[:, 1] > pop[:, 0]).astype(np.uint8)
+    options = np.full((len(pairs), OPTIONS), NO_OPTION, dtype=np.int64)
+    options[:, :2] = pairs
+    return options, answer
+
+
+GENERATORS = {
+    'flag': generate_flag,
+    'capital': generate_capital,
+    'population': generate_population,
+}
+
+
+def _records(options, answer):
+    records = np.zeros(len(options), dtype=RECORD_DTYPE)
+    records['options'] = options
+    records['answer'] = answer
+    return records
+
+
+def write_bank(snapshot_path, output, quizzes, quiz_size=10, shard_quizzes=16384,
+               modes=MODES, seed=None):
+    """Generate `quizzes` quizzes per mode into sharded files; return the manifest."""
+    if quizzes < 0 or quiz_size < 1 or shard_quizzes < 1:
+        raise ValueError('quiz_size and shard_quizzes must be at least 1, quizzes at least 0')
+    rng = np.random.default_rng(seed)
+    with CountrySnapshot(snapshot_path) as snapshot:
+        cols = CountryColumns(snapshot)
+    with open(snapshot_path, 'rb') as f:
+        snapshot_sha = hashlib.sha256(f.read()).hexdigest()
+
+    os.makedirs(output, exist_ok=True)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'snapshot': {'sha256': snapshot_sha, 'count': cols.count},
+        'record': {'bytes': RECORD_DTYPE.itemsize, 'options': OPTIONS, 'no_option': NO_OPTION},
+        'quiz_size': quiz_size,
+        'seed': seed,
+        'modes': {},
+    }
+
+    for mode in modes:
+        generate = GENERATORS[mode]
+        shards = []
+        remaining = quizzes
+        while remaining:
+            in_shard = min(shard_quizzes, remaining)
+            path = os.path.join(output, f'{mode}-{len(shards):04d}.bin')
+            digest = hashlib.sha256()
+            with open(path + '.tmp', 'wb') as f:
+                done = 0
+                while done < in_shard:
+                    batch = min(BATCH_QUIZZES, in_shard - done)
+                    data = _records(*generate(rng, cols, batch, quiz_size)).tobytes()
+                    digest.update(data)
+                    f.write(data)
+                    done += batch
+            os.replace(path + '.tmp', path)
+            shards.append({'file': os.path.basename(path), 'quizzes': in_shard,
+                           'sha256': digest.hexdigest()})
+            remaining -= in_shard
+        manifest['modes'][mode] = {'quizzes': quizzes, 'shards': shards}
+
+    with open(os.path.join(output, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute sharded quiz question pools.')
+    parser.add_argument('snapshot', nargs='?', default=DEFAULT_SNAPSHOT,
+                        help='country snapshot (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT,
+                        help='output directory (default: %(default)s)')
+    parser.add_argument('--quizzes', type=int, default=100_000, help='quizzes per mode')
+    parser.add_argument('--quiz-size', type=int, default=10, help='questions per quiz')
+    parser.add_argument('--shard-quizzes', type=int, default=16384, help='quizzes per shard file')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.quizzes < 0 or args.quiz_size < 1 or args.shard_quizzes < 1:
+        parser.error('--quiz-size and --shard-quizzes must be at least 1, --quizzes at least 0')
+
+    start = time.perf_counter()
+    manifest = write_bank(args.snapshot, args.output, args.quizzes, args.quiz_size,
+                          args.shard_quizzes, args.modes, args.seed)
+    elapsed = time.perf_counter() - start
+    questions = args.quizzes * args.quiz_size * len(args.modes)
+    shards = sum(len(m['shards']) for m in manifest['modes'].values())
+    print(f'✓ {questions:,} questions in {shards} shard(s) under {args.output} '
+          f'({elapsed:.1f}s, {questions / elapsed:,.0f} questions/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+export type LeaderboardMode = 'flags' | 'capitals' | 'population'
+
+export type LeaderboardWindow = 'daily' | 'weekly' | 'all'
+
+export interface GameResult {
+  player: string
+  mode: LeaderboardMode
+  score: number
+  total: number
+  streak: number
+  // Time taken for the whole quiz, the tie-breaker between equal scores
+  ms: number
+  time: number
+}
+
+export interface LeaderboardEntry extends GameResult {
+  rank: number
+}
+
+export interface Leaderboard {
+  mode: LeaderboardMode
+  window: LeaderboardWindow
+  // Start of the current window (0 for all time)
+  since: number
+  entries: LeaderboardEntry[]
+}